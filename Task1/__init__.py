@@ -1,12 +1,17 @@
 from .constants import GOAL_STATES
+from .board import Board, get_board
 from .puzzle_state import PuzzleState
 from .heuristics import Heuristics
 from .astar import AStarSolver
+from .ida_star import IDAStarSolver
 
 __all__ = [
     "GOAL_STATES",
+    "Board",
+    "get_board",
     "PuzzleState",
     "Heuristics",
     "AStarSolver",
+    "IDAStarSolver",
 ]
 
@@ -1,52 +1,211 @@
-from typing import Callable, Dict, List, Optional, Tuple
-import heapq
+from typing import Callable, Dict, List, Optional, Union
 
+from .board import Board, get_board
+from .dense import DenseTables
+from .incremental import is_incremental
+from .open_list import make_open_list
 from .puzzle_state import PuzzleState
 
 
 class AStarSolver:
-    def __init__(self, heuristic: Callable[[PuzzleState], int]) -> None:
+    """A* trên trạng thái packed (int).
+
+    ``solve`` nhận ``PuzzleState`` hoặc int packed; heuristic được gọi và
+    đường đi được trả về theo đúng kiểu mà caller truyền vào.
+    ``open_list``: "heap", "bucket" hoặc "bucket_dk" (xem open_list.py).
+    ``storage``: "dict" hoặc "dense" (mảng g/parent/move theo rank, xem dense.py).
+    Heuristic incremental (xem incremental.py) được cập nhật từ dữ liệu của
+    nút cha và cặp ô vừa hoán đổi thay vì tính lại cho từng nút con.
+    ``symmetry=True``: bảng g/parent đánh khóa theo đại diện chính tắc của
+    lớp đối xứng (xem symmetry.py); heuristic phải đối xứng.
+    ``board``: kích thước bàn (xem board.py); mặc định lấy theo ``PuzzleState``
+    truyền vào ``solve``, int packed là 3x3. "dense" chỉ dùng được khi số
+    trạng thái vừa bảng (3x3).
+    """
+
+    def __init__(
+        self,
+        heuristic: Callable[[PuzzleState], int],
+        open_list="heap",
+        storage="dict",
+        symmetry: bool = False,
+        board: Optional[Board] = None,
+    ) -> None:
+        if storage not in ("dict", "dense"):
+            raise ValueError(f"Unknown storage {storage!r}; expected 'dict' or 'dense'")
         self.h = heuristic
+        self.open_list = open_list
+        self.storage = storage
+        self.symmetry = symmetry
+        self.board = board
         # Metrics
         self.last_path_cost: Optional[int] = None
         self.enqueue_count: int = 0
         self.pop_count: int = 0
+        self.peak_open_size: int = 0
 
-    def solve(self, start: PuzzleState) -> Optional[List[PuzzleState]]:
+    def solve(
+        self, start: Union[PuzzleState, int]
+    ) -> Optional[Union[List[PuzzleState], List[int]]]:
         # reset metrics
         self.last_path_cost = None
         self.enqueue_count = 0
         self.pop_count = 0
 
-        s = start.tiles
-        open_heap: List[Tuple[int, int, Tuple[int, ...]]] = []  # (f, g, state)
-        heapq.heappush(open_heap, (self.h(start), 0, s))
+        as_view = not isinstance(start, int)
+        board = self.board or (start.board if as_view else get_board())
+        side = board.side
+        board.validate(start.packed if as_view else start)
+        inc = self.h if is_incremental(self.h) else None
+        if inc is not None:
+            # Heuristic incremental nhận thẳng int packed.
+            h = inc
+            s = start.packed if as_view else start
+        elif as_view:
+            user_h = self.h
+            h: Callable[[int], int] = lambda p: user_h(PuzzleState.from_packed(p, side))
+            s = start.packed
+        else:
+            h = self.h
+            s = start
+
+        if self.storage == "dense":
+            path = self._solve_dense(board, s, h, inc)
+            if path is not None and as_view:
+                return [PuzzleState.from_packed(p, side) for p in path]
+            return path
+
+        goals = board.goal_packed
+        successors = board.successors
+        # Khóa bảng: chính trạng thái, hoặc đại diện chính tắc khi symmetry.
+        key = board.canonical if self.symmetry else None
+        k0 = s if key is None else key(s)
+        open_list = make_open_list(self.open_list)  # entries (f, g, state)
+        g_cost: Dict[int, int] = {k0: 0}
+        parent: Dict[int, Optional[int]] = {k0: None}  # khóa -> khóa của cha
+        if inc is not None:
+            cells = board.move_cells
+            update = inc.update
+            value = inc.value
+            h_data: Dict[int, int] = {k0: inc.initial(s)}
+            open_list.push(value(h_data[k0]), 0, s, k0)
+        else:
+            open_list.push(h(s), 0, s, k0)
         self.enqueue_count += 1
-        g_cost: Dict[Tuple[int, ...], int] = {s: 0}
-        parent: Dict[Tuple[int, ...], Optional[Tuple[int, ...]]] = {s: None}
 
-        while open_heap:
-            f, g, u = heapq.heappop(open_heap)
+        push = open_list.push
+        pop = open_list.pop
+        while open_list:
+            f, g, u = pop()
             self.pop_count += 1
-            u_state = PuzzleState(u)
-            if u_state.is_goal():
+            ku = u if key is None else key(u)
+            if key is not None and g > g_cost[ku]:
+                # Một trạng thái khác cùng lớp đã được ghi với g nhỏ hơn.
+                continue
+            if u in goals:
                 # found goal: record path cost
                 self.last_path_cost = g
+                self.peak_open_size = open_list.peak_size
                 # reconstruct path
-                path: List[PuzzleState] = []
-                cur: Optional[Tuple[int, ...]] = u
+                path: List[int] = []
+                cur: Optional[int] = ku
                 while cur is not None:
-                    path.append(PuzzleState(cur))
+                    path.append(cur)
                     cur = parent[cur]
-                return list(reversed(path))
-
-            for v_state in PuzzleState(u).successors():
-                v = v_state.tiles
-                alt = g + 1
-                if v not in g_cost or alt < g_cost[v]:
-                    g_cost[v] = alt
-                    parent[v] = u
-                    heapq.heappush(open_heap, (alt + self.h(v_state), alt, v))
+                path.reverse()
+                if key is not None:
+                    # Khóa là lớp đối xứng: đi lại từ s, mỗi bước chọn nút con
+                    # thuộc lớp kế tiếp (như DenseTables.replay), vì cha được
+                    # ghi có thể là thành viên khác của lớp.
+                    states = [s]
+                    for k in path[1:]:
+                        states.append(next(v for v, _ in successors(states[-1]) if key(v) == k))
+                    path = states
+                if as_view:
+                    return [PuzzleState.from_packed(p, side) for p in path]
+                return path
+
+            alt = g + 1
+            if inc is not None:
+                du = h_data[ku]
+                for v, m in successors(u):
+                    kv = v if key is None else key(v)
+                    if kv not in g_cost or alt < g_cost[kv]:
+                        g_cost[kv] = alt
+                        parent[kv] = ku
+                        dv = h_data[kv] = update(u, du, *cells[m])
+                        push(alt + value(dv), alt, v, kv)
+                        self.enqueue_count += 1
+                continue
+            for v, _ in successors(u):
+                kv = v if key is None else key(v)
+                if kv not in g_cost or alt < g_cost[kv]:
+                    g_cost[kv] = alt
+                    parent[kv] = ku
+                    push(alt + h(v), alt, v, kv)
                     self.enqueue_count += 1
+        self.peak_open_size = open_list.peak_size
         return None
 
+    def _solve_dense(self, board: Board, s: int, h: Callable[[int], int], inc=None) -> Optional[List[int]]:
+        goals = board.goal_packed
+        successors = board.successors
+        if self.symmetry:
+            _rank = board.rank
+            canonical = board.canonical
+            rank = lambda x: _rank(canonical(x))
+        else:
+            rank = board.rank
+        tables = DenseTables(board.num_states)
+        g_table = tables.g
+        r0 = rank(s)
+        tables.record(r0, 0, -1, 0)
+        open_list = make_open_list(self.open_list)  # entries (f, g, state)
+        if inc is not None:
+            cells = board.move_cells
+            update = inc.update
+            value = inc.value
+            h_data: List[Optional[int]] = [None] * board.num_states
+            h_data[r0] = inc.initial(s)
+            open_list.push(value(h_data[r0]), 0, s, r0)
+        else:
+            open_list.push(h(s), 0, s, r0)
+        self.enqueue_count += 1
+
+        push = open_list.push
+        pop = open_list.pop
+        while open_list:
+            f, g, u = pop()
+            self.pop_count += 1
+            ru = rank(u)
+            if self.symmetry and g > g_table[ru]:
+                continue
+            if u in goals:
+                self.last_path_cost = g
+                self.peak_open_size = open_list.peak_size
+                if self.symmetry:
+                    # Rank chính tắc không cho lại trạng thái thật: đi lại từ s qua
+                    # các ô (không phát lại mã nước đi, xem DenseTables.replay).
+                    steps = tables.replay(ru, s, lambda x, _depth: successors(x), rank)
+                    return [s] + [v for v, _ in steps]
+                return [board.unrank(r) for r in tables.ranks_to(ru)]
+
+            alt = g + 1
+            if inc is not None:
+                du = h_data[ru]
+                for v, m in successors(u):
+                    rv = rank(v)
+                    if alt < g_table[rv]:
+                        tables.record(rv, alt, ru, m)
+                        dv = h_data[rv] = update(u, du, *cells[m])
+                        push(alt + value(dv), alt, v, rv)
+                        self.enqueue_count += 1
+                continue
+            for v, m in successors(u):
+                rv = rank(v)
+                if alt < g_table[rv]:
+                    tables.record(rv, alt, ru, m)
+                    push(alt + h(v), alt, v, rv)
+                    self.enqueue_count += 1
+        self.peak_open_size = open_list.peak_size
+        return None
@@ -0,0 +1,219 @@
+"""Batch solving over a process pool.
+
+``solve_many`` spreads start states over worker processes. Only packed
+ints travel to the workers; the solver/heuristic choice is sent once per
+worker through the pool initializer, and lookup tables (PDBs, the mmap'd
+distance table) are loaded in the parent before the pool starts so forked
+workers share them copy-on-write instead of receiving a pickled copy per
+task. Results stream back in completion order, or in input order with
+``ordered=True``.
+
+Input is consumed lazily: at most a few chunks per worker are in flight,
+so an unbounded iterator (e.g. lines of a file) runs in constant memory.
+Besides PuzzleStates, packed ints and tile sequences, a state can be one
+text line (``parse_state``): NDJSON (``[8,7,...]``, a packed int, or
+``{"id": ..., "state": [...]}``) or CSV (``8,7,...``, optionally with an
+id in the first column). ``python -m Task1.main batch`` is the CLI.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import os
+import queue
+import time
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .board import get_board
+from .distance_table import get_distance_table
+from .pdb import PDBHeuristic, default_pdb_heuristic
+from .problem import PuzzleProblem
+from .puzzle_state import PuzzleState
+from .strategies import HEURISTICS, HeuristicFn, resolve_heuristic, solve_with_stats
+
+StateInput = Union[PuzzleState, int, Sequence[int], str]
+
+# Chunks in flight per worker; bounds memory for unbounded inputs.
+_WINDOW_PER_WORKER = 4
+
+
+@dataclass
+class BatchResult:
+    index: int
+    state: Optional[int]  # packed start state; None if the input was invalid
+    actions: Optional[List[str]]
+    cost: int
+    expanded: int
+    seconds: float
+    id: Any = None  # id given with a text line, if any
+    error: Optional[str] = None  # invalid input (with errors="report")
+
+
+def parse_state(line: str) -> Tuple[Any, Union[int, List[int]]]:
+    """``(id, state)`` from one NDJSON or CSV line; ValueError if malformed."""
+    text = line.strip()
+    if text[:1] in ("[", "{") or text.lstrip("-").isdigit():
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e}") from None
+        if isinstance(value, dict):
+            if "state" not in value:
+                raise ValueError('JSON object without a "state" field')
+            return value.get("id"), _json_state(value["state"])
+        return None, _json_state(value)
+    fields = [f.strip() for f in text.split(",")]
+    ident = None
+    if fields and not fields[0].lstrip("-").isdigit():
+        ident, fields = fields[0], fields[1:]
+    try:
+        return ident, [int(f) for f in fields]
+    except ValueError:
+        raise ValueError(f"Cannot parse start state {text!r}") from None
+
+
+def _json_state(value: Any) -> Union[int, List[int]]:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, list) and all(isinstance(v, int) and not isinstance(v, bool) for v in value):
+        return value
+    raise ValueError(f"A state must be a list of ints or a packed int, got {value!r}")
+
+
+def _to_packed(state: Union[PuzzleState, int, Sequence[int]], side: int = 3) -> int:
+    # Trạng thái sai bị báo ngay ở tiến trình cha (xem Board.validate).
+    board = get_board(side)
+    if isinstance(state, int):
+        return board.validate(state)
+    if isinstance(state, PuzzleState):
+        if state.board.side != side:
+            raise ValueError(f"Expected a {side}x{side} state, got {state.board.side}x{state.board.side}")
+        return board.validate(state.packed)
+    if len(state) != side * side:
+        raise ValueError(f"Expected {side * side} values, got {len(state)}")
+    board.validate_tiles(state)
+    return board.pack(state)
+
+
+def _load_shared(solver: str, heuristic: HeuristicFn) -> None:
+    """Touch the lazily loaded tables the chosen solver will read."""
+    if solver == "table":
+        get_distance_table()
+    if heuristic is HEURISTICS["pdb_max"] or isinstance(heuristic, PDBHeuristic):
+        pdb = heuristic if isinstance(heuristic, PDBHeuristic) else default_pdb_heuristic()
+        for db in pdb.databases:
+            db.table
+
+
+# Per-worker configuration, set once by the pool initializer.
+_worker_solver: str = "astar"
+_worker_heuristic: Optional[HeuristicFn] = None
+_worker_side: int = 3
+
+
+def _init_worker(solver: str, heuristic: Union[str, HeuristicFn, None], side: int = 3) -> None:
+    global _worker_solver, _worker_heuristic, _worker_side
+    _worker_solver = solver
+    _worker_heuristic = resolve_heuristic(solver, heuristic, get_board(side))
+    _worker_side = side
+    _load_shared(solver, _worker_heuristic)
+
+
+# (index, packed state or None, id, error)
+_Item = Tuple[int, Optional[int], Any, Optional[str]]
+
+
+def _solve_one(item: _Item) -> BatchResult:
+    index, s, ident, error = item
+    if s is None:
+        return BatchResult(index, None, None, 0, 0, 0.0, ident, error)
+    t0 = time.perf_counter()
+    actions, cost, expanded = solve_with_stats(PuzzleProblem(s, _worker_side), _worker_solver, _worker_heuristic)
+    return BatchResult(index, s, actions, cost, expanded, time.perf_counter() - t0, ident)
+
+
+def _solve_chunk(chunk: List[_Item]) -> List[BatchResult]:
+    return [_solve_one(item) for item in chunk]
+
+
+def _items(states: Iterable[StateInput], side: int, errors: str) -> Iterator[_Item]:
+    for index, state in enumerate(states):
+        ident = None
+        try:
+            if isinstance(state, str):
+                ident, state = parse_state(state)
+            yield index, _to_packed(state, side), ident, None
+        except ValueError as e:
+            if errors == "raise":
+                raise
+            yield index, None, ident, str(e)
+
+
+def solve_many(
+    states: Iterable[StateInput],
+    workers: Optional[int] = None,
+    solver: str = "astar",
+    heuristic: Union[str, HeuristicFn, None] = None,
+    chunksize: int = 1,
+    side: int = 3,
+    ordered: bool = False,
+    errors: str = "raise",
+) -> Iterator[BatchResult]:
+    """Giải nhiều trạng thái song song, trả kết quả theo thứ tự hoàn thành.
+
+    - states: PuzzleState, int packed, dãy side*side số hoặc một dòng NDJSON/CSV.
+    - workers: số tiến trình (mặc định os.cpu_count()); 1 = chạy ngay trong tiến trình này.
+    - solver/heuristic: như ``solve_puzzle_problem`` (tên hoặc hàm cấp module).
+    - side: kích thước bàn (xem board.py); int packed được hiểu theo bàn này.
+    - ordered: trả kết quả theo thứ tự đầu vào.
+    - errors: "raise" (ValueError ở đầu vào sai) hoặc "report" (BatchResult với ``error``).
+    """
+    if errors not in ("raise", "report"):
+        raise ValueError(f"errors must be 'raise' or 'report', got {errors!r}")
+    if chunksize < 1:
+        raise ValueError("chunksize must be >= 1")
+    items = _items(states, side, errors)
+    workers = workers or os.cpu_count() or 1
+
+    # Validate names and load tables up front so forked workers inherit them.
+    _init_worker(solver, heuristic, side)
+    if workers == 1:
+        for item in items:
+            yield _solve_one(item)
+        return
+
+    chunks = iter(lambda: list(islice(items, chunksize)), [])
+    window = workers * _WINDOW_PER_WORKER
+    with mp.Pool(workers, initializer=_init_worker, initargs=(solver, heuristic, side)) as pool:
+        if ordered:
+            pending: Deque[Any] = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(_solve_chunk, (chunk,)))
+                if len(pending) >= window:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+            return
+
+        done: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        in_flight = 0
+
+        def collect() -> List[BatchResult]:
+            nonlocal in_flight
+            results = done.get()
+            in_flight -= 1
+            if isinstance(results, BaseException):
+                raise results
+            return results
+
+        for chunk in chunks:
+            pool.apply_async(_solve_chunk, (chunk,), callback=done.put, error_callback=done.put)
+            in_flight += 1
+            if in_flight >= window:
+                yield from collect()
+        while in_flight:
+            yield from collect()
@@ -0,0 +1,540 @@
+"""Benchmarks for the Task 1 solvers, heuristics and open lists.
+
+- ``python -m Task1.benchmark``: A* expansions of each heuristic against
+  ``misplaced_div2`` on a fixed-seed set of deep instances.
+- ``python -m Task1.benchmark open-lists``: time per expansion and
+  frontier size/memory of each open-list backend, for both engines.
+- ``python -m Task1.benchmark suite``: every engine in ``ENGINES`` over a
+  fixed-seed corpus stratified by true solution depth and by nearest goal;
+  writes a JSON report and, with ``--baseline``, exits non-zero on
+  regressions of the expansion/solved/optimal counts against a stored
+  report (see ``bench_baseline.json``; latency only with
+  ``--latency-tolerance``).
+- ``python -m Task1.benchmark hda [workers ...]``: HDA* (hda.py) against
+  serial A* with the same heuristic: speedup, scaling efficiency
+  (speedup / workers), search overhead and per-worker load/utilisation.
+- ``python -m Task1.benchmark hda-check [count]``: HDA* costs on random
+  states against the exact distance table; exits non-zero on a mismatch
+  (regression check for the termination/optimality logic).
+- ``python -m Task1.benchmark vectorized``: one BFS layer expanded and
+  scored with h2 per object, per packed int and as a NumPy batch
+  (vectorized.py), plus the full distance-table build both ways.
+"""
+
+from __future__ import annotations
+
+# Allow running this file directly without package context
+if __name__ == "__main__" and (__package__ is None or __package__ == ""):
+    import os as _os, sys as _sys
+    _pkg_dir = _os.path.dirname(_os.path.abspath(__file__))
+    _parent = _os.path.dirname(_pkg_dir)
+    if _parent not in _sys.path:
+        _sys.path.insert(0, _parent)
+    __package__ = _os.path.basename(_pkg_dir)
+
+import json
+import os
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import packed as _packed
+from . import vectorized as _vectorized
+from .astar import AStarSolver
+from .distance_table import build_distance_table, get_distance_table
+from .hda import StateHeuristic, WorkerStats, hda_star_search
+from .open_list import OPEN_LISTS, make_open_list
+from .problem import PuzzleProblem
+from .ida_star import IDAStarSolver
+from .search import SearchBudget, SearchMetrics, a_star_search
+from .strategies import HEURISTICS, solve_with_stats
+from .heuristics import Heuristics
+from .puzzle_state import PuzzleState
+
+DEMO_STATE = _packed.pack([8, 7, 6, 5, 4, 3, 1, 0, 2])
+
+
+def deep_instances(count: int = 10, min_depth: int = 16, seed: int = 0) -> List[int]:
+    """Demo state plus ``count`` random states at depth >= ``min_depth``."""
+    table = get_distance_table()
+    rng = random.Random(seed)
+    out = [DEMO_STATE]
+    while len(out) < count + 1:
+        s = _packed.unrank(rng.randrange(_packed.NUM_STATES))
+        d = table.distance(s)
+        if d is not None and d >= min_depth:
+            out.append(s)
+    return out
+
+
+def compare_expansions(
+    states: Sequence[int],
+    heuristics: Dict[str, Callable[[int], int]] = HEURISTICS,
+    baseline: str = "misplaced_div2",
+) -> Dict[str, Dict[str, float]]:
+    """A* expansions/time per heuristic, plus the expansion ratio vs ``baseline``."""
+    report: Dict[str, Dict[str, float]] = {}
+    for name, h in heuristics.items():
+        h(states[0])  # load lazy tables outside the timed region
+        solver = AStarSolver(h)
+        expanded = 0
+        cost = 0
+        t0 = time.perf_counter()
+        for s in states:
+            solver.solve(s)
+            expanded += solver.pop_count
+            cost += solver.last_path_cost or 0
+        report[name] = {
+            "expanded": expanded,
+            "total_cost": cost,
+            "seconds": time.perf_counter() - t0,
+        }
+    base = report[baseline]["expanded"]
+    for row in report.values():
+        row["vs_" + baseline] = row["expanded"] / base if base else 0.0
+    return report
+
+
+def _run_engine(engine: str, backend: str, s: int, h: Callable[[int], int]) -> Dict[str, int]:
+    """One solve; returns expanded nodes and peak frontier entries."""
+    if engine == "AStarSolver":
+        solver = AStarSolver(h, open_list=backend)
+        solver.solve(s)
+        return {"expanded": solver.pop_count, "peak_frontier": solver.peak_open_size}
+
+    created = []
+
+    def factory():
+        ol = make_open_list(backend)
+        created.append(ol)
+        return ol
+
+    metrics = SearchMetrics()
+    a_star_search(PuzzleProblem(s), lambda state, _p: h(state), open_list=factory, metrics=metrics)
+    return {"expanded": metrics.expanded, "peak_frontier": created[0].peak_size}
+
+
+def compare_open_lists(
+    states: Sequence[int],
+    heuristic: Callable[[int], int] = HEURISTICS["misplaced_div2"],
+    backends: Sequence[str] = tuple(OPEN_LISTS),
+    engines: Sequence[str] = ("AStarSolver", "a_star_search"),
+) -> Dict[str, Dict[str, float]]:
+    """Time per expansion, peak frontier entries and peak traced memory.
+
+    Timing and memory come from separate runs, since tracemalloc slows
+    the search down considerably.
+    """
+    report: Dict[str, Dict[str, float]] = {}
+    for engine in engines:
+        for backend in backends:
+            expanded = 0
+            peak_frontier = 0
+            t0 = time.perf_counter()
+            for s in states:
+                row = _run_engine(engine, backend, s, heuristic)
+                expanded += row["expanded"]
+                peak_frontier = max(peak_frontier, row["peak_frontier"])
+            seconds = time.perf_counter() - t0
+
+            peak_bytes = 0
+            for s in states:
+                tracemalloc.start()
+                _run_engine(engine, backend, s, heuristic)
+                peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+
+            report[f"{engine}/{backend}"] = {
+                "expanded": expanded,
+                "seconds": seconds,
+                "us_per_expansion": 1e6 * seconds / expanded if expanded else 0.0,
+                "peak_frontier": peak_frontier,
+                "peak_mib": peak_bytes / 2**20,
+            }
+    return report
+
+
+# Suite ------------------------------------------------------------------
+
+# engine(state) -> (solved, cost, expanded)
+EngineFn = Callable[[int], Tuple[bool, int, int]]
+
+
+def _strategy_engine(solver: str, heuristic: Optional[str] = None, **options: Any) -> EngineFn:
+    def run(s: int) -> Tuple[bool, int, int]:
+        actions, cost, expanded = solve_with_stats(PuzzleProblem(s), solver, heuristic, **options)
+        return actions is not None, cost, expanded
+
+    return run
+
+
+def _astar_solver_engine(heuristic: str) -> EngineFn:
+    solver = AStarSolver(HEURISTICS[heuristic])
+
+    def run(s: int) -> Tuple[bool, int, int]:
+        path = solver.solve(s)
+        return path is not None, solver.last_path_cost or 0, solver.pop_count
+
+    return run
+
+
+def _ida_engine(heuristic: str) -> EngineFn:
+    solver = IDAStarSolver(HEURISTICS[heuristic])
+
+    def run(s: int) -> Tuple[bool, int, int]:
+        actions, cost = solver.solve(s)
+        return actions is not None, cost, solver.expanded_count
+
+    return run
+
+
+# a_star_search runs get a node budget so the weak heuristics cannot stall
+# the suite on the deepest instances; capped solves count as unsolved.
+_SUITE_BUDGET = SearchBudget(max_expanded=400_000)
+
+ENGINES: Dict[str, Callable[[], EngineFn]] = {
+    "a_star_search/misplaced_div2": lambda: _strategy_engine("astar", "misplaced_div2", budget=_SUITE_BUDGET),
+    "a_star_search/manhattan_blank_div2": lambda: _strategy_engine("astar", "manhattan_blank_div2", budget=_SUITE_BUDGET),
+    "a_star_search/h2": lambda: _strategy_engine("astar", "h2", budget=_SUITE_BUDGET),
+    "a_star_search/pdb_max": lambda: _strategy_engine("astar", "pdb_max", budget=_SUITE_BUDGET),
+    "a_star_search/pdb_max/bucket+dense": lambda: _strategy_engine(
+        "astar", "pdb_max", open_list="bucket", storage="dense", budget=_SUITE_BUDGET
+    ),
+    "a_star_search/h2/symmetry": lambda: _strategy_engine("astar", "h2", symmetry=True, budget=_SUITE_BUDGET),
+    "a_star_search/pdb_max/epea": lambda: _strategy_engine("epea", "pdb_max", budget=_SUITE_BUDGET),
+    "AStarSolver/misplaced_div2": lambda: _astar_solver_engine("misplaced_div2"),
+    "AStarSolver/pdb_max": lambda: _astar_solver_engine("pdb_max"),
+    "IDAStarSolver/pdb_max": lambda: _ida_engine("pdb_max"),
+    "bidirectional": lambda: _strategy_engine("bidir"),
+    "table": lambda: _strategy_engine("table"),
+}
+
+
+def _nearest_goal(table, s: int) -> int:
+    steps = table.descent(s)
+    end = steps[-1][0] if steps else s
+    return sorted(_packed.GOAL_PACKED).index(end)
+
+
+def build_corpus(per_depth: int = 2, max_depth: int = 21, seed: int = 0) -> List[Dict[str, int]]:
+    """Fixed-seed instances, ``per_depth`` per true depth 0..max_depth.
+
+    Within a depth, instances are drawn round-robin over the goal each one
+    is optimally solved towards, so all four ``GOAL_STATES`` are covered
+    rather than only the neighbourhood of one goal.
+    """
+    table = get_distance_table()
+    by_depth: Dict[int, List[int]] = {}
+    for r in range(_packed.NUM_STATES):
+        d = table._mm[r]
+        if d <= max_depth:
+            by_depth.setdefault(d, []).append(r)
+
+    rng = random.Random(seed)
+    corpus: List[Dict[str, int]] = []
+    for depth in sorted(by_depth):
+        ranks = by_depth[depth]
+        rng.shuffle(ranks)
+        by_goal: Dict[int, List[int]] = {}
+        # Look at a bounded prefix only; it is random already.
+        for r in ranks[: max(64, 16 * per_depth)]:
+            s = _packed.unrank(r)
+            by_goal.setdefault(_nearest_goal(table, s), []).append(s)
+        picked = 0
+        while picked < per_depth and any(by_goal.values()):
+            for goal in sorted(by_goal):
+                if by_goal[goal] and picked < per_depth:
+                    corpus.append({"state": by_goal[goal].pop(), "depth": depth, "goal": goal})
+                    picked += 1
+    return corpus
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def run_suite(
+    corpus: Sequence[Dict[str, int]],
+    engines: Optional[Sequence[str]] = None,
+    measure_memory: bool = False,
+) -> Dict[str, Any]:
+    """Run every engine over the corpus; returns a JSON-serialisable report."""
+    names = list(engines) if engines is not None else list(ENGINES)
+    report: Dict[str, Any] = {
+        "corpus": {"instances": len(corpus), "max_depth": max((c["depth"] for c in corpus), default=0)},
+        "engines": {},
+    }
+    for name in names:
+        run = ENGINES[name]()
+        run(corpus[0]["state"])  # warm lazy tables outside the measurements
+        latencies: List[float] = []
+        expanded_total = 0
+        solved = 0
+        optimal = 0
+        by_depth: Dict[int, int] = {}
+        for item in corpus:
+            t0 = time.perf_counter()
+            ok, cost, expanded = run(item["state"])
+            latencies.append(time.perf_counter() - t0)
+            expanded_total += expanded
+            by_depth[item["depth"]] = by_depth.get(item["depth"], 0) + expanded
+            if ok:
+                solved += 1
+                optimal += cost == item["depth"]
+
+        peak_bytes = 0
+        if measure_memory:
+            for item in corpus:
+                tracemalloc.start()
+                run(item["state"])
+                peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+
+        total = sum(latencies)
+        latencies.sort()
+        report["engines"][name] = {
+            "solved": solved,
+            "optimal": optimal,
+            "expanded": expanded_total,
+            "expanded_by_depth": {str(d): n for d, n in sorted(by_depth.items())},
+            "seconds": total,
+            "nodes_per_sec": expanded_total / total if total else 0.0,
+            "latency_ms": {
+                "p50": 1e3 * _percentile(latencies, 0.50),
+                "p90": 1e3 * _percentile(latencies, 0.90),
+                "p99": 1e3 * _percentile(latencies, 0.99),
+                "max": 1e3 * (latencies[-1] if latencies else 0.0),
+            },
+            "peak_mib": peak_bytes / 2**20 if measure_memory else None,
+        }
+    return report
+
+
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    latency_tolerance: Optional[float] = None,
+) -> List[str]:
+    """List regressions of ``report`` against ``baseline``.
+
+    Only the deterministic counters are checked by default: expansion
+    counts must not grow at all, solved and optimal counts must not drop.
+    Latency depends on the machine, so p50 is only compared when
+    ``latency_tolerance`` (allowed growth, as a fraction) is given, which
+    makes sense against a baseline recorded on the same machine.
+    """
+    problems: List[str] = []
+    if report["corpus"] != baseline["corpus"]:
+        return [f"corpus differs: {report['corpus']} vs baseline {baseline['corpus']}"]
+    for name, base in baseline["engines"].items():
+        row = report["engines"].get(name)
+        if row is None:
+            continue
+        for key in ("solved", "optimal"):
+            if row[key] < base[key]:
+                problems.append(f"{name}: {key} {row[key]} < baseline {base[key]}")
+        if row["expanded"] > base["expanded"]:
+            problems.append(f"{name}: expanded {row['expanded']} > baseline {base['expanded']}")
+        if latency_tolerance is None:
+            continue
+        p50, base_p50 = row["latency_ms"]["p50"], base["latency_ms"]["p50"]
+        if base_p50 > 0 and p50 > base_p50 * (1 + latency_tolerance):
+            problems.append(f"{name}: p50 {p50:.2f} ms > baseline {base_p50:.2f} ms (+{latency_tolerance:.0%})")
+    return problems
+
+
+def _print_suite(report: Dict[str, Any]) -> None:
+    c = report["corpus"]
+    print(f"{c['instances']} instances, depth 0..{c['max_depth']}")
+    print(f"{'engine':<38}{'solved':>8}{'expanded':>11}{'nodes/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'MiB':>7}")
+    for name, row in report["engines"].items():
+        mib = "-" if row["peak_mib"] is None else f"{row['peak_mib']:.1f}"
+        print(
+            f"{name:<38}{row['solved']:>8}{row['expanded']:>11}{row['nodes_per_sec']:>10.0f}"
+            f"{row['latency_ms']['p50']:>9.2f}{row['latency_ms']['p99']:>9.2f}{mib:>7}"
+        )
+
+
+def hda_scaling(
+    states: Sequence[int], workers: Sequence[int] = (1, 2, 4), heuristic: str = "pdb_max"
+) -> Dict[str, Dict[str, Any]]:
+    """Serial A* vs HDA* with each worker count, summed over ``states``."""
+    h = HEURISTICS[heuristic]
+    wrapped = StateHeuristic(h)
+    expanded = 0
+    t0 = time.perf_counter()
+    for s in states:
+        metrics = SearchMetrics()
+        a_star_search(PuzzleProblem(s), wrapped, metrics=metrics)
+        expanded += metrics.expanded
+    serial = time.perf_counter() - t0
+    rows: Dict[str, Dict[str, Any]] = {"serial": {"workers": 1, "seconds": serial, "expanded": expanded}}
+    for w in workers:
+        per_worker = [WorkerStats(i) for i in range(w)]
+        total = 0
+        t0 = time.perf_counter()
+        for s in states:
+            metrics = SearchMetrics()
+            stats: List[WorkerStats] = []
+            hda_star_search(PuzzleProblem(s), wrapped, w, metrics=metrics, worker_stats=stats)
+            total += metrics.expanded
+            for acc, st in zip(per_worker, stats):
+                acc.expanded += st.expanded
+                acc.busy_time += st.busy_time
+                acc.wall_time += st.wall_time
+        seconds = time.perf_counter() - t0
+        speedup = serial / seconds if seconds else 0.0
+        rows[f"hda/{w}"] = {
+            "workers": w,
+            "seconds": seconds,
+            "expanded": total,
+            "speedup": speedup,
+            "efficiency": speedup / w,
+            "search_overhead": total / expanded if expanded else 0.0,
+            "load_share": [st.expanded / total if total else 0.0 for st in per_worker],
+            "utilization": [st.utilization for st in per_worker],
+        }
+    return rows
+
+
+def hda_check(count: int = 20, workers: int = 3, seed: int = 16) -> List[Tuple[int, int, Optional[int]]]:
+    """``(state, hda_cost, true_cost)`` of every random state where HDA* is not optimal."""
+    table = get_distance_table()
+    rng = random.Random(seed)
+    h = StateHeuristic(HEURISTICS["pdb_max"])
+    bad = []
+    for _ in range(count):
+        s = _packed.pack(rng.sample(range(_packed.CELLS), _packed.CELLS))
+        actions, cost = hda_star_search(PuzzleProblem(s), h, workers)
+        true = table.distance(s)
+        if actions is None or cost != true:
+            bad.append((s, cost, true))
+    return bad
+
+
+def _suite_main(argv: Sequence[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m Task1.benchmark suite")
+    parser.add_argument("--per-depth", type=int, default=2)
+    parser.add_argument("--max-depth", type=int, default=21)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engines", nargs="*", choices=sorted(ENGINES), default=None)
+    parser.add_argument("--memory", action="store_true", help="also measure peak traced memory (slow)")
+    parser.add_argument("--out", type=str, default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", type=str, default=None, help="compare against this JSON report")
+    parser.add_argument(
+        "--latency-tolerance", type=float, default=None,
+        help="also fail when p50 latency grows by more than this fraction (baseline from this machine)",
+    )
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.per_depth, args.max_depth, args.seed)
+    report = run_suite(corpus, args.engines, measure_memory=args.memory)
+    report["corpus"].update(per_depth=args.per_depth, seed=args.seed)
+    _print_suite(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare_to_baseline(report, baseline, args.latency_tolerance)
+        for p in problems:
+            print("REGRESSION:", p)
+        return 1 if problems else 0
+    return 0
+
+
+def compare_batch(depth: int = 14, path: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Expand + h2 of the BFS layer at ``depth`` three ways; table build two ways (needs NumPy)."""
+    layer = list(_vectorized.bfs_layers(list(_packed.GOAL_PACKED), max_depth=depth))[-1]
+    states = _vectorized.from_array(layer)
+    objects = [PuzzleState.from_packed(s) for s in states]
+    h2 = Heuristics.h2
+
+    def per_object() -> None:
+        for state in objects:
+            for child, _ in state.successors_with_actions():
+                h2(child)
+
+    def per_packed() -> None:
+        for s in states:
+            for child, _ in _packed.successors(s):
+                h2(child)
+
+    def batch() -> None:
+        _vectorized.h2(_vectorized.expand(layer)[0])
+
+    rows: Dict[str, Dict[str, float]] = {}
+    for name, fn in (("layer/object", per_object), ("layer/packed", per_packed), ("layer/numpy", batch)):
+        t0 = time.perf_counter()
+        fn()
+        rows[name] = {"states": len(states), "seconds": time.perf_counter() - t0}
+    if path is None:
+        import tempfile
+
+        path = os.path.join(tempfile.mkdtemp(), "distances.bin")
+    for name, vectorized in (("table/packed", False), ("table/numpy", True)):
+        t0 = time.perf_counter()
+        build_distance_table(path, vectorized=vectorized)
+        rows[name] = {"states": _packed.NUM_STATES, "seconds": time.perf_counter() - t0}
+    for name, row in rows.items():
+        base = rows["layer/object" if name.startswith("layer") else "table/packed"]["seconds"]
+        row["speedup"] = base / row["seconds"] if row["seconds"] else 0.0
+    return rows
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:2] == ["suite"]:
+        sys.exit(_suite_main(sys.argv[2:]))
+    elif sys.argv[1:2] == ["hda"]:
+        counts = [int(w) for w in sys.argv[2:]] or [1, 2, 4]
+        corpus = deep_instances(count=3, min_depth=18)
+        rows = hda_scaling(corpus, counts)
+        print(f"{len(corpus)} instances (demo + depth >= 18), heuristic pdb_max, {os.cpu_count()} CPUs")
+        print(f"{'engine':<10}{'seconds':>9}{'expanded':>10}{'speedup':>9}{'effic.':>8}{'overhead':>10}  load / utilisation per worker")
+        for name, row in rows.items():
+            if name == "serial":
+                print(f"{name:<10}{row['seconds']:>9.2f}{row['expanded']:>10}")
+                continue
+            per = " ".join(f"{l:.2f}/{u:.2f}" for l, u in zip(row["load_share"], row["utilization"]))
+            print(
+                f"{name:<10}{row['seconds']:>9.2f}{row['expanded']:>10}{row['speedup']:>9.2f}"
+                f"{row['efficiency']:>8.2f}{row['search_overhead']:>10.2f}  {per}"
+            )
+    elif sys.argv[1:2] == ["hda-check"]:
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+        bad = hda_check(count)
+        for s, cost, true in bad:
+            print(f"state {s:#x}: HDA* cost {cost}, optimal {true}")
+        print(f"{count - len(bad)}/{count} HDA* costs optimal")
+        sys.exit(1 if bad else 0)
+    elif sys.argv[1:] == ["vectorized"]:
+        rows = compare_batch()
+        print(f"{'path':<16}{'states':>9}{'seconds':>9}{'speedup':>9}")
+        for name, row in rows.items():
+            print(f"{name:<16}{row['states']:>9}{row['seconds']:>9.3f}{row['speedup']:>9.1f}")
+    elif sys.argv[1:] == ["open-lists"]:
+        corpus = deep_instances(count=2, min_depth=14)
+        rows = compare_open_lists(corpus)
+        print(f"{len(corpus)} instances, heuristic misplaced_div2")
+        print(f"{'engine/open list':<28}{'expanded':>10}{'us/exp':>9}{'peak open':>11}{'peak MiB':>10}")
+        for name, row in rows.items():
+            print(
+                f"{name:<28}{row['expanded']:>10}{row['us_per_expansion']:>9.2f}"
+                f"{row['peak_frontier']:>11}{row['peak_mib']:>10.1f}"
+            )
+    else:
+        corpus = deep_instances()
+        rows = compare_expansions(corpus)
+        print(f"{len(corpus)} instances (demo + depth >= 16)")
+        print(f"{'heuristic':<22}{'expanded':>10}{'ratio':>8}{'seconds':>9}")
+        for name, row in rows.items():
+            print(f"{name:<22}{row['expanded']:>10}{row['vs_misplaced_div2']:>8.3f}{row['seconds']:>9.2f}")
@@ -0,0 +1,132 @@
+"""
+Bidirectional breadth-first search, forward from the initial state and
+backward from every goal at once (front-to-front, unit move costs).
+
+Besides the a_star_search API (get_initial_state, is_goal, get_successors)
+the problem must provide:
+- problem.get_goal_states() -> List[state]
+- problem.get_predecessors(state, current_g_cost) -> List[Tuple[action, prev_state]]
+  where action is the forward move prev_state -> state
+
+Each round expands one whole layer of the smaller frontier. The first
+layer that generates a state already reached by the other side yields the
+optimal cost: a shorter path would have a state reached by both sides in
+an earlier round. Among the meetings in that layer the cheapest one wins.
+
+Backward half-paths are stored with forward actions, so the returned path
+reads start -> goal. Metrics/budget/progress work as in search.py.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .search import TABLE_ENTRY_BYTES, ProgressFn, SearchBudget, SearchMetrics, _Monitor
+
+# state -> (neighbour towards the root of that side, forward action, depth)
+_Seen = Dict[Any, Optional[Tuple[Any, Any, int]]]
+
+
+def _depth(seen: _Seen, state: Any) -> int:
+    entry = seen[state]
+    return 0 if entry is None else entry[2]
+
+
+def bidirectional_search(
+    problem,
+    *,
+    metrics: Optional[SearchMetrics] = None,
+    budget: Optional[SearchBudget] = None,
+    progress: Optional[ProgressFn] = None,
+    progress_interval: int = 10000,
+):
+    if metrics is None:
+        metrics = SearchMetrics()
+    else:
+        metrics.reset()
+    t0 = time.perf_counter()
+
+    start = problem.get_initial_state()
+    fwd: _Seen = {start: None}
+    bwd: _Seen = {g: None for g in problem.get_goal_states()}
+    f_front: List[Any] = [start]
+    b_front: List[Any] = list(bwd)
+    f_depth = b_depth = 0
+    metrics.setup_time = time.perf_counter() - t0
+
+    monitor = _Monitor(
+        metrics, budget, progress, progress_interval,
+        lambda: (len(fwd) + len(bwd)) * TABLE_ENTRY_BYTES,
+    )
+
+    def finish(status: str) -> None:
+        metrics.status = status
+        metrics.peak_table = len(fwd) + len(bwd)
+        metrics.heuristic_calls = 0
+
+    if problem.is_goal(start):
+        monitor.end_search()
+        metrics.suboptimality = 1.0
+        finish("solved")
+        return [], 0
+
+    while f_front and b_front:
+        forward = len(f_front) <= len(b_front)
+        if forward:
+            front, seen, other, depth, expand = f_front, fwd, bwd, f_depth, problem.get_successors
+        else:
+            front, seen, other, depth, expand = b_front, bwd, fwd, b_depth, problem.get_predecessors
+
+        next_front: List[Any] = []
+        meet = None
+        best = None
+        for u in front:
+            reason = monitor.stop_reason()
+            if reason is not None:
+                monitor.end_search()
+                finish(reason)
+                return None, 0
+            metrics.expanded += 1
+            for action, v in expand(u, depth):
+                if v in seen:
+                    continue
+                seen[v] = (u, action, depth + 1)
+                next_front.append(v)
+                metrics.generated += 1
+                if v in other:
+                    cost = depth + 1 + _depth(other, v)
+                    if best is None or cost < best:
+                        best, meet = cost, v
+        if forward:
+            f_front, f_depth = next_front, f_depth + 1
+        else:
+            b_front, b_depth = next_front, b_depth + 1
+        metrics.peak_frontier = max(metrics.peak_frontier, len(f_front) + len(b_front))
+
+        if meet is not None:
+            monitor.end_search()
+            t1 = time.perf_counter()
+            path = _join(fwd, bwd, meet)
+            metrics.reconstruct_time = time.perf_counter() - t1
+            metrics.suboptimality = 1.0
+            finish("solved")
+            return path, len(path)
+
+    monitor.end_search()
+    finish("exhausted")
+    return None, 0
+
+
+def _join(fwd: _Seen, bwd: _Seen, meet: Any) -> List[Any]:
+    path: List[Any] = []
+    state = meet
+    while fwd[state] is not None:
+        state, action, _ = fwd[state]
+        path.append(action)
+    path.reverse()
+    state = meet
+    while bwd[state] is not None:
+        state, action, _ = bwd[state]
+        path.append(action)
+    return path
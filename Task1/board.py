@@ -0,0 +1,240 @@
+"""Board geometry, rules and packed encoding for N x N puzzles.
+
+``Board(side)`` holds everything that depends on the board size, built once
+per size and shared (see ``get_board``):
+
+- ``goal_states``: the four goals of ``constants.make_goal_states(side)``
+- the move tables of ``packed._build_moves``: slides, adjacent pairs whose
+  tiles sum to N*N (``A{N*N}:i-j``, "A9" on 3x3) and the two corner
+  diagonals (``Diag:0-(N*N-1)`` and ``Diag:(N-1)-(N*N-N)``)
+- ``bits`` per cell: 4 up to 4x4, so 3x3 and 4x4 states fit in 64 bits;
+  5x5 needs 5 bits per cell (125-bit ints, still plain Python ints)
+- ``num_states = (N*N)!`` and the Lehmer ``rank``/``unrank``
+- ``canonical``: the smallest packed value under the symmetries of
+  ``symmetry.py`` (relabel ``x -> N*N - x``, rotate by 180 degrees), which
+  hold for every N
+- ``is_valid``/``validate``: the reachability precheck (below)
+
+Reachability: every permutation of 0..N*N-1 reaches a goal, so a state can
+reach one of the goals iff it is a valid permutation (an O(N*N) check, no
+table needed). Slides alone reach exactly one of the two classes "parity of
+the permutation + row distance of the blank" (the 15-puzzle theorem, N >= 3);
+a Diag swap is a transposition of two tiles that leaves the blank in place,
+so it moves between the two classes, and Diag is legal whenever both
+corners hold tiles. Hence the move graph is connected. The BFS of
+``distance_table.py`` confirms it for 3x3 (the histogram sums to 9!), as
+does a BFS of the 24 states of 2x2.
+
+The functions (``pack``, ``unpack``, ``blank_index``, ``swap``,
+``successors``, ``move_code``, ``apply_action``, ``rank``, ``unrank``,
+``canonical``) work like their ``packed.py`` counterparts. For 3x3 they
+*are* the ``packed``/``symmetry`` functions, so 3x3 keeps its specialised
+code paths; other sizes use the generic versions below.
+"""
+
+from __future__ import annotations
+
+from math import factorial, isqrt
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from . import packed as _packed
+from . import symmetry as _symmetry
+from .constants import make_goal_states
+
+
+class Board:
+    def __init__(self, side: int) -> None:
+        if side < 2:
+            raise ValueError(f"Board side must be at least 2, got {side}")
+        n = side * side
+        self.side = side
+        self.cells = n
+        self.bits = max(4, (n - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.pair_sum = n  # A{N*N} rule: adjacent tiles a, b with a + b == N*N
+        self.num_states = factorial(n)
+
+        (
+            self.move_labels, self.move_cells, self.slide_moves, self.pair_moves, self.diag_moves,
+        ) = _packed._build_moves(side, self.bits)
+        self.num_moves = len(self.move_labels)
+        self.inverse_moves = _packed._build_inverse(self.move_cells, self.slide_moves)
+
+        # Lowest / highest bit of every cell field (zero-field trick, field masks).
+        self.low_bits = sum(1 << (self.bits * i) for i in range(n))
+        self.high_bits = self.low_bits << (self.bits - 1)
+        # is_valid / validate: one bit per tile value, and the error message.
+        self._all_values = (1 << n) - 1
+        self._invalid = f"Not a valid {side}x{side} state (not a permutation of 0..{n - 1})"
+        self._fact = tuple(factorial(n - 1 - i) for i in range(n))
+        self._slide_codes = {
+            (self.move_cells[m][0], self.move_labels[m]): m for row in self.slide_moves for m, _, _ in row
+        }
+        self._pair_codes = {self.move_labels[m]: m for m, _, _ in self.pair_moves}
+        self._diag_codes = {self.move_labels[m]: m for m, _, _ in self.diag_moves}
+
+        if side == _packed.SIDE:
+            # 3x3: dùng lại các hàm chuyên biệt (bảng theo hàng 12 bit).
+            self.pack = _packed.pack
+            self.unpack = _packed.unpack
+            self.blank_index = _packed.blank_index
+            self.swap = _packed.swap
+            self.successors = _packed.successors
+            self.move_code = _packed.move_code
+            self.apply_action = _packed.apply_action
+            self.rank = _packed.rank
+            self.unrank = _packed.unrank
+            self.canonical = _symmetry.canonical
+
+        self.goal_states: Tuple[Tuple[int, ...], ...] = tuple(tuple(g) for g in make_goal_states(side))
+        self.goal_packed: FrozenSet[int] = frozenset(self.pack(g) for g in self.goal_states)
+        self.goal_blanks: Tuple[int, ...] = tuple(g.index(0) for g in self.goal_states)
+
+    def __repr__(self) -> str:
+        return f"Board({self.side})"
+
+    def __reduce__(self):
+        return get_board, (self.side,)
+
+    # Encoding -------------------------------------------------------------
+    def pack(self, tiles: Sequence[int]) -> int:
+        bits = self.bits
+        s = 0
+        for i, v in enumerate(tiles):
+            s |= v << (bits * i)
+        return s
+
+    def unpack(self, s: int) -> Tuple[int, ...]:
+        bits, mask = self.bits, self.mask
+        return tuple((s >> (bits * i)) & mask for i in range(self.cells))
+
+    def blank_index(self, s: int) -> int:
+        # Same zero-field trick as packed.blank_index, with bits-wide fields.
+        t = (s - self.low_bits) & ~s & self.high_bits
+        return ((t & -t).bit_length() - 1) // self.bits
+
+    def swap(self, s: int, i: int, j: int) -> int:
+        si, sj = self.bits * i, self.bits * j
+        x = ((s >> si) ^ (s >> sj)) & self.mask
+        return s ^ (x << si) ^ (x << sj)
+
+    def is_goal(self, s: int) -> bool:
+        return s in self.goal_packed
+
+    # Validity / reachability ----------------------------------------------
+    def is_valid(self, s: int) -> bool:
+        """``s`` encodes a permutation of 0..N*N-1, i.e. it can reach a goal."""
+        if not isinstance(s, int) or s < 0 or s >> (self.bits * self.cells):
+            return False
+        bits, mask = self.bits, self.mask
+        seen = 0
+        for i in range(self.cells):
+            seen |= 1 << ((s >> (bits * i)) & mask)
+        return seen == self._all_values
+
+    def validate(self, s: int) -> int:
+        """``s`` unchanged; ValueError unless it is a valid (hence solvable) state."""
+        if not self.is_valid(s):
+            in_range = isinstance(s, int) and 0 <= s and not s >> (self.bits * self.cells)
+            shown = self.unpack(s) if in_range else s
+            raise ValueError(f"{self._invalid}: {shown}")
+        return s
+
+    def validate_tiles(self, tiles: Sequence[int]) -> None:
+        """ValueError unless ``tiles`` is a permutation of 0..N*N-1."""
+        if len(tiles) != self.cells or sorted(tiles) != list(range(self.cells)):
+            raise ValueError(f"{self._invalid}: {tuple(tiles)}")
+
+    # Moves ----------------------------------------------------------------
+    def successors(self, s: int, include_special: bool = True) -> List[Tuple[int, int]]:
+        """``(child, move_code)`` pairs, in the order of ``packed.successors``."""
+        mask = self.mask
+        out: List[Tuple[int, int]] = []
+        for m, sb, sj in self.slide_moves[self.blank_index(s)]:
+            x = (s >> sj) & mask
+            out.append((s ^ (x << sb) ^ (x << sj), m))
+
+        if include_special:
+            total = self.pair_sum
+            for m, si, sj in self.pair_moves:
+                a = (s >> si) & mask
+                b = (s >> sj) & mask
+                # Tiles are < N*N, so a + b == N*N already excludes the blank.
+                if a + b == total:
+                    x = a ^ b
+                    out.append((s ^ (x << si) ^ (x << sj), m))
+            for m, si, sj in self.diag_moves:
+                a = (s >> si) & mask
+                b = (s >> sj) & mask
+                if a and b:
+                    x = a ^ b
+                    out.append((s ^ (x << si) ^ (x << sj), m))
+        return out
+
+    def move_code(self, s: int, label: str) -> int:
+        """Move code of action ``label`` in state ``s``; ValueError if not legal there."""
+        m = self._slide_codes.get((self.blank_index(s), label))
+        if m is not None:
+            return m
+        bits, mask = self.bits, self.mask
+        m = self._pair_codes.get(label)
+        if m is not None:
+            i, j = self.move_cells[m]
+            if ((s >> bits * i) & mask) + ((s >> bits * j) & mask) == self.pair_sum:
+                return m
+        else:
+            m = self._diag_codes.get(label)
+            if m is not None:
+                i, j = self.move_cells[m]
+                if (s >> bits * i) & mask and (s >> bits * j) & mask:
+                    return m
+        raise ValueError(f"Action {label!r} is not legal in state {self.unpack(s)}")
+
+    def apply_action(self, s: int, label: str) -> int:
+        return self.swap(s, *self.move_cells[self.move_code(s, label)])
+
+    # Ranking ----------------------------------------------------------------
+    def rank(self, s: int) -> int:
+        """Permutation rank (Lehmer code) in ``0 .. num_states - 1``."""
+        bits, mask, n = self.bits, self.mask, self.cells
+        r = 0
+        seen = 0
+        for i in range(n):
+            v = (s >> (bits * i)) & mask
+            r = r * (n - i) + v - (seen & ((1 << v) - 1)).bit_count()
+            seen |= 1 << v
+        return r
+
+    def unrank(self, r: int) -> int:
+        free = list(range(self.cells))
+        s = 0
+        for i, f in enumerate(self._fact):
+            q, r = divmod(r, f)
+            s |= free.pop(q) << (self.bits * i)
+        return s
+
+    # Symmetry -------------------------------------------------------------
+    def canonical(self, s: int) -> int:
+        tiles = self.unpack(s)
+        n = self.cells
+        relabelled = tuple(n - v if v else 0 for v in tiles)
+        return min(s, self.pack(relabelled), self.pack(tiles[::-1]), self.pack(relabelled[::-1]))
+
+
+_BOARDS: Dict[int, Board] = {}
+
+
+def get_board(side: int = _packed.SIDE) -> Board:
+    """Shared ``Board`` for ``side``; the tables are built on first use."""
+    board = _BOARDS.get(side)
+    if board is None:
+        board = _BOARDS[side] = Board(side)
+    return board
+
+
+def board_for_cells(cells: int) -> Board:
+    """Board with ``cells`` cells; ValueError unless it is a square of side >= 2."""
+    side = isqrt(cells)
+    if side < 2 or side * side != cells:
+        raise ValueError(f"A board needs N*N cells with N >= 2, got {cells}")
+    return get_board(side)
@@ -0,0 +1,181 @@
+"""Persistent solution cache keyed by symmetry class.
+
+``SolutionCache`` maps a start state to an optimal action list. Entries
+are keyed by the canonical state of the start's symmetry class (see
+``symmetry.py``) and stored in the canonical frame; a lookup for any
+member of the class maps the actions back into the caller's frame.
+
+- Memory: an LRU of at most ``capacity`` entries.
+- Disk (optional ``path``): an sqlite table ``solutions(state, actions)``
+  with the packed canonical state as primary key. Misses in the LRU fall
+  through to it, and hits are promoted into the LRU.
+
+``put`` stores the whole path: every suffix of an optimal path is optimal
+for the state it starts from, so a solution of depth d adds up to d + 1
+entries. ``hits``/``misses`` (and ``disk_hits``) count lookups, and
+``warm_start=True`` preloads the LRU from disk when the cache is opened.
+
+``strategies.solve_puzzle_problem(..., cache=...)`` puts the cache in
+front of the solvers.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from . import packed as _packed
+from .puzzle_state import PuzzleState
+from .symmetry import canonicalize, map_actions
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "solutions.sqlite")
+DEFAULT_CAPACITY = 100_000
+
+StateLike = Union[PuzzleState, int]
+SolveResult = Tuple[Optional[List[str]], int]
+
+_SEP = ","
+
+
+def _as_packed(state: StateLike) -> int:
+    return state if isinstance(state, int) else state.packed
+
+
+class SolutionCache:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = DEFAULT_CAPACITY,
+        warm_start: bool = False,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.path = path
+        self.capacity = capacity
+        self._lru: "OrderedDict[int, Tuple[str, ...]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0  # subset of hits answered from disk
+        self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # Not thread-safe, but usable from a thread other than its creator
+            # (the solve service keeps all cache calls on one worker thread).
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS solutions (state INTEGER PRIMARY KEY, actions TEXT NOT NULL)"
+            )
+            self._db.commit()
+            if warm_start:
+                self.warm()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> "SolutionCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def warm(self, limit: Optional[int] = None) -> int:
+        """Load up to ``limit`` (default ``capacity``) disk entries into the LRU."""
+        if self._db is None:
+            return 0
+        limit = self.capacity if limit is None else min(limit, self.capacity)
+        rows = self._db.execute("SELECT state, actions FROM solutions LIMIT ?", (limit,))
+        n = 0
+        for key, text in rows:
+            self._remember(key, tuple(text.split(_SEP)) if text else ())
+            n += 1
+        return n
+
+    def __len__(self) -> int:
+        """Number of stored entries (on disk if persistent, else in memory)."""
+        if self._db is not None:
+            return self._db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        return len(self._lru)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._lru),
+        }
+
+    def _remember(self, key: int, actions: Tuple[str, ...]) -> None:
+        lru = self._lru
+        lru[key] = actions
+        lru.move_to_end(key)
+        if len(lru) > self.capacity:
+            lru.popitem(last=False)
+
+    def _lookup(self, key: int) -> Optional[Tuple[str, ...]]:
+        actions = self._lru.get(key)
+        if actions is not None:
+            self._lru.move_to_end(key)
+            return actions
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT actions FROM solutions WHERE state = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        actions = tuple(row[0].split(_SEP)) if row[0] else ()
+        self._remember(key, actions)
+        self.disk_hits += 1
+        return actions
+
+    def __contains__(self, state: StateLike) -> bool:
+        key = canonicalize(_as_packed(state))[0]
+        return key in self._lru or (
+            self._db is not None
+            and self._db.execute("SELECT 1 FROM solutions WHERE state = ?", (key,)).fetchone() is not None
+        )
+
+    def get(self, state: StateLike) -> Optional[SolveResult]:
+        """``(actions, cost)`` for ``state`` in its own frame, or None."""
+        key, sym = canonicalize(_as_packed(state))
+        actions = self._lookup(key)
+        if actions is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return map_actions(sym, actions), len(actions)
+
+    def put(self, state: StateLike, actions: Sequence[str]) -> int:
+        """Store an optimal solution of ``state`` and of every state on its path.
+
+        Returns the number of entries written.
+        """
+        s = _as_packed(state)
+        rows: List[Tuple[int, str]] = []
+        for k in range(len(actions) + 1):
+            key, sym = canonicalize(s)
+            # Every symmetry is an involution, so the same map goes both ways.
+            stored = tuple(map_actions(sym, actions[k:]))
+            self._remember(key, stored)
+            rows.append((key, _SEP.join(stored)))
+            if k < len(actions):
+                s = _packed.apply_action(s, actions[k])
+        if self._db is not None:
+            with self._db:
+                self._db.executemany("INSERT OR IGNORE INTO solutions (state, actions) VALUES (?, ?)", rows)
+        return len(rows)
+
+
+_default_cache: Optional[SolutionCache] = None
+
+
+def get_solution_cache(
+    path: Optional[str] = DEFAULT_PATH, capacity: int = DEFAULT_CAPACITY, warm_start: bool = False
+) -> SolutionCache:
+    """Process-wide cache; arguments only apply to the first call."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SolutionCache(path, capacity, warm_start)
+    return _default_cache
@@ -0,0 +1,158 @@
+"""Binary checkpoints for long searches (see ``a_star_search(checkpoint=...)``).
+
+A checkpoint file is a small JSON header followed by raw sections:
+
+- ``array.array`` / ``bytearray`` tables are written with ``tofile`` and
+  read back with ``fromfile`` (one bulk copy each, no per-element work)
+- lists of ints that fit in 64 bits (packed states, keys) are stored as
+  ``array('Q')`` and come back as lists
+- anything else (PuzzleState objects, arbitrary actions) is pickled, so
+  packed-int problems are the cheap case
+
+Files are written to ``path + ".tmp"`` and renamed, so an interrupted write
+never replaces the previous checkpoint.
+
+``Checkpointer`` decides when to write: every ``interval`` seconds, and
+after SIGTERM (the handler only sets a flag; the search writes at its next
+safe point and stops with status "interrupted").
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import signal
+import struct
+import threading
+import time
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+MAGIC = b"TASK1CKP"
+VERSION = 1
+_HEADER = struct.Struct("<8sII")  # magic, version, JSON length
+
+
+def _encode(value: Any) -> Tuple[str, str, Any, int]:
+    """``(kind, typecode, payload, nbytes)`` of one section."""
+    if isinstance(value, array):
+        return "array", value.typecode, value, len(value) * value.itemsize
+    if isinstance(value, (bytes, bytearray)):
+        return "bytes", "", value, len(value)
+    if isinstance(value, list):
+        try:
+            packed = array("Q", value)
+        except (TypeError, OverflowError):
+            pass
+        else:
+            return "list", "Q", packed, len(packed) * packed.itemsize
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return "pickle", "", data, len(data)
+
+
+def save_checkpoint(path: str, meta: Dict[str, Any], sections: Dict[str, Any]) -> int:
+    """Write ``meta`` (JSON-serialisable) and ``sections``; returns the file size."""
+    encoded = [(name, *_encode(value)) for name, value in sections.items()]
+    header = dict(meta, sections=[[name, kind, tc, n] for name, kind, tc, _, n in encoded])
+    text = json.dumps(header).encode("utf-8")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(text)))
+        f.write(text)
+        for _, _, _, payload, _ in encoded:
+            if isinstance(payload, array):
+                payload.tofile(f)
+            else:
+                f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp, path)
+    return size
+
+
+def load_checkpoint(path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """``(meta, sections)`` of a file written by ``save_checkpoint``."""
+    with open(path, "rb") as f:
+        head = f.read(_HEADER.size)
+        if len(head) != _HEADER.size:
+            raise ValueError(f"{path}: not a checkpoint file")
+        magic, version, length = _HEADER.unpack(head)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a checkpoint file")
+        if version != VERSION:
+            raise ValueError(f"{path}: checkpoint version {version}, expected {VERSION}")
+        meta = json.loads(f.read(length).decode("utf-8"))
+        sections: Dict[str, Any] = {}
+        for name, kind, tc, n in meta.pop("sections"):
+            if kind in ("array", "list"):
+                a = array(tc)
+                try:
+                    a.fromfile(f, n // a.itemsize)
+                except EOFError:
+                    raise ValueError(f"{path}: truncated checkpoint (section {name!r})") from None
+                sections[name] = a.tolist() if kind == "list" else a
+                continue
+            data = f.read(n)
+            if len(data) != n:
+                raise ValueError(f"{path}: truncated checkpoint (section {name!r})")
+            sections[name] = bytearray(data) if kind == "bytes" else pickle.loads(data)
+    return meta, sections
+
+
+class Checkpointer:
+    """When to checkpoint: every ``interval`` seconds and/or on SIGTERM.
+
+    ``due(expanded)`` is called once per loop iteration; the clock is only
+    read every ``check_interval`` expansions. The SIGTERM handler is
+    installed by ``__enter__`` (main thread only) and the previous handler
+    restored by ``__exit__``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        interval: Optional[float] = None,
+        on_sigterm: bool = True,
+        check_interval: int = 1024,
+    ) -> None:
+        if interval is not None and interval <= 0:
+            raise ValueError("checkpoint interval must be > 0 seconds")
+        self.path = path
+        self.interval = interval
+        self.on_sigterm = on_sigterm
+        self.check_interval = check_interval
+        self.requested = False  # set by SIGTERM: write now, then stop
+        self.last = time.perf_counter()
+        self.written = 0  # checkpoints written
+        self.write_time = 0.0
+        self.last_size = 0
+        self._previous: Any = None
+
+    def __enter__(self) -> "Checkpointer":
+        if self.on_sigterm and threading.current_thread() is threading.main_thread():
+            self._previous = signal.signal(signal.SIGTERM, self._handle)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._previous is not None:
+            signal.signal(signal.SIGTERM, self._previous)
+            self._previous = None
+
+    def _handle(self, signum: int, frame: Any) -> None:
+        self.requested = True
+
+    def due(self, expanded: int) -> bool:
+        if self.requested:
+            return True
+        if self.interval is None or expanded % self.check_interval:
+            return False
+        return time.perf_counter() - self.last >= self.interval
+
+    def write(self, meta: Dict[str, Any], sections: Dict[str, Any]) -> None:
+        t0 = time.perf_counter()
+        self.last_size = save_checkpoint(self.path, meta, sections)
+        self.last = time.perf_counter()
+        self.write_time += self.last - t0
+        self.written += 1
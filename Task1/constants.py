@@ -1,10 +1,20 @@
 from typing import List
 
 
+def make_goal_states(side: int) -> List[List[int]]:
+    """Bốn goal của bàn ``side`` x ``side``: tăng/giảm dần, ô trống ở cuối hoặc ở đầu."""
+    tiles = list(range(1, side * side))
+    return [
+        tiles + [0],
+        tiles[::-1] + [0],
+        [0] + tiles,
+        [0] + tiles[::-1],
+    ]
+
+
 GOAL_STATES: List[List[int]] = [
     [1, 2, 3, 4, 5, 6, 7, 8, 0],
     [8, 7, 6, 5, 4, 3, 2, 1, 0],
     [0, 1, 2, 3, 4, 5, 6, 7, 8],
     [0, 8, 7, 6, 5, 4, 3, 2, 1],
 ]
-
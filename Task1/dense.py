@@ -0,0 +1,95 @@
+"""Dense, rank-indexed search tables.
+
+Instead of dicts keyed by state, ``DenseTables`` keeps one slot per state
+rank (see ``packed.rank``):
+
+- ``g``: ``bytearray``, 255 = not generated yet
+- ``parent``: ``array('i')`` of parent ranks (-1 for the start)
+- ``move``: ``bytearray`` of the move code that reached the state
+
+For the full 3x3 space (9! states) that is about 2.2 MB in total, however
+many states the search touches. There is no closed set: a popped entry
+is stale exactly when its g is above ``g[r]``, which also lets a state be
+re-opened when an inconsistent heuristic finds a cheaper path later.
+Larger boards (4x4 has 16! states) are beyond one slot per state;
+``DenseTables`` refuses sizes over ``MAX_STATES`` and those boards use
+dict storage.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Callable, Iterable, List, Tuple
+
+from . import packed as _packed
+
+UNSEEN = 255
+MAX_STATES = 1 << 31  # parent ranks are array('i') entries
+
+
+class DenseTables:
+    def __init__(self, size: int = _packed.NUM_STATES) -> None:
+        if size > MAX_STATES:
+            raise ValueError(f"Dense tables need one slot per state; {size} states exceed {MAX_STATES}")
+        self.size = size
+        self.g = bytearray([UNSEEN]) * size
+        self.parent = array("i", [-1]) * size
+        self.move = bytearray(size)
+
+    def record(self, r: int, g: int, parent: int, move: int) -> None:
+        self.g[r] = g
+        self.parent[r] = parent
+        self.move[r] = move
+
+    def moves_to(self, r: int) -> List[int]:
+        """Move codes from the start state to rank ``r``."""
+        moves: List[int] = []
+        parent = self.parent
+        move = self.move
+        while parent[r] != -1:
+            moves.append(move[r])
+            r = parent[r]
+        moves.reverse()
+        return moves
+
+    def ranks_to(self, r: int) -> List[int]:
+        """Ranks along the path from the start state to rank ``r`` (inclusive)."""
+        ranks = [r]
+        parent = self.parent
+        while parent[r] != -1:
+            r = parent[r]
+            ranks.append(r)
+        ranks.reverse()
+        return ranks
+
+    def replay(
+        self,
+        r: int,
+        start: Any,
+        successors: Callable[[Any, int], Iterable[Tuple[Any, Any]]],
+        index: Callable[[Any], int],
+    ) -> List[Tuple[Any, Any]]:
+        """``(state, move)`` steps from ``start`` through the slots of ``ranks_to(r)``.
+
+        For slots keyed by symmetry class, where ``moves_to`` is not enough:
+        a slot's move is relative to whichever member of the parent's class
+        was expanded when it was recorded, and if that slot is re-opened
+        later from another member (inconsistent heuristic) the codes no
+        longer chain. Each step here takes the successor (``successors(state,
+        depth)`` -> ``(child, move)``) whose ``index`` is the next slot; the
+        symmetries map moves onto moves, so one always exists.
+        """
+        steps: List[Tuple[Any, Any]] = []
+        state = start
+        for depth, nxt in enumerate(self.ranks_to(r)[1:]):
+            for child, move in successors(state, depth):
+                if index(child) == nxt:
+                    break
+            else:
+                raise RuntimeError(f"Dense tables: no move from {state!r} into slot {nxt}")
+            steps.append((child, move))
+            state = child
+        return steps
+
+    def nbytes(self) -> int:
+        return len(self.g) + self.parent.itemsize * len(self.parent) + len(self.move)
@@ -0,0 +1,209 @@
+"""Exact goal distances for the whole 3x3 state space.
+
+``build_distance_table`` runs one multi-source BFS from all ``GOAL_STATES``
+and writes one byte per state, indexed by permutation rank (9! bytes,
+about 355 KB). Every move is its own inverse, so distances *from* the goal
+set are distances *to* it. With NumPy installed the BFS runs a layer at a
+time in ``vectorized.distance_table`` (same bytes, several times faster).
+
+``DistanceTable`` memory-maps that file; ``solve`` returns an optimal
+solution by greedy descent (pick any successor one step closer), which is
+O(depth) with no search at all.
+"""
+
+from __future__ import annotations
+
+# Allow running this file directly without package context
+if __name__ == "__main__" and (__package__ is None or __package__ == ""):
+    import os as _os, sys as _sys
+    _pkg_dir = _os.path.dirname(_os.path.abspath(__file__))
+    _parent = _os.path.dirname(_pkg_dir)
+    if _parent not in _sys.path:
+        _sys.path.insert(0, _parent)
+    __package__ = _os.path.basename(_pkg_dir)
+
+import mmap
+import os
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from . import packed as _packed
+from . import vectorized as _vectorized
+from .board import get_board
+from .puzzle_state import PuzzleState
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "distances.bin")
+UNREACHABLE = 255
+_BOARD = get_board()
+
+
+def _as_packed(state: Union[PuzzleState, int]) -> int:
+    return state if isinstance(state, int) else state.packed
+
+
+def build_distance_table(path: str = DEFAULT_PATH, vectorized: Optional[bool] = None) -> List[int]:
+    """Build the table and write it to ``path``.
+
+    ``vectorized``: use the NumPy BFS (default: when NumPy is installed).
+    Returns the depth histogram (number of states at each distance).
+    """
+    if vectorized is None:
+        vectorized = _vectorized.HAVE_NUMPY
+    if vectorized:
+        array, histogram = _vectorized.distance_table()
+        _write(path, array.tobytes())
+        return histogram
+
+    dist: Dict[int, int] = {g: 0 for g in _packed.GOAL_PACKED}
+    frontier = list(dist)
+    depth = 0
+    histogram = [len(frontier)]
+    successors = _packed.successors
+    while frontier:
+        depth += 1
+        nxt: List[int] = []
+        for s in frontier:
+            for child, _ in successors(s):
+                if child not in dist:
+                    dist[child] = depth
+                    nxt.append(child)
+        if nxt:
+            histogram.append(len(nxt))
+        frontier = nxt
+
+    table = bytearray([UNREACHABLE]) * _packed.NUM_STATES
+    rank = _packed.rank
+    for s, d in dist.items():
+        table[rank(s)] = d
+    _write(path, table)
+    return histogram
+
+
+def _write(path: str, table: bytes) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(table)
+    os.replace(tmp, path)
+
+
+class DistanceTable:
+    """Read-only, memory-mapped view of a file written by ``build_distance_table``."""
+
+    def __init__(self, path: str = DEFAULT_PATH, build_if_missing: bool = True) -> None:
+        if not os.path.exists(path):
+            if not build_if_missing:
+                raise FileNotFoundError(path)
+            build_distance_table(path)
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) != _packed.NUM_STATES:
+            self._mm.close()
+            raise ValueError(f"{path}: expected {_packed.NUM_STATES} bytes, got {len(self._mm)}")
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def distance(self, state: Union[PuzzleState, int]) -> Optional[int]:
+        d = self._mm[_packed.rank(_as_packed(state))]
+        return None if d == UNREACHABLE else d
+
+    def heuristic(self, state: Union[PuzzleState, int]) -> int:
+        """Perfect heuristic h*(state)."""
+        return self._mm[_packed.rank(_as_packed(state))]
+
+    def descent(self, state: Union[PuzzleState, int]) -> Optional[List[Tuple[int, int]]]:
+        """Optimal path as ``(next_state, move_code)`` steps, or None if unreachable."""
+        mm = self._mm
+        rank = _packed.rank
+        s = _BOARD.validate(_as_packed(state))
+        d = mm[rank(s)]
+        if d == UNREACHABLE:
+            return None
+
+        steps: List[Tuple[int, int]] = []
+        while d > 0:
+            for child, m in _packed.successors(s):
+                if mm[rank(child)] == d - 1:
+                    steps.append((child, m))
+                    s = child
+                    d -= 1
+                    break
+            else:  # pragma: no cover - only on a corrupt table
+                raise ValueError(f"{self.path}: no successor one step closer to a goal")
+        return steps
+
+    def solve(self, state: Union[PuzzleState, int]) -> Tuple[Optional[List[str]], int]:
+        steps = self.descent(state)
+        if steps is None:
+            return None, 0
+        labels = _packed.MOVE_LABELS
+        return [labels[m] for _, m in steps], len(steps)
+
+
+_default_table: Optional[DistanceTable] = None
+
+
+def get_distance_table() -> DistanceTable:
+    """Shared instance over ``DEFAULT_PATH``, built on first use if needed."""
+    global _default_table
+    if _default_table is None:
+        _default_table = DistanceTable(DEFAULT_PATH)
+    return _default_table
+
+
+def check_heuristic(
+    h: Callable[[int], int],
+    table: Optional[DistanceTable] = None,
+    consistency: bool = False,
+) -> Dict[str, float]:
+    """Compare ``h`` (called on packed states) with the exact distances.
+
+    Reports admissibility violations (h > h*), the mean and max gap h* - h,
+    and, with ``consistency=True``, edges where |h(u) - h(v)| > 1.
+    """
+    table = table or get_distance_table()
+    mm = table._mm
+    unrank = _packed.unrank
+    states = 0
+    violations = 0
+    inconsistent = 0
+    gap_sum = 0
+    max_gap = 0
+    for r in range(_packed.NUM_STATES):
+        d = mm[r]
+        if d == UNREACHABLE:
+            continue
+        s = unrank(r)
+        hv = h(s)
+        states += 1
+        if hv > d:
+            violations += 1
+        gap = d - hv
+        gap_sum += gap
+        if gap > max_gap:
+            max_gap = gap
+        if consistency:
+            for child, _ in _packed.successors(s):
+                if abs(hv - h(child)) > 1:
+                    inconsistent += 1
+    report: Dict[str, float] = {
+        "states": states,
+        "admissible": violations == 0,
+        "violations": violations,
+        "mean_gap": gap_sum / states if states else 0.0,
+        "max_gap": max_gap,
+    }
+    if consistency:
+        report["inconsistent_edges"] = inconsistent
+    return report
+
+
+if __name__ == "__main__":
+    import time
+
+    t0 = time.perf_counter()
+    hist = build_distance_table()
+    print(f"Wrote {DEFAULT_PATH} in {time.perf_counter() - t0:.2f}s")
+    for depth, count in enumerate(hist):
+        print(f"  depth {depth:2d}: {count}")
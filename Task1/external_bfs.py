@@ -0,0 +1,451 @@
+"""External-memory breadth-first search with delayed duplicate detection.
+
+For state spaces whose visited set does not fit in RAM (4x4 has 16! states)
+``external_bfs`` keeps only bounded buffers in memory and the layers on
+disk:
+
+- a layer is a file of sorted, distinct packed states (native uint64, as
+  ``array('Q')``, so boards up to 4x4)
+- layer d is streamed in blocks; the children of a block go into a buffer
+  of at most ``memory`` bytes, which is sorted, deduplicated and written
+  as a run file when full
+- the runs are k-way merged (at most ``fan_in`` files open at once, more
+  passes if needed) and the merged stream is subtracted from layers d and
+  d - 1 in the same pass. Every move is its own inverse, so a child of
+  layer d lies in layer d - 1, d or d + 1 and the two previous layers are
+  enough to drop every duplicate (frontier search); older layers are
+  deleted unless ``keep_layers``.
+
+Duplicates are thus detected late, once per layer, by sequential merges
+instead of a lookup per generated state. The result holds the depth
+histogram. ``index`` also writes a rank-indexed distance file (one byte per
+state, the format of ``distance_table.py``: for 3x3 it is byte-identical
+to ``data/distances.bin``); for boards too large for that, ``LayerIndex``
+looks distances up by binary search in the kept layer files. With NumPy
+installed, block expansion and run sorting use ``vectorized.py``.
+
+``python -m Task1.external_bfs --side 3 --workdir DIR [--memory 64M] ...``
+"""
+
+from __future__ import annotations
+
+# Allow running this file directly without package context
+if __name__ == "__main__" and (__package__ is None or __package__ == ""):
+    import os as _os, sys as _sys
+    _pkg_dir = _os.path.dirname(_os.path.abspath(__file__))
+    _parent = _os.path.dirname(_pkg_dir)
+    if _parent not in _sys.path:
+        _sys.path.insert(0, _parent)
+    __package__ = _os.path.basename(_pkg_dir)
+
+import bisect
+import glob
+import heapq
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from array import array
+from dataclasses import dataclass, field
+from itertools import groupby, islice
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from . import vectorized as _vectorized
+from .board import Board, get_board
+
+DEFAULT_MEMORY = 64 << 20
+UNREACHABLE = 255
+# Peak bytes per buffered state: the array('Q') slot plus the sorted list
+# and its int objects (NumPy needs less, see _Runs.flush).
+_BYTES_PER_STATE = 48
+_END = 1 << 64  # above every packed state
+
+ProgressFn = Callable[[int, int], None]
+
+
+@dataclass
+class ExternalBFSResult:
+    histogram: List[int] = field(default_factory=list)  # states at each depth
+    runs: int = 0  # sorted run files written
+    merge_passes: int = 0  # extra passes when a layer had more than fan_in runs
+    bytes_written: int = 0
+    seconds: float = 0.0
+    workdir: Optional[str] = None  # where kept layers live (keep_layers=True)
+
+    @property
+    def states(self) -> int:
+        return sum(self.histogram)
+
+
+def _layer_path(workdir: str, depth: int) -> str:
+    return os.path.join(workdir, f"layer_{depth:03d}.bin")
+
+
+def _read(path: str, block: int) -> Iterator[int]:
+    """Packed states of a file, ``block`` at a time from disk."""
+    with open(path, "rb") as f:
+        while True:
+            buf = array("Q")
+            try:
+                buf.fromfile(f, block)
+            except EOFError:  # the short last block is still read
+                yield from buf
+                return
+            yield from buf
+
+
+def _write(path: str, items: Iterable[int], block: int) -> int:
+    """Write ``items`` in blocks; returns the number written."""
+    items = iter(items)
+    count = 0
+    with open(path, "wb") as f:
+        while True:
+            buf = array("Q", islice(items, block))
+            if not buf:
+                return count
+            buf.tofile(f)
+            count += len(buf)
+
+
+def _unique(items: Iterable[int]) -> Iterator[int]:
+    """Drop repeats from an ascending stream."""
+    return (k for k, _ in groupby(items))
+
+
+def _minus(items: Iterable[int], seen: Iterable[int]) -> Iterator[int]:
+    """``items`` without the states of ``seen`` (both ascending)."""
+    seen = iter(seen)
+    nxt = next(seen, _END)
+    for s in items:
+        while nxt < s:
+            nxt = next(seen, _END)
+        if s != nxt:
+            yield s
+
+
+def _check_board(board: Board) -> None:
+    if board.cells * board.bits > 64:
+        raise ValueError(f"Packed states of {board!r} do not fit in 64 bits")
+
+
+class _Runs:
+    """Sorted run files of one layer's children."""
+
+    def __init__(self, workdir: str, depth: int, result: ExternalBFSResult, numpy: bool) -> None:
+        self.workdir = workdir
+        self.depth = depth
+        self.result = result
+        self.numpy = numpy
+        self.paths: List[str] = []
+
+    def _path(self) -> str:
+        return os.path.join(self.workdir, f"run_{self.depth:03d}_{len(self.paths):05d}.bin")
+
+    def flush(self, buf) -> None:
+        """Sort, deduplicate and write ``buf`` (array('Q') or a list of uint64 arrays)."""
+        path = self._path()
+        if self.numpy:
+            np = _vectorized.np
+            keys = np.unique(np.concatenate(buf))
+            keys.tofile(path)
+            count = len(keys)
+        else:
+            count = _write(path, _unique(sorted(buf)), 1 << 16)
+        self.paths.append(path)
+        self.result.runs += 1
+        self.result.bytes_written += 8 * count
+
+    def merged(self, block: int, fan_in: int) -> Iterator[int]:
+        """Ascending, distinct children of the layer; merges down to ``fan_in`` runs first."""
+        level = 0
+        while len(self.paths) > fan_in:
+            self.result.merge_passes += 1
+            level += 1
+            merged: List[str] = []
+            for k in range(0, len(self.paths), fan_in):
+                group = self.paths[k:k + fan_in]
+                path = os.path.join(self.workdir, f"merge_{self.depth:03d}_{level}_{len(merged):05d}.bin")
+                count = _write(path, _unique(heapq.merge(*(_read(p, block) for p in group))), block)
+                self.result.bytes_written += 8 * count
+                for p in group:
+                    os.remove(p)
+                merged.append(path)
+            self.paths = merged
+        return _unique(heapq.merge(*(_read(p, block) for p in self.paths)))
+
+    def remove(self) -> None:
+        for p in self.paths:
+            os.remove(p)
+        self.paths = []
+
+
+def _expand_layer(path: str, board: Board, runs: _Runs, run_states: int, block: int) -> None:
+    """Children of every state of ``path`` into sorted runs of at most ``run_states`` states."""
+    # Flush before a block could overflow the buffer: at most fanout children per state.
+    fanout = max(map(len, board.slide_moves)) + len(board.pair_moves) + len(board.diag_moves)
+    limit = max(run_states - block * fanout, 1)
+    parents = _read(path, block)
+    if runs.numpy:
+        vec = _vectorized
+        np = vec.np
+        bufs: list = []
+        size = 0
+        while True:
+            chunk = array("Q", islice(parents, block))
+            if not chunk:
+                break
+            children = vec.expand(vec.to_array(chunk, board), board)[0]
+            bufs.append(np.unique(vec.keys(children, board)))
+            size += len(bufs[-1])
+            if size >= limit:
+                runs.flush(bufs)
+                bufs, size = [], 0
+        if bufs:
+            runs.flush(bufs)
+        return
+
+    successors = board.successors
+    buf = array("Q")
+    add = buf.append
+    count = 0
+    for s in parents:
+        for child, _ in successors(s):
+            add(child)
+        count += 1
+        if count == block:
+            count = 0
+            if len(buf) >= limit:
+                runs.flush(buf)
+                buf = array("Q")
+                add = buf.append
+    if buf:
+        runs.flush(buf)
+
+
+class _RankIndex:
+    """Rank-indexed distance file (one byte per state), filled layer by layer."""
+
+    def __init__(self, path: str, board: Board, numpy: bool) -> None:
+        if board.num_states > 1 << 32:
+            raise ValueError(
+                f"A rank-indexed table of {board!r} needs {board.num_states} bytes; use keep_layers and LayerIndex"
+            )
+        self.board = board
+        self.numpy = numpy
+        self.tmp = path + ".tmp"
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(self.tmp, "wb") as f:
+            chunk = bytes([UNREACHABLE]) * (1 << 20)
+            left = board.num_states
+            while left:
+                f.write(chunk[:min(left, len(chunk))])
+                left -= min(left, len(chunk))
+        self.f = open(self.tmp, "r+b")
+        self.mm = mmap.mmap(self.f.fileno(), 0)
+
+    def add_layer(self, path: str, depth: int, block: int) -> None:
+        if depth >= UNREACHABLE:
+            raise ValueError(f"Depth {depth} does not fit in a one-byte distance table")
+        if self.numpy:
+            vec = _vectorized
+            np = vec.np
+            table = np.frombuffer(self.mm, dtype=np.uint8)
+            for chunk in _blocks(path, block):
+                table[vec.ranks(vec.to_array(chunk, self.board), self.board)] = depth
+            del table  # release the buffer export before the mmap is closed
+            return
+        mm, rank = self.mm, self.board.rank
+        for s in _read(path, block):
+            mm[rank(s)] = depth
+
+    def close(self, keep: bool = True) -> None:
+        self.mm.flush()
+        self.mm.close()
+        self.f.close()
+        if keep:
+            os.replace(self.tmp, self.path)
+        else:
+            os.remove(self.tmp)
+
+
+def _blocks(path: str, block: int) -> Iterator[array]:
+    states = _read(path, block)
+    while True:
+        chunk = array("Q", islice(states, block))
+        if not chunk:
+            return
+        yield chunk
+
+
+def external_bfs(
+    board: Optional[Board] = None,
+    starts: Optional[Iterable[int]] = None,
+    workdir: Optional[str] = None,
+    memory: int = DEFAULT_MEMORY,
+    *,
+    fan_in: int = 64,
+    max_depth: Optional[int] = None,
+    index: Optional[str] = None,
+    keep_layers: bool = False,
+    vectorized: Optional[bool] = None,
+    progress: Optional[ProgressFn] = None,
+) -> ExternalBFSResult:
+    """Breadth-first layers from ``starts`` (default: the goals), on disk.
+
+    - memory: bytes for the in-memory child buffer (the sorted runs); reads
+      and writes go through blocks of a small fraction of it
+    - workdir: where layer and run files go (default: a temporary directory,
+      removed at the end); needed with ``keep_layers``
+    - fan_in: most run files merged at once
+    - max_depth: stop after this layer
+    - index: path of a rank-indexed distance file to write (see module doc)
+    - vectorized: use NumPy (default: when installed)
+    - progress(depth, count): called after each layer is written
+    """
+    board = board or get_board()
+    _check_board(board)
+    if memory < _BYTES_PER_STATE * 1024:
+        raise ValueError(f"memory must be at least {_BYTES_PER_STATE * 1024} bytes")
+    if fan_in < 2:
+        raise ValueError("fan_in must be >= 2")
+    if keep_layers and workdir is None:
+        raise ValueError("keep_layers needs a workdir")
+    if vectorized is None:
+        vectorized = _vectorized.HAVE_NUMPY
+    elif vectorized:
+        _vectorized._require()
+    run_states = memory // _BYTES_PER_STATE
+    block = max(run_states // 64, 256)
+    starts = board.goal_packed if starts is None else [board.validate(s) for s in starts]
+
+    t0 = time.perf_counter()
+    own_dir = workdir is None
+    if own_dir:
+        workdir = tempfile.mkdtemp(prefix="external_bfs_")
+    else:
+        os.makedirs(workdir, exist_ok=True)
+    result = ExternalBFSResult(workdir=workdir if keep_layers else None)
+    table = _RankIndex(index, board, vectorized) if index is not None else None
+    done = False
+    try:
+        count = _write(_layer_path(workdir, 0), sorted(set(starts)), block)
+        result.bytes_written += 8 * count
+        depth = 0
+        while count:
+            result.histogram.append(count)
+            if table is not None:
+                table.add_layer(_layer_path(workdir, depth), depth, block)
+            if progress is not None:
+                progress(depth, count)
+            if max_depth is not None and depth >= max_depth:
+                break
+
+            current = _layer_path(workdir, depth)
+            runs = _Runs(workdir, depth + 1, result, vectorized)
+            _expand_layer(current, board, runs, run_states, block)
+            old = _read(current, block)
+            if depth:
+                old = heapq.merge(old, _read(_layer_path(workdir, depth - 1), block))
+            children = runs.merged(block, fan_in)
+            count = _write(_layer_path(workdir, depth + 1), _minus(children, old), block)
+            result.bytes_written += 8 * count
+            runs.remove()
+            if depth and not keep_layers:
+                os.remove(_layer_path(workdir, depth - 1))
+            depth += 1
+        if not count and not keep_layers:
+            os.remove(_layer_path(workdir, depth))  # the empty layer past the last one
+        done = True
+    finally:
+        if table is not None:
+            table.close(keep=done)
+        if own_dir:
+            shutil.rmtree(workdir, ignore_errors=True)
+        elif not keep_layers:
+            for p in glob.glob(os.path.join(workdir, "layer_*.bin")) + glob.glob(os.path.join(workdir, "run_*.bin")):
+                os.remove(p)
+    result.seconds = time.perf_counter() - t0
+    return result
+
+
+class LayerIndex:
+    """Distances by binary search in the layer files kept by ``external_bfs``.
+
+    Each layer file is memory-mapped, so only the pages a lookup touches
+    are read.
+    """
+
+    def __init__(self, workdir: str) -> None:
+        self.workdir = workdir
+        self._maps: List[mmap.mmap] = []
+        self._layers: List[Optional[memoryview]] = []
+        paths = sorted(glob.glob(os.path.join(workdir, "layer_*.bin")))
+        if not paths:
+            raise FileNotFoundError(f"No layer files in {workdir}")
+        for depth, path in enumerate(paths):
+            if path != _layer_path(workdir, depth):
+                raise ValueError(f"{workdir}: layer files are not consecutive from depth 0")
+            if not os.path.getsize(path):
+                self._layers.append(None)
+                continue
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mm)
+            self._layers.append(memoryview(mm).cast("Q"))
+
+    def close(self) -> None:
+        for view in self._layers:
+            if view is not None:
+                view.release()
+        for mm in self._maps:
+            mm.close()
+
+    @property
+    def histogram(self) -> List[int]:
+        return [len(view) if view is not None else 0 for view in self._layers]
+
+    def distance(self, s: int) -> Optional[int]:
+        """Depth of packed ``s``, or None if no kept layer holds it."""
+        for depth, view in enumerate(self._layers):
+            if view is None:
+                continue
+            i = bisect.bisect_left(view, s)
+            if i < len(view) and view[i] == s:
+                return depth
+        return None
+
+
+def _parse_size(text: str) -> int:
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="External-memory BFS from the goals (depth histogram)")
+    parser.add_argument("--side", type=int, default=3)
+    parser.add_argument("--workdir", default=None, help="Directory for layer/run files (default: a temp dir)")
+    parser.add_argument("--memory", type=_parse_size, default=DEFAULT_MEMORY, help="Buffer size, e.g. 64M, 1G")
+    parser.add_argument("--fan-in", type=int, default=64)
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--index", default=None, help="Write a rank-indexed distance file here")
+    parser.add_argument("--keep-layers", action="store_true", help="Keep layer files (for LayerIndex)")
+    parser.add_argument("--no-numpy", action="store_true")
+    args = parser.parse_args()
+
+    res = external_bfs(
+        get_board(args.side), workdir=args.workdir, memory=args.memory, fan_in=args.fan_in,
+        max_depth=args.max_depth, index=args.index, keep_layers=args.keep_layers,
+        vectorized=False if args.no_numpy else None,
+        progress=lambda d, c: print(f"  depth {d:2d}: {c}", flush=True),
+    )
+    print(
+        f"{res.states} states in {len(res.histogram)} layers, {res.seconds:.2f}s, "
+        f"{res.runs} runs, {res.merge_passes} extra merge passes, {res.bytes_written / 2**20:.1f} MiB written"
+    )
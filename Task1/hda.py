@@ -0,0 +1,387 @@
+"""
+Hash-distributed A* (HDA*) over worker processes.
+
+Same problem/heuristic interface as a_star_search (search.py); the problem,
+heuristic (``StateHeuristic`` wraps a one-argument h), states and actions
+must be picklable, and packed ints (``PuzzleProblem(int)``) are
+by far the cheapest to send. Each worker owns the states whose hash maps
+to it and keeps its own open list and g/parent table for them:
+
+- a worker pops its best local node, expands it and sends every child to
+  the child's owner, in batches of up to ``batch_size`` per destination
+  (flushed at the latest after every ``chunk`` expansions);
+- the owner drops a child unless it improves the recorded g, so a state
+  can be re-opened when a cheaper path arrives later (open lists are only
+  ordered locally);
+- popping a goal updates a shared incumbent cost; nodes with
+  f >= incumbent are discarded.
+
+Termination (optimality): the search is over when every worker is idle
+(no open node with f < incumbent, nothing left to send) and no batch is
+in flight. The coordinator checks this with counters of sent/received
+batches per worker and only stops after two consecutive identical
+snapshots (all idle, sent == received), so a batch that was in flight
+during the first snapshot is always seen. At that point every open node
+has f >= incumbent, so with an admissible heuristic the incumbent is
+optimal. The path is then traced back owner by owner.
+
+``worker_stats`` (a list to fill, like ``metrics``) receives one
+``WorkerStats`` per worker: expansions, traffic, and utilisation (busy
+time / wall time). See ``benchmark.py hda`` for speedup and scaling
+efficiency against serial A*.
+"""
+
+from __future__ import annotations
+
+import heapq
+import multiprocessing as mp
+import os
+import queue
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .search import SearchBudget, SearchMetrics, heuristic_id
+
+_INF = 1 << 62
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15  # Fibonacci hashing multiplier
+
+
+def owner_of(state: Any, workers: int) -> int:
+    """Worker that owns ``state``: multiplicative hash of the packed int."""
+    h = state if isinstance(state, int) else hash(state)
+    return (((h * _GOLDEN) & _MASK64) >> 32) % workers
+
+
+class StateHeuristic:
+    """``heuristic(state, problem)`` from a one-argument ``h(state)``.
+
+    Workers get the heuristic by pickling under the spawn and forkserver
+    start methods, where a lambda or local function cannot be sent.
+    """
+
+    __slots__ = ("h",)
+
+    def __init__(self, h) -> None:
+        self.h = h
+
+    def __repr__(self) -> str:
+        return f"StateHeuristic({heuristic_id(self.h)})"
+
+    def __call__(self, state: Any, problem: Any) -> int:
+        return self.h(state)
+
+
+@dataclass
+class WorkerStats:
+    worker: int
+    expanded: int = 0
+    generated: int = 0  # children that improved g (local or received)
+    reopened: int = 0  # of which already had a worse g
+    duplicates: int = 0  # children dropped (no better g)
+    sent_states: int = 0
+    sent_batches: int = 0
+    received_states: int = 0
+    table_size: int = 0
+    busy_time: float = 0.0  # expanding and processing batches
+    wall_time: float = 0.0
+
+    @property
+    def utilization(self) -> float:
+        return self.busy_time / self.wall_time if self.wall_time else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["utilization"] = self.utilization
+        return d
+
+
+class _Shared:
+    """Counters in shared memory; each worker only writes its own slots."""
+
+    def __init__(self, ctx, workers: int) -> None:
+        self.idle = ctx.Array("b", workers, lock=False)
+        self.sent = ctx.Array("q", workers, lock=False)
+        self.received = ctx.Array("q", workers, lock=False)
+        self.expanded = ctx.Array("q", workers, lock=False)
+        self.best = ctx.Value("q", _INF)  # incumbent cost, with a lock
+        self.stop = ctx.Value("b", 0, lock=False)
+
+    def snapshot(self) -> Tuple[bool, int, int]:
+        return all(self.idle), sum(self.sent), sum(self.received)
+
+
+def _worker(
+    wid: int,
+    problem,
+    heuristic,
+    inboxes: List[Any],
+    results: Any,
+    shared: _Shared,
+    batch_size: int,
+    chunk: int,
+) -> None:
+    t_start = time.perf_counter()
+    perf = time.perf_counter
+    n = len(inboxes)
+    inbox = inboxes[wid]
+    stats = WorkerStats(wid)
+    g_table: Dict[Any, int] = {}
+    parent: Dict[Any, Optional[Tuple[Any, Any]]] = {}
+    open_: List[Tuple[int, int, int, Any]] = []  # (f, -g, tie, state): deepest first on ties
+    tie = 0
+    out: List[List[Tuple[Any, int, Any, Any]]] = [[] for _ in range(n)]
+    idle, sent, received = shared.idle, shared.sent, shared.received
+    best_v = shared.best
+
+    def relax(state, g: int, par, action) -> None:
+        nonlocal tie
+        old = g_table.get(state)
+        if old is not None and old <= g:
+            stats.duplicates += 1
+            return
+        if old is not None:
+            stats.reopened += 1
+        g_table[state] = g
+        parent[state] = None if par is None else (par, action)
+        stats.generated += 1
+        tie += 1
+        heapq.heappush(open_, (g + heuristic(state, problem), -g, tie, state))
+
+    def flush(dest: int) -> None:
+        batch = out[dest]
+        out[dest] = []
+        sent[wid] += 1
+        stats.sent_batches += 1
+        stats.sent_states += len(batch)
+        inboxes[dest].put(("batch", batch))
+
+    def handle(msg) -> None:
+        kind = msg[0]
+        if kind == "batch":
+            # Busy before the batch counts as received (see the termination check).
+            idle[wid] = 0
+            t0 = perf()
+            for state, g, par, action in msg[1]:
+                relax(state, g, par, action)
+            stats.received_states += len(msg[1])
+            received[wid] += 1
+            stats.busy_time += perf() - t0
+        elif kind == "trace":
+            state = msg[1]
+            results.put(("trace", state, parent.get(state)))
+
+    start = problem.get_initial_state()
+    if owner_of(start, n) == wid:
+        relax(start, 0, None, None)
+
+    while not shared.stop.value:
+        while True:
+            try:
+                msg = inbox.get_nowait()
+            except queue.Empty:
+                break
+            handle(msg)
+
+        best = best_v.value
+        t0 = perf()
+        expanded = 0
+        while open_ and expanded < chunk:
+            f, neg_g, _, s = open_[0]
+            if f >= best:
+                # Nothing here can beat the incumbent, now or later.
+                open_.clear()
+                break
+            heapq.heappop(open_)
+            g = -neg_g
+            if g > g_table[s]:
+                continue
+            if problem.is_goal(s):
+                with best_v.get_lock():
+                    if g < best_v.value:
+                        best_v.value = g
+                        results.put(("goal", g, s))
+                best = best_v.value
+                continue
+            expanded += 1
+            g1 = g + 1
+            for action, child in problem.get_successors(s, g):
+                dest = owner_of(child, n)
+                if dest == wid:
+                    relax(child, g1, s, action)
+                else:
+                    buf = out[dest]
+                    buf.append((child, g1, s, action))
+                    if len(buf) >= batch_size:
+                        flush(dest)
+        for dest in range(n):
+            if out[dest]:
+                flush(dest)
+        if expanded:
+            stats.expanded += expanded
+            shared.expanded[wid] = stats.expanded
+            stats.busy_time += perf() - t0
+
+        if not open_ or open_[0][0] >= best_v.value:
+            idle[wid] = 1
+            try:
+                msg = inbox.get(timeout=0.002)
+            except queue.Empty:
+                continue
+            handle(msg)
+
+    stats.table_size = len(g_table)
+    stats.wall_time = time.perf_counter() - t_start
+    results.put(("stats", stats))
+    # Batches left for stopped workers (budget stop) must not block exit.
+    for q in inboxes:
+        q.cancel_join_thread()
+
+
+def hda_star_search(
+    problem,
+    heuristic,
+    workers: Optional[int] = None,
+    *,
+    batch_size: int = 256,
+    chunk: int = 64,
+    metrics: Optional[SearchMetrics] = None,
+    budget: Optional[SearchBudget] = None,
+    worker_stats: Optional[List[WorkerStats]] = None,
+):
+    """HDA* with ``workers`` processes (default ``os.cpu_count()``); returns ``(actions, cost)``.
+
+    ``budget``: max_expanded and max_seconds are enforced (checked by the
+    coordinator, so they may overshoot by a few chunks); max_memory_bytes
+    is not.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    if batch_size < 1 or chunk < 1:
+        raise ValueError("batch_size and chunk must be >= 1")
+    if metrics is None:
+        metrics = SearchMetrics()
+    else:
+        metrics.reset()
+    t0 = time.perf_counter()
+    ctx = mp.get_context()
+    shared = _Shared(ctx, workers)
+    inboxes = [ctx.Queue() for _ in range(workers)]
+    results = ctx.Queue()
+    procs: List[Any] = []  # started workers only
+    best_cost, best_goal = _INF, None
+    status = None
+    previous = None
+    traced: Dict[Any, Optional[Tuple[Any, Any]]] = {}
+    stats: List[WorkerStats] = []
+
+    def drain(block: bool = False) -> None:
+        nonlocal best_cost, best_goal
+        while True:
+            try:
+                msg = results.get(timeout=1.0) if block else results.get_nowait()
+            except queue.Empty:
+                return
+            block = False
+            if msg[0] == "goal" and msg[1] < best_cost:
+                best_cost, best_goal = msg[1], msg[2]
+            elif msg[0] == "trace":
+                traced[msg[1]] = msg[2]
+            elif msg[0] == "stats":
+                stats.append(msg[1])
+
+    try:
+        # Under spawn/forkserver start() pickles the problem and heuristic and
+        # may fail part-way; the finally below still stops the started ones.
+        for wid in range(workers):
+            p = ctx.Process(
+                target=_worker,
+                args=(wid, problem, heuristic, inboxes, results, shared, batch_size, chunk),
+                daemon=True,
+            )
+            p.start()
+            procs.append(p)
+        metrics.setup_time = time.perf_counter() - t0
+
+        t_search = time.perf_counter()
+        while status is None:
+            time.sleep(0.001)
+            drain()
+            if budget is not None:
+                if budget.max_expanded is not None and sum(shared.expanded) >= budget.max_expanded:
+                    status = "node_budget"
+                elif budget.max_seconds is not None and time.perf_counter() - t0 > budget.max_seconds:
+                    status = "time_budget"
+            snap = shared.snapshot()
+            if snap[0] and snap[1] == snap[2]:
+                if snap == previous:
+                    status = "done"
+                previous = snap
+            else:
+                previous = None
+        drain()
+        if status == "done":
+            # The incumbent in shared.best is set under the lock, but its
+            # ("goal", g, s) message goes through the queue's feeder thread
+            # and may still be in flight: wait for it, or the path is stale.
+            deadline = time.perf_counter() + 30.0
+            while best_cost != shared.best.value:
+                if time.perf_counter() > deadline:
+                    raise RuntimeError("HDA*: goal of the incumbent never arrived")
+                drain(block=True)
+        metrics.search_time = time.perf_counter() - t_search
+
+        path = None
+        if status == "done" and best_goal is not None:
+            t1 = time.perf_counter()
+            path = _trace(best_goal, workers, inboxes, traced, drain)
+            metrics.reconstruct_time = time.perf_counter() - t1
+    finally:
+        shared.stop.value = 1
+        deadline = time.perf_counter() + 5.0
+        while len(stats) < len(procs) and time.perf_counter() < deadline and any(p.is_alive() for p in procs):
+            drain(block=True)
+        drain()
+        for p in procs:
+            p.join(timeout=1.0)
+            if p.is_alive():
+                p.terminate()
+
+    stats.sort(key=lambda w: w.worker)
+    if worker_stats is not None:
+        worker_stats[:] = stats
+    metrics.expanded = sum(w.expanded for w in stats) or sum(shared.expanded)
+    metrics.generated = sum(w.generated for w in stats)
+    metrics.peak_table = sum(w.table_size for w in stats)
+    metrics.heuristic_calls = metrics.generated
+    if status != "done":
+        metrics.status = status
+        return None, 0
+    if path is None:
+        metrics.status = "exhausted"
+        return None, 0
+    metrics.status = "solved"
+    metrics.suboptimality = 1.0
+    return path, len(path)
+
+
+def _trace(goal, workers: int, inboxes, traced, drain) -> List[Any]:
+    """Follow parent links back from ``goal``, asking each state's owner."""
+    actions: List[Any] = []
+    state = goal
+    while True:
+        inboxes[owner_of(state, workers)].put(("trace", state))
+        deadline = time.perf_counter() + 30.0
+        while state not in traced:
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"HDA*: no parent link for {state!r}")
+            drain(block=True)
+        entry = traced[state]
+        if entry is None:
+            break
+        state, action = entry
+        actions.append(action)
+    actions.reverse()
+    return actions
@@ -1,38 +1,110 @@
+from functools import lru_cache
+from typing import Tuple, Union
+
+from . import packed as _packed
+from .board import Board
 from .puzzle_state import PuzzleState
 from .constants import GOAL_STATES
+from .pdb import default_pdb_heuristic
+
+# Mọi heuristic nhận cả PuzzleState lẫn trạng thái packed (int).
+# Int packed được hiểu là bàn 3x3; bàn NxN khác dùng PuzzleState hoặc các
+# heuristic gắn với board (xem strategies.heuristics_for).
+StateLike = Union[PuzzleState, int]
+
+_GOAL_PACKED = tuple(_packed.pack(g) for g in GOAL_STATES)
+_GOAL_BLANKS = tuple(g.index(0) for g in GOAL_STATES)
+_NIBBLE_LSB = 0x111111111
+
+
+def _blank_dist(i: int, side: int = 3, goal_blanks: Tuple[int, ...] = _GOAL_BLANKS) -> int:
+    r, c = divmod(i, side)
+    best = 2 * side
+    for gi in goal_blanks:
+        gr, gc = divmod(gi, side)
+        d = abs(r - gr) + abs(c - gc)
+        if d < best:
+            best = d
+    return best
+
+
+# Khoảng cách Manhattan nhỏ nhất của ô trống tới các goal, tính sẵn theo vị trí.
+_BLANK_DIST = tuple(_blank_dist(i) for i in range(9))
+
+
+@lru_cache(maxsize=None)
+def blank_distances(board: Board) -> Tuple[int, ...]:
+    """``_BLANK_DIST`` của một bàn bất kỳ."""
+    return tuple(_blank_dist(i, board.side, board.goal_blanks) for i in range(board.cells))
+
+
+def _as_packed(state: StateLike) -> int:
+    return state if isinstance(state, int) else state.packed
+
+
+@lru_cache(maxsize=None)
+def _goals(board: Board) -> Tuple[Tuple[int, int], ...]:
+    return tuple((board.pack(g), gb) for g, gb in zip(board.goal_states, board.goal_blanks))
+
+
+def misplaced_div2_on(board: Board, s: int) -> int:
+    """``Heuristics.misplaced_div2`` trên int packed của ``board``."""
+    bits = board.bits
+    lsb = board.low_bits
+    b = board.blank_index(s)
+    best_mis = board.cells
+    for goal, gb in _goals(board):
+        x = s ^ goal
+        y = x
+        for k in range(1, bits):
+            y |= x >> k
+        mis = bin(y & lsb).count("1") - (b != gb)
+        if mis < best_mis:
+            best_mis = mis
+    return best_mis // 2
 
 
 class Heuristics:
     @staticmethod
-    def misplaced_div2(state: PuzzleState) -> int:
+    def misplaced_div2(state: StateLike) -> int:
         # Tính số ô sai vị trí đối với từng goal, lấy min rồi chia 2.
-        best_mis = min(
-            sum(1 for i in range(9) if state.tiles[i] != 0 and state.tiles[i] != goal[i])
-            for goal in GOAL_STATES
-        )
+        # Trên dạng packed: đếm nibble khác 0 của s ^ goal, trừ ô trống nếu
+        # ô trống không nằm đúng chỗ của goal đó.
+        if not isinstance(state, int) and len(state.tiles) != 9:
+            return misplaced_div2_on(state.board, state.packed)
+        s = _as_packed(state)
+        b = _packed.blank_index(s)
+        best_mis = 9
+        for goal, gb in zip(_GOAL_PACKED, _GOAL_BLANKS):
+            x = s ^ goal
+            mis = bin((x | x >> 1 | x >> 2 | x >> 3) & _NIBBLE_LSB).count("1") - (b != gb)
+            if mis < best_mis:
+                best_mis = mis
         return best_mis // 2
 
-    
+
     @staticmethod
-    def manhattan_blank_div2(state: PuzzleState) -> int:
+    def manhattan_blank_div2(state: StateLike) -> int:
         """Khoảng cách Manhattan của ô trống tới vị trí đích (tối thiểu
         theo các goal cho phép) rồi chia 2, tương tự cách làm của
         misplaced_div2 để giữ tính admissible/consistent khi tồn tại
         nước đi đặc biệt không di chuyển ô trống.
         """
-        i = state.index_of(0)
-        r, c = divmod(i, 3)
-        best = 10
-        for goal in GOAL_STATES:
-            gi = goal.index(0)
-            gr, gc = divmod(gi, 3)
-            d = abs(r - gr) + abs(c - gc)
-            if d < best:
-                best = d
-        return best // 2
+        if isinstance(state, int):
+            return _BLANK_DIST[_packed.blank_index(state)] // 2
+        if len(state.tiles) != 9:
+            return blank_distances(state.board)[state.index_of(0)] // 2
+        return _BLANK_DIST[state.index_of(0)] // 2
 
     @staticmethod
-    def h2(state: PuzzleState) -> int:
+    def h2(state: StateLike) -> int:
         # Kết hợp hai cận dưới đã chia 2 để đồng nhất tiêu chuẩn đánh giá
         # và đảm bảo admissible/consistent.
         return min(Heuristics.misplaced_div2(state), Heuristics.manhattan_blank_div2(state))
+
+    @staticmethod
+    def pdb_max(state: StateLike) -> int:
+        # Max của các pattern database (xem pdb.py); bảng được nạp lười ở lần gọi đầu.
+        if not isinstance(state, int) and len(state.tiles) != 9:
+            return default_pdb_heuristic(state.board)(state)
+        return default_pdb_heuristic()(state)
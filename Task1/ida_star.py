@@ -0,0 +1,186 @@
+import time
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple, Union
+
+from .board import Board, get_board
+from .incremental import is_incremental
+from .puzzle_state import PuzzleState
+from .search import SearchBudget
+
+_FOUND = -1
+_STOPPED = -2  # budget hết (xem ``solve(budget=...)``)
+_INF = 1 << 30
+
+
+@lru_cache(maxsize=None)
+def _move_tables(board: Board):
+    # Mọi nước đi đều là phép hoán đổi 2 ô, nên nước đi ngược = cùng cặp ô.
+    ids = {}
+    pair = tuple(ids.setdefault(frozenset(c), len(ids)) for c in board.move_cells)
+    # (move, i, j, pair, shift_i, shift_j) cho từng nhóm nước đi; slide đánh
+    # chỉ số theo vị trí ô trống.
+    cells = board.move_cells
+    slides = tuple(tuple((m, *cells[m], pair[m], si, sj) for m, si, sj in row) for row in board.slide_moves)
+    a9 = tuple((m, *cells[m], pair[m], si, sj) for m, si, sj in board.pair_moves)
+    diag = tuple((m, *cells[m], pair[m], si, sj) for m, si, sj in board.diag_moves)
+    return slides, a9, diag
+
+
+class IDAStarSolver:
+    """IDA* với một bàn cờ khả biến duy nhất (make/undo tại chỗ).
+
+    Chỉ giữ đường đi hiện tại nên bộ nhớ mỗi lần giải là O(độ sâu lời giải),
+    khác với ``AStarSolver`` phải lưu ``g_cost``/``parent`` cho mọi trạng thái.
+    Nước đi ngược ngay lập tức (cùng cặp ô với nước trước) bị cắt tỉa.
+    Với heuristic incremental (xem incremental.py), dữ liệu h được truyền
+    theo đệ quy và cập nhật từ cặp ô hoán đổi.
+    ``board``: kích thước bàn (xem board.py); mặc định lấy theo ``PuzzleState``
+    truyền vào ``solve``, int packed là 3x3.
+    """
+
+    def __init__(
+        self, heuristic: Callable[[PuzzleState], int], max_cost: Optional[int] = None, board: Optional[Board] = None
+    ) -> None:
+        self.h = heuristic
+        self.max_cost = max_cost
+        self.board = board
+        # Metrics
+        self.last_path_cost: Optional[int] = None
+        self.expanded_count: int = 0
+        self.iterations: int = 0
+        self.status: str = "running"  # solved | exhausted | node_budget | time_budget
+
+    def solve(
+        self, start: Union[PuzzleState, int], budget: Optional[SearchBudget] = None
+    ) -> Tuple[Optional[List[str]], int]:
+        """Trả về ``(actions, cost)`` giống ``solve_puzzle_problem``.
+
+        ``budget``: max_expanded và max_seconds (kiểm tra mỗi
+        ``check_interval`` nút); max_memory_bytes bị bỏ qua vì IDA* chỉ giữ
+        đường đi hiện tại. Hết budget thì trả ``(None, 0)`` và ``status``
+        cho biết lý do.
+        """
+        self.last_path_cost = None
+        self.expanded_count = 0
+        self.iterations = 0
+        self.status = "running"
+        t0 = time.perf_counter()
+
+        geo = self.board or (get_board() if isinstance(start, int) else start.board)
+        geo.validate(start if isinstance(start, int) else start.packed)
+        inc = self.h if is_incremental(self.h) else None
+        if inc is not None or isinstance(start, int):
+            h = self.h
+            s = start if isinstance(start, int) else start.packed
+        else:
+            user_h = self.h
+            side = geo.side
+            h = lambda p: user_h(PuzzleState.from_packed(p, side))
+            s = start.packed
+
+        goals = geo.goal_packed
+        total = geo.pair_sum
+        slides, a9_moves, diag_moves = _move_tables(geo)
+        board = list(geo.unpack(s))
+        path: List[int] = []
+        expanded = 0
+
+        if inc is not None:
+            update = inc.update
+            value = inc.value
+
+        # Budget chỉ được xét khi expanded chạm check_at (không budget: không bao giờ).
+        interval = budget.check_interval if budget is not None else 0
+        check_at = interval if budget is not None else _INF
+        stop_reason: Optional[str] = None
+
+        def over_budget() -> bool:
+            nonlocal check_at, stop_reason
+            check_at += interval
+            if budget.max_expanded is not None and expanded >= budget.max_expanded:
+                stop_reason = "node_budget"
+            elif budget.max_seconds is not None and time.perf_counter() - t0 > budget.max_seconds:
+                stop_reason = "time_budget"
+            return stop_reason is not None
+
+        def dfs(s: int, b: int, g: int, bound: int, last: int, d: Optional[int]) -> int:
+            nonlocal expanded
+            f = g + (h(s) if inc is None else value(d))
+            if f > bound:
+                return f
+            if s in goals:
+                return _FOUND
+            expanded += 1
+            if expanded >= check_at and over_budget():
+                return _STOPPED
+            g1 = g + 1
+            best = _INF
+
+            for m, i, j, pair, si, sj in slides[b]:
+                if pair == last:
+                    continue
+                t = board[j]
+                board[i] = t
+                board[j] = 0
+                path.append(m)
+                r = dfs(
+                    s ^ (t << si) ^ (t << sj), j, g1, bound, pair,
+                    None if inc is None else update(s, d, i, j),
+                )
+                if r < 0:  # _FOUND / _STOPPED
+                    return r
+                path.pop()
+                board[j] = t
+                board[i] = 0
+                if r < best:
+                    best = r
+
+            for moves, a9 in ((a9_moves, True), (diag_moves, False)):
+                for m, i, j, pair, si, sj in moves:
+                    if pair == last:
+                        continue
+                    x = board[i]
+                    y = board[j]
+                    if a9:
+                        if x + y != total:
+                            continue
+                    elif not (x and y):
+                        continue
+                    board[i] = y
+                    board[j] = x
+                    path.append(m)
+                    z = x ^ y
+                    r = dfs(
+                        s ^ (z << si) ^ (z << sj), b, g1, bound, pair,
+                        None if inc is None else update(s, d, i, j),
+                    )
+                    if r < 0:
+                        return r
+                    path.pop()
+                    board[i] = x
+                    board[j] = y
+                    if r < best:
+                        best = r
+            return best
+
+        d0 = None if inc is None else inc.initial(s)
+        bound = h(s) if inc is None else value(d0)
+        blank = board.index(0)
+        try:
+            while True:
+                self.iterations += 1
+                r = dfs(s, blank, 0, bound, -1, d0)
+                if r == _FOUND:
+                    labels = geo.move_labels
+                    self.last_path_cost = len(path)
+                    self.status = "solved"
+                    return [labels[m] for m in path], len(path)
+                if r == _STOPPED:
+                    self.status = stop_reason  # type: ignore[assignment]
+                    return None, 0
+                if r >= _INF or (self.max_cost is not None and r > self.max_cost):
+                    self.status = "exhausted"
+                    return None, 0
+                bound = r
+        finally:
+            self.expanded_count = expanded
@@ -0,0 +1,254 @@
+"""Incremental heuristics: a child's value from its parent's data and the swap.
+
+Every move swaps exactly two cells, so instead of rescanning all 9 cells
+against all 4 goals for each generated state, an incremental heuristic
+keeps a small per-state ``data`` value and updates it from the two cells
+that changed. The interface (duck-typed, see ``is_incremental``):
+
+- ``initial(state) -> data``: full evaluation, once for the start state
+- ``update(parent_state, parent_data, i, j) -> data``: data of the state
+  obtained by swapping cells ``i`` and ``j`` of ``parent_state``
+- ``value(data) -> int``: the heuristic value
+- ``__call__(state, problem=None) -> int``: plain heuristic, so the objects
+  also work anywhere a normal heuristic does
+
+``a_star_search``, ``AStarSolver`` and ``IDAStarSolver`` detect these and
+carry ``data`` with each node instead of calling the heuristic per child.
+
+The data used here is one int: the number of misplaced tiles (blank
+excluded) for goal ``k`` in bits ``4k .. 4k+3`` and the blank position in
+bits 16..19. Both parts are sums of per-(cell, tile) contributions, so a
+swap changes the data by a precomputed delta ``_DELTA[i, j, a, b]``.
+``move_delta[m]`` is the slice of that table for move code ``m``, indexed
+by ``a << bits | b`` (the tiles on the move's two cells): the operator
+table of partial expansion (EPEA*, see search.py), which gets a child's f
+from ``value(data + move_delta[m][...])`` without building the child.
+
+Other board sizes get their own tables (``for_board``); the lanes are
+wide enough for N*N - 1 misplaced tiles (5 bits on 5x5) and cells are
+``board.bits`` wide.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from . import packed as _packed
+from .board import Board, get_board
+from .heuristics import blank_distances
+from .puzzle_state import PuzzleState
+
+StateLike = Union[PuzzleState, int]
+
+
+class _Tables:
+    """Contribution/delta tables and value functions of one board."""
+
+    def __init__(self, board: Board) -> None:
+        n = board.cells
+        bits = board.bits
+        self.lane = lane = max(4, (n - 1).bit_length())
+        self.blank_shift = blank_shift = 4 * lane
+        goals = board.goal_states
+
+        def contribution(p: int, v: int) -> int:
+            if v == 0:
+                return p << blank_shift
+            return sum((v != goal[p]) << (lane * k) for k, goal in enumerate(goals))
+
+        # contrib[p << bits | v]: data contributed by tile v sitting in cell p.
+        self.contrib = contrib = tuple(contribution(p, v) for p in range(n) for v in range(1 << bits))
+
+        # delta[(i * n + j) << 2 * bits | a << bits | b]: data change when cell i
+        # (tile a) and cell j (tile b) swap.
+        delta = [0] * (n * n << 2 * bits)
+        for i in range(n):
+            for j in range(n):
+                base = (i * n + j) << 2 * bits
+                for a in range(n):
+                    for b in range(n):
+                        delta[base | a << bits | b] = (
+                            contrib[i << bits | b] + contrib[j << bits | a]
+                            - contrib[i << bits | a] - contrib[j << bits | b]
+                        )
+        self.delta = tuple(delta)
+        span = 1 << 2 * bits
+        self.move_delta = tuple(
+            self.delta[(i * n + j) * span:(i * n + j + 1) * span] for i, j in board.move_cells
+        )
+        self.blank_div2 = bytes(d // 2 for d in blank_distances(board))
+
+        lane_mask = (1 << lane) - 1
+        if blank_shift <= 16:
+            # min over the 4 goal lanes, // 2; indexed by the low lane bits of data.
+            self.min_div2 = bytes(
+                min(d & lane_mask, d >> lane & lane_mask, d >> 2 * lane & lane_mask, d >> 3 * lane) // 2
+                for d in range(1 << blank_shift)
+            )
+        else:
+            self.min_div2 = None
+        self.values = self._values(lane_mask)
+
+    def _values(self, lane_mask: int) -> Dict[str, Callable[[int], int]]:
+        lane, shift, blank_div2 = self.lane, self.blank_shift, self.blank_div2
+        if self.min_div2 is not None:
+            table = self.min_div2
+            low = (1 << shift) - 1
+
+            def misplaced(data: int) -> int:
+                return table[data & low]
+        else:
+            def misplaced(data: int) -> int:
+                a, b = data & lane_mask, data >> lane & lane_mask
+                c, d = data >> 2 * lane & lane_mask, data >> 3 * lane & lane_mask
+                return min(a, b, c, d) // 2
+
+        def blank(data: int) -> int:
+            return blank_div2[data >> shift]
+
+        def h2(data: int) -> int:
+            a = misplaced(data)
+            b = blank_div2[data >> shift]
+            return a if a < b else b
+
+        return {"misplaced_div2": misplaced, "manhattan_blank_div2": blank, "h2": h2}
+
+
+_BOARD3 = get_board()
+_TABLES3 = _Tables(_BOARD3)
+_CELLS = _packed.CELLS
+_BLANK_SHIFT = _TABLES3.blank_shift
+
+# 3x3 tables (see _Tables), kept at module level for the fast path below.
+_CONTRIB = _TABLES3.contrib
+_DELTA = _TABLES3.delta
+_MIN_DIV2 = _TABLES3.min_div2
+_BLANK_DIV2 = _TABLES3.blank_div2
+
+
+def misplaced_value(data: int) -> int:
+    return _MIN_DIV2[data & 0xFFFF]
+
+
+def blank_value(data: int) -> int:
+    return _BLANK_DIV2[data >> _BLANK_SHIFT]
+
+
+def h2_value(data: int) -> int:
+    a = _MIN_DIV2[data & 0xFFFF]
+    b = _BLANK_DIV2[data >> _BLANK_SHIFT]
+    return a if a < b else b
+
+
+_TABLES3.values = {"misplaced_div2": misplaced_value, "manhattan_blank_div2": blank_value, "h2": h2_value}
+
+
+def _initial_3x3(state: StateLike) -> int:
+    s = state if isinstance(state, int) else state.packed
+    c = _CONTRIB
+    d = 0
+    for p in range(0, 16 * _CELLS, 16):
+        d += c[p | (s & 0xF)]
+        s >>= 4
+    return d
+
+
+def _update_3x3(parent_state: StateLike, parent_data: int, i: int, j: int) -> int:
+    s = parent_state if isinstance(parent_state, int) else parent_state.packed
+    return parent_data + _DELTA[(i * _CELLS + j) << 8 | ((s >> 4 * i) & 0xF) << 4 | ((s >> 4 * j) & 0xF)]
+
+
+def _make_initial(t: _Tables, board: Board) -> Callable[[StateLike], int]:
+    contrib, bits, mask, n = t.contrib, board.bits, board.mask, board.cells
+
+    def initial(state: StateLike) -> int:
+        s = state if isinstance(state, int) else state.packed
+        d = 0
+        for p in range(n):
+            d += contrib[p << bits | (s & mask)]
+            s >>= bits
+        return d
+
+    return initial
+
+
+def _make_update(t: _Tables, board: Board) -> Callable[[StateLike, int, int, int], int]:
+    delta, bits, mask, n = t.delta, board.bits, board.mask, board.cells
+    wide = 2 * bits
+
+    def update(parent_state: StateLike, parent_data: int, i: int, j: int) -> int:
+        s = parent_state if isinstance(parent_state, int) else parent_state.packed
+        return parent_data + delta[(i * n + j) << wide | ((s >> bits * i) & mask) << bits | ((s >> bits * j) & mask)]
+
+    return update
+
+
+class MismatchHeuristic:
+    """Incremental form of the misplaced/blank heuristics in ``Heuristics``.
+
+    All three share the same data (per-goal mismatch vector + blank
+    position) and differ only in ``value``; the values are identical to
+    ``Heuristics.misplaced_div2``, ``manhattan_blank_div2`` and ``h2``.
+    ``board`` defaults to 3x3; states are packed ints of that board.
+    """
+
+    def __init__(self, name: str, value: Optional[Callable[[int], int]] = None, board: Optional[Board] = None) -> None:
+        board = board or _BOARD3
+        t = _tables(board)
+        self.name = name
+        self.board = board
+        self.value = value if value is not None else t.values[name]
+        self.move_delta = t.move_delta
+        if board is _BOARD3:
+            self.initial = _initial_3x3
+            self.update = _update_3x3
+        else:
+            self.initial = _make_initial(t, board)
+            self.update = _make_update(t, board)
+
+    def __call__(self, state: StateLike, problem: Any = None) -> int:
+        return self.value(self.initial(state))
+
+    def __repr__(self) -> str:
+        if self.board is _BOARD3:
+            return f"MismatchHeuristic({self.name!r})"
+        return f"MismatchHeuristic({self.name!r}, board={self.board!r})"
+
+    def __reduce__(self):
+        # Pickle by name so worker processes get the shared module instance.
+        return _by_name, (self.name, self.board.side)
+
+
+_TABLES: Dict[int, _Tables] = {3: _TABLES3}
+
+
+def _tables(board: Board) -> _Tables:
+    t = _TABLES.get(board.side)
+    if t is None:
+        t = _TABLES[board.side] = _Tables(board)
+    return t
+
+
+MISPLACED_DIV2 = MismatchHeuristic("misplaced_div2", misplaced_value)
+MANHATTAN_BLANK_DIV2 = MismatchHeuristic("manhattan_blank_div2", blank_value)
+H2 = MismatchHeuristic("h2", h2_value)
+
+_INSTANCES: Dict[Tuple[str, int], MismatchHeuristic] = {
+    (h.name, 3): h for h in (MISPLACED_DIV2, MANHATTAN_BLANK_DIV2, H2)
+}
+
+
+def for_board(board: Board) -> Dict[str, MismatchHeuristic]:
+    """The three incremental heuristics of ``board``, shared per board size."""
+    return {name: _by_name(name, board.side) for name in ("misplaced_div2", "manhattan_blank_div2", "h2")}
+
+
+def _by_name(name: str, side: int = 3) -> MismatchHeuristic:
+    h = _INSTANCES.get((name, side))
+    if h is None:
+        h = _INSTANCES[(name, side)] = MismatchHeuristic(name, board=get_board(side))
+    return h
+
+
+def is_incremental(heuristic: Any) -> bool:
+    return all(callable(getattr(heuristic, a, None)) for a in ("initial", "update", "value"))
@@ -9,15 +9,109 @@ if __name__ == "__main__" and (__package__ is None or __package__ == ""):
         sys.path.insert(0, _parent)
     __package__ = os.path.basename(_pkg_dir)
 
+import csv
+import json
+import os
+import sys
+import time
+from typing import IO, Iterator, List, Optional, Sequence
+
+from .batch import BatchResult, solve_many
 from .puzzle_state import PuzzleState
 from .problem import PuzzleProblem
-from .strategies import solve_puzzle_problem
+from .strategies import HEURISTICS, SOLVERS, solve_with_stats
 from .visual_search_tree import (
-    generate_search_tree_dot_astar,
     render_search_tree_png,
+    write_search_tree_dot,
 )
 
 
+def _print_rows(tiles: Sequence[int], side: int) -> None:
+    for i in range(0, len(tiles), side):
+        print(list(tiles[i:i + side]))
+
+
+def _read_lines(stream: IO[str]) -> Iterator[str]:
+    # Bỏ dòng trống và dòng chú thích '#'; đọc lười từng dòng.
+    for line in stream:
+        if line.strip() and not line.lstrip().startswith("#"):
+            yield line
+
+
+_CSV_FIELDS = ["index", "id", "cost", "expanded", "seconds", "actions", "error"]
+
+
+def _result_record(r: BatchResult, side: int) -> dict:
+    record = {"index": r.index}
+    if r.id is not None:
+        record["id"] = r.id
+    if r.error is not None:
+        record["error"] = r.error
+        return record
+    record.update(
+        state=list(PuzzleState.from_packed(r.state, side).tiles),
+        solved=r.actions is not None,
+        actions=r.actions,
+        cost=r.cost,
+        expanded=r.expanded,
+        seconds=round(r.seconds, 6),
+    )
+    return record
+
+
+def run_batch(argv: Optional[List[str]] = None) -> int:
+    """``main.py batch``: giải từng dòng NDJSON/CSV, ghi một dòng kết quả cho mỗi trạng thái."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Giải hàng loạt trạng thái (NDJSON/CSV)")
+    parser.add_argument("input", nargs="?", default="-", help="File đầu vào, '-' = stdin")
+    parser.add_argument("-o", "--output", default="-", help="File kết quả, '-' = stdout")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson", help="Định dạng kết quả")
+    parser.add_argument("--workers", type=int, default=None, help="Số tiến trình (mặc định: số CPU)")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="astar")
+    parser.add_argument("--heuristic", choices=sorted(HEURISTICS), default=None)
+    parser.add_argument("--side", type=int, default=3, help="Kích thước bàn N (NxN)")
+    parser.add_argument("--chunksize", type=int, default=1, help="Số trạng thái gửi cho worker mỗi lần")
+    order = parser.add_mutually_exclusive_group()
+    order.add_argument("--ordered", dest="ordered", action="store_true", help="Giữ thứ tự đầu vào")
+    order.add_argument("--unordered", dest="ordered", action="store_false", help="Theo thứ tự giải xong (mặc định)")
+    parser.set_defaults(ordered=False)
+    args = parser.parse_args(argv)
+
+    src = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    failed = 0
+    try:
+        writer = None
+        if args.format == "csv":
+            writer = csv.DictWriter(dst, fieldnames=_CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+        results = solve_many(
+            _read_lines(src), workers=args.workers, solver=args.solver, heuristic=args.heuristic,
+            chunksize=args.chunksize, side=args.side, ordered=args.ordered, errors="report",
+        )
+        for r in results:
+            record = _result_record(r, args.side)
+            failed += r.error is not None
+            if writer is None:
+                dst.write(json.dumps(record) + "\n")
+            else:
+                if record.get("actions") is not None:
+                    record["actions"] = " ".join(record["actions"])
+                writer.writerow(record)
+    except BrokenPipeError:
+        # Đầu ra đã bị đóng (ví dụ `| head`): dừng êm, trỏ stdout vào devnull
+        # để lần flush lúc thoát không báo lỗi nữa.
+        if dst is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    return 1 if failed else 0
+
+
 def run_demo() -> None:
     initial = PuzzleState.from_list([
         8, 7, 6,
@@ -26,29 +120,24 @@ def run_demo() -> None:
     ])
 
     problem = PuzzleProblem(initial)
-    actions, cost = solve_puzzle_problem(problem)
+    t0 = time.perf_counter()
+    actions, cost, expanded = solve_with_stats(problem)
+    print(f"Thời gian giải: {time.perf_counter() - t0:.4f} giây, số nút mở rộng: {expanded}")
 
     if actions is not None:
         print(f"Độ dài lời giải: {len(actions)} bước")
         print(f"Path cost (g): {cost}\n")
 
-        # Reconstruct and print states along the action path for readability
-        cur = initial
+        # Áp từng action lên dạng packed (board.apply_action), không dò lại kế tiếp.
+        board = initial.board
+        s = initial.packed
         print("Trạng thái ban đầu:")
-        for i in range(0, 9, 3):
-            print(cur.to_list()[i:i+3])
+        _print_rows(board.unpack(s), board.side)
         print("---")
 
         for a in actions:
-            # find successor matching action label
-            next_candidates = cur.successors_with_actions()
-            matched = [s for (s, act) in next_candidates if act == a]
-            if not matched:
-                # Should not happen; break gracefully
-                break
-            cur = matched[0]
-            for i in range(0, 9, 3):
-                print(cur.to_list()[i:i+3])
+            s = board.apply_action(s, a)
+            _print_rows(board.unpack(s), board.side)
             print(f"(Action: {a})")
             print("---")
     else:
@@ -58,11 +147,19 @@ def run_demo() -> None:
 if __name__ == "__main__":
     import argparse
 
+    if sys.argv[1:2] == ["batch"]:
+        sys.exit(run_batch(sys.argv[2:]))
+
     parser = argparse.ArgumentParser(description="Puzzle demo & tree visualize")
     parser.add_argument("--tree", type=int, default=0, help="Xuất DOT cây tìm kiếm với n nút")
     parser.add_argument("--include-special", action="store_true", help="Bao gồm nước đi đặc biệt (A9, Diag)")
     parser.add_argument("--png", action="store_true", help="Render PNG sau khi tạo DOT")
     parser.add_argument("--png-out", type=str, default="search_tree.png", help="Đường dẫn file PNG output")
+    parser.add_argument("--tree-out", type=str, default="search_tree.dot", help="Đường dẫn file DOT output")
+    parser.add_argument("--annotate", action="store_true", help="Ghi g, h, f vào nhãn mỗi nút")
+    parser.add_argument("--max-depth", type=int, default=None, help="Chỉ vẽ các nút có g <= max-depth")
+    parser.add_argument("--sample", type=float, default=1.0, help="Giữ mỗi nút con với xác suất này (0, 1]")
+    parser.add_argument("--seed", type=int, default=None, help="Seed cho --sample")
     args = parser.parse_args()
 
     if args.tree > 0:
@@ -71,14 +168,16 @@ if __name__ == "__main__":
             5, 4, 3,
             1, 0, 2,
         ])
-        # Generate DOT for A*-order search tree (replaces previous BFS DOT)
-        dot_str = generate_search_tree_dot_astar(initial, args.tree, include_special=args.include_special)
-        out = "search_tree.dot"
+        # Ghi DOT cây tìm kiếm theo thứ tự A*, từng nút một (không dựng chuỗi lớn).
+        out = args.tree_out
         with open(out, "w", encoding="utf-8") as f:
-            f.write(dot_str)
-        print(f"Đã ghi DOT cây tìm kiếm vào: {out}")
+            written = write_search_tree_dot(
+                f, initial, args.tree, include_special=args.include_special, annotate=args.annotate,
+                max_depth=args.max_depth, sample=args.sample, seed=args.seed,
+            )
+        print(f"Đã ghi DOT cây tìm kiếm ({written} nút) vào: {out}")
         print("Dùng Graphviz để render, ví dụ:")
-        print("dot -Tpng search_tree.dot -o search_tree.png")
+        print(f"dot -Tpng {out} -o search_tree.png")
 
         if args.png:
             png_out = args.png_out
@@ -0,0 +1,173 @@
+"""Open-list backends shared by ``a_star_search`` and ``AStarSolver``.
+
+Both expose ``push(f, g, item, key=None)``, ``pop() -> (f, g, item)`` and
+``len()``, and record ``peak_size``. ``push_front`` puts back the entry
+just popped so that it is popped next again (a search stopped by its
+budget checkpoints with it). ``items()`` lists the queued entries
+as ``(f, g, item, key)`` in an order that, pushed (or ``extend``-ed) into a
+fresh open list of the same kind, gives the same pops (checkpoint/resume,
+see checkpoint.py).
+
+- ``HeapOpenList``: binary heap, FIFO among equal f (the original behaviour).
+- ``BucketOpenList``: array of buckets indexed by f; each bucket is an array
+  of stacks indexed by g and pops the deepest node first. Costs and
+  heuristics here are small ints, so push and pop are O(1) amortised.
+  With ``decrease_key=True`` a push for a ``key`` already queued moves
+  that entry instead of adding a stale duplicate.
+"""
+
+from __future__ import annotations
+
+import heapq
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+
+class HeapOpenList:
+    def __init__(self) -> None:
+        self._heap: List[Tuple[int, int, int, Any]] = []
+        self._tie = 0
+        self._front = 0  # ties of push_front, counting down
+        self.peak_size = 0
+
+    def push(self, f: int, g: int, item: Any, key: Optional[Hashable] = None) -> None:
+        self._tie += 1
+        heapq.heappush(self._heap, (f, self._tie, g, item))
+        if len(self._heap) > self.peak_size:
+            self.peak_size = len(self._heap)
+
+    def pop(self) -> Tuple[int, int, Any]:
+        f, _, g, item = heapq.heappop(self._heap)
+        return f, g, item
+
+    def push_front(self, f: int, g: int, item: Any, key: Optional[Hashable] = None) -> None:
+        # Tie âm: đứng trước mọi mục cùng f (mục vừa pop có (f, tie) nhỏ nhất).
+        self._front -= 1
+        heapq.heappush(self._heap, (f, self._front, g, item))
+
+    def items(self) -> List[Tuple[int, int, Any, Optional[Hashable]]]:
+        # Theo (f, tie) (tie là duy nhất nên không so tới item): đẩy lại theo
+        # thứ tự này giữ nguyên thứ tự FIFO.
+        return [(f, g, item, None) for f, _, g, item in sorted(self._heap)]
+
+    def extend(self, entries: Iterable[Tuple[int, int, Any, Optional[Hashable]]]) -> None:
+        heap = self._heap
+        tie = self._tie
+        for f, g, item, _ in entries:
+            tie += 1
+            heap.append((f, tie, g, item))
+        self._tie = tie
+        heapq.heapify(heap)
+        if len(heap) > self.peak_size:
+            self.peak_size = len(heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class BucketOpenList:
+    def __init__(self, decrease_key: bool = False) -> None:
+        # _buckets[f][g] is a stack of (key, item); trailing empty stacks are
+        # trimmed so the deepest non-empty stack is always _buckets[f][-1].
+        self._buckets: List[List[List[Tuple[Any, Any]]]] = []
+        self._min_f = 0
+        self._size = 0
+        self._where: Optional[Dict[Hashable, Tuple[int, int, int]]] = {} if decrease_key else None
+        self.peak_size = 0
+
+    def push(self, f: int, g: int, item: Any, key: Optional[Hashable] = None) -> None:
+        where = self._where
+        if where is not None and key is not None:
+            old = where.get(key)
+            if old is not None:
+                self._remove(*old)
+
+        buckets = self._buckets
+        while len(buckets) <= f:
+            buckets.append([])
+        bucket = buckets[f]
+        while len(bucket) <= g:
+            bucket.append([])
+        stack = bucket[g]
+        if where is not None and key is not None:
+            where[key] = (f, g, len(stack))
+        stack.append((key, item))
+
+        if f < self._min_f or self._size == 0:
+            self._min_f = f
+        self._size += 1
+        if self._size > self.peak_size:
+            self.peak_size = self._size
+
+    def _remove(self, f: int, g: int, idx: int) -> None:
+        # Swap-remove; the entry moved into idx gets its position updated.
+        stack = self._buckets[f][g]
+        last = stack.pop()
+        if idx < len(stack):
+            stack[idx] = last
+            self._where[last[0]] = (f, g, idx)  # type: ignore[index]
+        self._trim(f)
+        self._size -= 1
+
+    def _trim(self, f: int) -> None:
+        bucket = self._buckets[f]
+        while bucket and not bucket[-1]:
+            bucket.pop()
+
+    def pop(self) -> Tuple[int, int, Any]:
+        if self._size == 0:
+            raise IndexError("pop from empty open list")
+        buckets = self._buckets
+        f = self._min_f
+        while not buckets[f]:
+            f += 1
+        self._min_f = f
+        bucket = buckets[f]
+        g = len(bucket) - 1
+        key, item = bucket[g].pop()
+        if not bucket[g]:
+            self._trim(f)
+        self._size -= 1
+        if self._where is not None and key is not None:
+            del self._where[key]
+        return f, g, item
+
+    def push_front(self, f: int, g: int, item: Any, key: Optional[Hashable] = None) -> None:
+        # pop lấy đỉnh ngăn xếp sâu nhất của f nhỏ nhất: push thường đặt lại đúng chỗ đó.
+        self.push(f, g, item, key)
+
+    def items(self) -> List[Tuple[int, int, Any, Optional[Hashable]]]:
+        # Mỗi ngăn xếp từ đáy lên đỉnh: đẩy lại theo thứ tự này dựng lại đúng các ngăn xếp.
+        return [
+            (f, g, item, key)
+            for f, bucket in enumerate(self._buckets)
+            for g, stack in enumerate(bucket)
+            for key, item in stack
+        ]
+
+    def extend(self, entries: Iterable[Tuple[int, int, Any, Optional[Hashable]]]) -> None:
+        push = self.push
+        for f, g, item, key in entries:
+            push(f, g, item, key)
+
+    def __len__(self) -> int:
+        return self._size
+
+
+OpenList = Union[HeapOpenList, BucketOpenList]
+
+OPEN_LISTS: Dict[str, Callable[[], OpenList]] = {
+    "heap": HeapOpenList,
+    "bucket": BucketOpenList,
+    "bucket_dk": partial(BucketOpenList, decrease_key=True),
+}
+
+
+def make_open_list(spec: Union[str, Callable[[], OpenList]] = "heap") -> OpenList:
+    """Tạo open list mới từ tên trong ``OPEN_LISTS`` hoặc một factory."""
+    if callable(spec):
+        return spec()
+    try:
+        return OPEN_LISTS[spec]()
+    except KeyError:
+        raise ValueError(f"Unknown open list {spec!r}; expected one of {sorted(OPEN_LISTS)}") from None
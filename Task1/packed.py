@@ -0,0 +1,238 @@
+"""Packed integer encoding of 3x3 puzzle states.
+
+A state is a 36-bit int with 4 bits per cell: cell ``i`` lives in bits
+``4*i .. 4*i+3``. Swapping two cells is two shifts and three xors, and all
+move geometry (slides per blank position, A9 pairs, corner diagonals) is
+precomputed once at import time, so generating successors is table lookups
+plus bit operations.
+
+Every move is identified by a small integer *move code*; ``MOVE_LABELS``
+maps it back to the human-readable action used by ``PuzzleState``
+("U", "D", "L", "R", "A9:i-j", "Diag:i-j").
+"""
+
+from __future__ import annotations
+
+from array import array
+from itertools import combinations, permutations
+from typing import FrozenSet, List, Sequence, Tuple
+
+from .constants import GOAL_STATES
+
+SIDE = 3
+CELLS = SIDE * SIDE
+NIBBLE = 0xF
+
+# Bit 3 / bit 0 of every nibble, used by the zero-nibble trick in blank_index.
+_LOW_BITS = sum(1 << (4 * i) for i in range(CELLS))
+_HIGH_BITS = _LOW_BITS << 3
+
+
+def _build_moves(side: int = SIDE, bits: int = 4):
+    """Move tables for a ``side`` x ``side`` board with ``bits`` bits per cell."""
+    cells_n = side * side
+    labels: List[str] = []
+    cells: List[Tuple[int, int]] = []
+
+    def add(label: str, i: int, j: int) -> int:
+        labels.append(label)
+        cells.append((i, j))
+        return len(labels) - 1
+
+    # Slides, indexed by blank position, in the order D, U, R, L.
+    slides: List[Tuple[Tuple[int, int, int], ...]] = []
+    for b in range(cells_n):
+        r, c = divmod(b, side)
+        row = []
+        for (dr, dc), name in (((1, 0), "D"), ((-1, 0), "U"), ((0, 1), "R"), ((0, -1), "L")):
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < side and 0 <= nc < side:
+                j = nr * side + nc
+                row.append((add(name, b, j), bits * b, bits * j))
+        slides.append(tuple(row))
+
+    # Adjacent pairs summing to N*N ("A9" on 3x3): horizontal pairs row by
+    # row, then vertical pairs column by column.
+    a9_pairs = []
+    for rr in range(side):
+        for k in range(side - 1):
+            a9_pairs.append((rr * side + k, rr * side + k + 1))
+    for cc in range(side):
+        for k in range(side - 1):
+            a9_pairs.append((k * side + cc, (k + 1) * side + cc))
+    a9 = tuple((add(f"A{cells_n}:{i}-{j}", i, j), bits * i, bits * j) for i, j in a9_pairs)
+
+    # Corner diagonals.
+    diag_pairs = ((0, cells_n - 1), (side - 1, cells_n - side))
+    diag = tuple((add(f"Diag:{i}-{j}", i, j), bits * i, bits * j) for i, j in diag_pairs)
+
+    return tuple(labels), tuple(cells), tuple(slides), a9, diag
+
+
+# MOVE_LABELS[m] / MOVE_CELLS[m]: label and swapped cells (i, j) of move code m.
+# SLIDE_MOVES[b]: (move, shift_b, shift_j) for each slide with the blank at b.
+# A9_MOVES / DIAG_MOVES: (move, shift_i, shift_j) for each candidate pair.
+MOVE_LABELS, MOVE_CELLS, SLIDE_MOVES, A9_MOVES, DIAG_MOVES = _build_moves()
+NUM_MOVES = len(MOVE_LABELS)
+
+
+def _build_inverse(cells: Sequence[Tuple[int, int]], slide_moves) -> Tuple[int, ...]:
+    # A slide b -> j is undone by the slide j -> b (U <-> D, L <-> R); A9 and
+    # Diag swaps are their own inverse (the swap condition still holds after).
+    slides = {cells[m]: m for row in slide_moves for m, _, _ in row}
+    return tuple(
+        slides[(j, i)] if slides.get((i, j)) == m else m for m, (i, j) in enumerate(cells)
+    )
+
+
+# INVERSE_MOVES[m]: the move that takes a child back to its parent.
+INVERSE_MOVES = _build_inverse(MOVE_CELLS, SLIDE_MOVES)
+
+
+def pack(tiles: Sequence[int]) -> int:
+    t0, t1, t2, t3, t4, t5, t6, t7, t8 = tiles
+    return (
+        t0 | t1 << 4 | t2 << 8 | t3 << 12 | t4 << 16
+        | t5 << 20 | t6 << 24 | t7 << 28 | t8 << 32
+    )
+
+
+# Decoded rows: _ROW[12-bit chunk] -> the 3 cells it holds.
+_ROW = tuple((r & NIBBLE, (r >> 4) & NIBBLE, r >> 8) for r in range(1 << 12))
+
+
+def unpack(s: int) -> Tuple[int, ...]:
+    return _ROW[s & 0xFFF] + _ROW[(s >> 12) & 0xFFF] + _ROW[s >> 24]
+
+
+# Permutation rank (Lehmer code) in 0 .. 9!-1, used to index dense tables.
+NUM_STATES = 362880
+_FACT = (40320, 5040, 720, 120, 24, 6, 2, 1, 1)
+_POPCOUNT = tuple(bin(i).count("1") for i in range(1 << CELLS))
+
+
+def _build_rank_tables():
+    # rank = R1[row0] + R2[OFF1[row0] | row1] + R3[row2], one 12-bit chunk per row.
+    # Row 0's digits depend only on row 0; row 1's also on which 3 values
+    # row 0 used (84 possible sets, folded into OFF1); row 2's only on the
+    # relative order of its own 3 values.
+    def chunk(vals) -> int:
+        return vals[0] | vals[1] << 4 | vals[2] << 8
+
+    def digits(vals, seen: int, facts) -> int:
+        r = 0
+        for v, f in zip(vals, facts):
+            r += (v - _POPCOUNT[seen & ((1 << v) - 1)]) * f
+            seen |= 1 << v
+        return r
+
+    mask_ids = {sum(1 << v for v in c): k for k, c in enumerate(combinations(range(CELLS), 3))}
+    r1 = array("i", bytes(4 << 12))
+    off1 = array("i", bytes(4 << 12))
+    r2 = array("i", bytes(4 * (len(mask_ids) << 12)))
+    r3 = array("i", bytes(4 << 12))
+    for vals in permutations(range(CELLS), 3):
+        c = chunk(vals)
+        mask = sum(1 << v for v in vals)
+        r1[c] = digits(vals, 0, _FACT[0:3])
+        off1[c] = mask_ids[mask] << 12
+        a, b, d = vals
+        r3[c] = ((b < a) + (d < a)) * 2 + (d < b)
+    for mask, k in mask_ids.items():
+        free = [v for v in range(CELLS) if not mask >> v & 1]
+        for vals in permutations(free, 3):
+            r2[(k << 12) | chunk(vals)] = digits(vals, mask, _FACT[3:6])
+    return r1, off1, r2, r3
+
+
+_R1, _OFF1, _R2, _R3 = _build_rank_tables()
+
+
+def rank(s: int) -> int:
+    c0 = s & 0xFFF
+    return _R1[c0] + _R2[_OFF1[c0] | ((s >> 12) & 0xFFF)] + _R3[(s >> 24) & 0xFFF]
+
+
+def unrank(r: int) -> int:
+    free = list(range(CELLS))
+    s = 0
+    for i in range(CELLS):
+        q, r = divmod(r, _FACT[i])
+        s |= free.pop(q) << (4 * i)
+    return s
+
+
+GOAL_PACKED: FrozenSet[int] = frozenset(pack(g) for g in GOAL_STATES)
+
+
+def is_goal(s: int) -> bool:
+    return s in GOAL_PACKED
+
+
+def blank_index(s: int) -> int:
+    # Classic "has zero nibble" test; the lowest flagged nibble is exact,
+    # and a valid state has exactly one zero nibble.
+    t = (s - _LOW_BITS) & ~s & _HIGH_BITS
+    return ((t & -t).bit_length() >> 2) - 1
+
+
+def swap(s: int, i: int, j: int) -> int:
+    si, sj = 4 * i, 4 * j
+    x = ((s >> si) ^ (s >> sj)) & NIBBLE
+    return s ^ (x << si) ^ (x << sj)
+
+
+def successors(s: int, include_special: bool = True) -> List[Tuple[int, int]]:
+    """Return ``(child, move_code)`` pairs in the same order as
+    ``PuzzleState.successors_with_actions``.
+    """
+    out: List[Tuple[int, int]] = []
+    for m, sb, sj in SLIDE_MOVES[blank_index(s)]:
+        x = (s >> sj) & NIBBLE
+        out.append((s ^ (x << sb) ^ (x << sj), m))
+
+    if include_special:
+        for m, si, sj in A9_MOVES:
+            a = (s >> si) & NIBBLE
+            b = (s >> sj) & NIBBLE
+            # Tiles are <= 8, so a + b == 9 already excludes the blank.
+            if a + b == 9:
+                x = a ^ b
+                out.append((s ^ (x << si) ^ (x << sj), m))
+        for m, si, sj in DIAG_MOVES:
+            a = (s >> si) & NIBBLE
+            b = (s >> sj) & NIBBLE
+            if a and b:
+                x = a ^ b
+                out.append((s ^ (x << si) ^ (x << sj), m))
+
+    return out
+
+
+# Slide codes by (blank position, label); A9/Diag codes by label.
+_SLIDE_CODES = {(MOVE_CELLS[m][0], MOVE_LABELS[m]): m for row in SLIDE_MOVES for m, _, _ in row}
+_A9_CODES = {MOVE_LABELS[m]: m for m, _, _ in A9_MOVES}
+_DIAG_CODES = {MOVE_LABELS[m]: m for m, _, _ in DIAG_MOVES}
+
+
+def move_code(s: int, label: str) -> int:
+    """Move code of action ``label`` in state ``s``; ValueError if not legal there."""
+    m = _SLIDE_CODES.get((blank_index(s), label))
+    if m is not None:
+        return m
+    m = _A9_CODES.get(label)
+    if m is not None:
+        i, j = MOVE_CELLS[m]
+        if ((s >> 4 * i) & NIBBLE) + ((s >> 4 * j) & NIBBLE) == 9:
+            return m
+    else:
+        m = _DIAG_CODES.get(label)
+        if m is not None:
+            i, j = MOVE_CELLS[m]
+            if (s >> 4 * i) & NIBBLE and (s >> 4 * j) & NIBBLE:
+                return m
+    raise ValueError(f"Action {label!r} is not legal in state {unpack(s)}")
+
+
+def apply_action(s: int, label: str) -> int:
+    return swap(s, *MOVE_CELLS[move_code(s, label)])
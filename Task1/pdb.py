@@ -0,0 +1,265 @@
+"""Pattern database heuristics for the full move set.
+
+A pattern database (PDB) keeps the positions of the blank and of a few
+*pattern* tiles and forgets the others. Its table stores, for every
+abstract state, the exact abstract distance to the nearest of the four
+goals of the board, found by one multi-source reverse BFS over slides,
+``A{N*N}:i-j`` and ``Diag:i-j`` swaps. Forgotten tiles can take any value,
+so an A9 swap is allowed in the abstraction whenever *some* assignment of
+the forgotten tiles would allow it; this keeps every abstract distance a
+lower bound on the real one.
+
+Every move costs 1 whichever tiles it touches, so PDBs are combined with
+``max`` (not summed). Tables are written under ``data/`` and loaded lazily
+on first lookup. Any board size works (see ``board.py``); abstract states
+are the cells of the kept items, so no tile value is reserved for the
+forgotten tiles. ``default_patterns(side)`` groups complementary tiles.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .board import Board, get_board
+from .puzzle_state import PuzzleState
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Pairs (x, 9 - x) are complementary under the A9 rule, so keeping both
+# tiles of a pair in the same pattern makes A9 moves exact for them.
+DEFAULT_PATTERNS: Tuple[Tuple[int, ...], ...] = ((1, 2, 7, 8), (3, 4, 5, 6))
+
+# Popcount table for index() on boards of up to 16 cells (lookup hot path).
+_POPCOUNT = tuple(bin(i).count("1") for i in range(1 << 16))
+
+
+def default_patterns(side: int, max_tiles: int = 4) -> Tuple[Tuple[int, ...], ...]:
+    """Complementary pairs ``(x, N*N - x)`` packed into patterns of up to ``max_tiles`` tiles."""
+    if side == 3:
+        return DEFAULT_PATTERNS
+    n = side * side
+    groups: List[Tuple[int, ...]] = [(x, n - x) for x in range(1, (n + 1) // 2)]
+    if n % 2 == 0:
+        groups.append((n // 2,))  # pairs with no other tile
+    patterns: List[Tuple[int, ...]] = []
+    for group in groups:
+        if patterns and len(patterns[-1]) + len(group) <= max_tiles:
+            patterns[-1] += group
+        else:
+            patterns.append(group)
+    return tuple(tuple(sorted(p)) for p in patterns)
+
+
+class PatternDatabase:
+    """Exact distances in the abstraction that keeps ``pattern`` and the blank."""
+
+    def __init__(self, pattern: Sequence[int], path: Optional[str] = None, board: Optional[Board] = None) -> None:
+        board = board or get_board()
+        n = board.cells
+        pattern = tuple(sorted(pattern))
+        if not pattern or any(not 1 <= v < n for v in pattern) or len(set(pattern)) != len(pattern):
+            raise ValueError(f"Invalid pattern {pattern!r}: expected distinct tiles in 1..{n - 1}")
+        self.board = board
+        self._cells = n
+        if n > 16:
+            self.index = self._index_wide
+        self.pattern = pattern
+        self.items = (0,) + pattern  # blank first
+        self.size = 1
+        for k in range(len(self.items)):
+            self.size *= n - k
+        name = "-".join(str(v) for v in pattern)
+        prefix = "pdb" if board.side == 3 else f"pdb{board.side}x{board.side}"
+        self.path = path or os.path.join(DATA_DIR, f"{prefix}_{name}.bin")
+        self._table: Optional[bytes] = None
+
+    # Indexing -----------------------------------------------------------
+    def index(self, pos: Sequence[int]) -> int:
+        """Rank of the abstract state given ``pos[tile] -> cell`` for all tiles."""
+        n = self._cells
+        idx = 0
+        used = 0
+        for k, v in enumerate(self.items):
+            p = pos[v]
+            idx = idx * (n - k) + p - _POPCOUNT[used & ((1 << p) - 1)]
+            used |= 1 << p
+        return idx
+
+    def _index_wide(self, pos: Sequence[int]) -> int:
+        # index for boards of more than 16 cells (past the popcount table).
+        n = self._cells
+        idx = 0
+        used = 0
+        for k, v in enumerate(self.items):
+            p = pos[v]
+            idx = idx * (n - k) + p - (used & ((1 << p) - 1)).bit_count()
+            used |= 1 << p
+        return idx
+
+    def _rank(self, cells: Sequence[int]) -> int:
+        # Same as index, given cells[k] = cell of items[k].
+        n = self._cells
+        idx = 0
+        used = 0
+        for k, p in enumerate(cells):
+            idx = idx * (n - k) + p - (used & ((1 << p) - 1)).bit_count()
+            used |= 1 << p
+        return idx
+
+    # Build / load -------------------------------------------------------
+    def _successors(self, cells: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """Abstract successors of ``cells`` (cells of items, blank first)."""
+        board = self.board
+        item_at = [-1] * board.cells  # cell -> item index, -1 for a forgotten tile
+        for k, p in enumerate(cells):
+            item_at[p] = k
+        items = self.items
+        out: List[Tuple[int, ...]] = []
+
+        def moved(ki: int, i: int, kj: int, j: int) -> Tuple[int, ...]:
+            # Contents of cells i and j swap.
+            nxt = list(cells)
+            if ki >= 0:
+                nxt[ki] = j
+            if kj >= 0:
+                nxt[kj] = i
+            return tuple(nxt)
+
+        b = cells[0]
+        for m, _, _ in board.slide_moves[b]:
+            j = board.move_cells[m][1]
+            out.append(moved(0, b, item_at[j], j))
+        for m, _, _ in board.pair_moves:
+            i, j = board.move_cells[m]
+            ki, kj = item_at[i], item_at[j]
+            if ki == 0 or kj == 0 or ki == kj:
+                # blank, or two forgotten tiles (self-loop in the abstraction)
+                continue
+            if ki < 0:
+                ok = self._free_partner[items[kj]]
+            elif kj < 0:
+                ok = self._free_partner[items[ki]]
+            else:
+                ok = items[ki] + items[kj] == board.pair_sum
+            if ok:
+                out.append(moved(ki, i, kj, j))
+        for m, _, _ in board.diag_moves:
+            i, j = board.move_cells[m]
+            ki, kj = item_at[i], item_at[j]
+            if ki and kj and ki != kj:
+                out.append(moved(ki, i, kj, j))
+        return out
+
+    def build(self) -> bytes:
+        """Multi-source reverse BFS from the abstract goals; writes ``self.path``."""
+        board = self.board
+        total = board.pair_sum
+        in_pattern = set(self.pattern)
+        # _free_partner[v]: some forgotten tile could be v's A9 partner.
+        self._free_partner = [
+            1 <= total - v < board.cells and total - v != v and total - v not in in_pattern
+            for v in range(board.cells)
+        ]
+        table = bytearray([255]) * self.size
+        frontier = []
+        for g in board.goal_states:
+            cells = tuple(g.index(v) for v in self.items)
+            idx = self._rank(cells)
+            if table[idx] == 255:
+                table[idx] = 0
+                frontier.append(cells)
+        depth = 0
+        while frontier:
+            depth += 1
+            nxt: List[Tuple[int, ...]] = []
+            for a in frontier:
+                for b in self._successors(a):
+                    idx = self._rank(b)
+                    if table[idx] == 255:
+                        table[idx] = depth
+                        nxt.append(b)
+            frontier = nxt
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(table)
+        os.replace(tmp, self.path)
+        self._table = bytes(table)
+        return self._table
+
+    @property
+    def table(self) -> bytes:
+        if self._table is None:
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as f:
+                    data = f.read()
+                if len(data) != self.size:
+                    raise ValueError(f"{self.path}: expected {self.size} bytes, got {len(data)}")
+                self._table = data
+            else:
+                self.build()
+        return self._table  # type: ignore[return-value]
+
+    def lookup(self, pos: Sequence[int]) -> int:
+        return self.table[self.index(pos)]
+
+
+class PDBHeuristic:
+    """Max over several PDBs; callable on a ``PuzzleState`` or packed int of ``board``."""
+
+    def __init__(self, patterns: Optional[Sequence[Sequence[int]]] = None, board: Optional[Board] = None) -> None:
+        self.board = board = board or get_board()
+        if patterns is None:
+            patterns = default_patterns(board.side)
+        self.databases = [PatternDatabase(p, board=board) for p in patterns]
+        self._cells = board.cells
+        self._mask = board.mask
+        self._shifts = tuple(board.bits * i for i in range(board.cells))
+
+    def __repr__(self) -> str:
+        patterns = tuple(db.pattern for db in self.databases)
+        if self.board.side == 3:
+            return f"PDBHeuristic({patterns!r})"
+        return f"PDBHeuristic({patterns!r}, board={self.board!r})"
+
+    def __call__(self, state: Union[PuzzleState, int]) -> int:
+        s = state if isinstance(state, int) else state.packed
+        mask = self._mask
+        pos = [0] * self._cells
+        for i, shift in enumerate(self._shifts):
+            pos[(s >> shift) & mask] = i
+        best = 0
+        for db in self.databases:
+            d = db.table[db.index(pos)]
+            if d > best:
+                best = d
+        return best
+
+
+_default: Optional[PDBHeuristic] = None
+_defaults: Dict[int, PDBHeuristic] = {}
+
+
+def default_pdb_heuristic(board: Optional[Board] = None) -> PDBHeuristic:
+    """Shared ``PDBHeuristic`` over ``default_patterns`` of ``board`` (3x3 by default)."""
+    global _default
+    if board is None or board.side == 3:
+        if _default is None:
+            _default = PDBHeuristic()
+        return _default
+    h = _defaults.get(board.side)
+    if h is None:
+        h = _defaults[board.side] = PDBHeuristic(board=board)
+    return h
+
+
+def build_all(patterns: Optional[Sequence[Sequence[int]]] = None, board: Optional[Board] = None) -> Dict[str, int]:
+    """Build (or rebuild) every PDB; returns table sizes keyed by file path."""
+    board = board or get_board()
+    sizes: Dict[str, int] = {}
+    for p in patterns or default_patterns(board.side):
+        db = PatternDatabase(p, board=board)
+        sizes[db.path] = len(db.build())
+    return sizes
@@ -1,29 +1,113 @@
 from __future__ import annotations
 
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple, Union
 
+from .board import Board, get_board
 from .puzzle_state import PuzzleState
 
 
 class PuzzleProblem:
     """A thin Problem wrapper so Task 1 can reuse the same A* API
     as Task 2. All moves have unit cost.
+
+    The initial state may be a ``PuzzleState`` or a packed int (see
+    ``packed.py``); the search then runs on that same representation.
+    The board size comes from the ``PuzzleState``; packed ints are 3x3
+    unless ``side`` says otherwise (see ``board.py``).
     """
 
-    def __init__(self, initial: PuzzleState) -> None:
+    def __init__(self, initial: Union[PuzzleState, int], side: Optional[int] = None) -> None:
         self._initial = initial
+        self.packed = isinstance(initial, int)
+        if self.packed:
+            self.board: Board = get_board(3 if side is None else side)
+        else:
+            self.board = initial.board
+            if side is not None and side != self.board.side:
+                raise ValueError(f"side={side} does not match a {self.board.side}x{self.board.side} initial state")
+        self.num_states = self.board.num_states
+        # Mã nước đi (int) -> nhãn / cặp ô hoán đổi; a_star_search chỉ dựng
+        # nhãn khi dựng lại đường đi (xem successor_codes).
+        self.move_labels = self.board.move_labels
+        self.move_cells = self.board.move_cells
+        # Kiểm tra O(1): trạng thái hợp lệ luôn tới được goal (xem board.py),
+        # trạng thái sai bị từ chối ngay thay vì duyệt hết không gian.
+        self.board.validate(initial if self.packed else initial.packed)
 
     # A* API
-    def get_initial_state(self) -> PuzzleState:
+    def get_initial_state(self) -> Union[PuzzleState, int]:
         return self._initial
 
-    def is_goal(self, state: PuzzleState) -> bool:
+    def is_goal(self, state: Union[PuzzleState, int]) -> bool:
+        if self.packed:
+            return state in self.board.goal_packed
         return state.is_goal()
 
     def get_successors(
-        self, current_state: PuzzleState, current_g_cost: int
-    ) -> List[Tuple[str, PuzzleState]]:
+        self, current_state: Union[PuzzleState, int], current_g_cost: int
+    ) -> List[Tuple[str, Union[PuzzleState, int]]]:
         # Ignore current_g_cost since costs are uniform.
         # Reorder as (action, next_state) to match the shared A*.
+        if self.packed:
+            labels = self.board.move_labels
+            return [(labels[m], s) for (s, m) in self.board.successors(current_state)]
         return [(action, s) for (s, action) in current_state.successors_with_actions()]
 
+    def successor_codes(self, current_state: Union[PuzzleState, int]) -> Iterable[Tuple[Union[PuzzleState, int], int]]:
+        # Như get_successors nhưng trả (next_state, move_code), không dựng nhãn;
+        # với int packed là thẳng danh sách của board.successors.
+        board = self.board
+        if self.packed:
+            return board.successors(current_state)
+        from_packed = PuzzleState.from_packed
+        side = board.side
+        return ((from_packed(s, side), m) for (s, m) in board.successors(current_state.packed))
+
+    # Backward search API (bidirectional.py)
+    def get_goal_states(self) -> List[Union[PuzzleState, int]]:
+        board = self.board
+        if self.packed:
+            return [board.pack(g) for g in board.goal_states]
+        return [PuzzleState(g) for g in board.goal_states]
+
+    def get_predecessors(
+        self, current_state: Union[PuzzleState, int], current_g_cost: int
+    ) -> List[Tuple[str, Union[PuzzleState, int]]]:
+        # Every move can be undone by one move, so the predecessors are the
+        # successors; the action is the forward move prev -> current_state.
+        board = self.board
+        labels = board.move_labels
+        inverse = board.inverse_moves
+        if self.packed:
+            return [(labels[inverse[m]], s) for (s, m) in board.successors(current_state)]
+        from_packed = PuzzleState.from_packed
+        return [
+            (labels[inverse[m]], from_packed(s, board.side)) for (s, m) in board.successors(current_state.packed)
+        ]
+
+    def get_successor_swaps(
+        self, current_state: Union[PuzzleState, int], current_g_cost: int
+    ) -> List[Tuple[str, Union[PuzzleState, int], int, int]]:
+        # Same successors and order as get_successors, plus the two swapped
+        # cells (i, j) so incremental heuristics can update from the parent.
+        board = self.board
+        labels = board.move_labels
+        cells = board.move_cells
+        if self.packed:
+            return [(labels[m], s, *cells[m]) for (s, m) in board.successors(current_state)]
+        from_packed = PuzzleState.from_packed
+        return [
+            (labels[m], from_packed(s, board.side), *cells[m]) for (s, m) in board.successors(current_state.packed)
+        ]
+
+    def state_index(self, state: Union[PuzzleState, int]) -> int:
+        # Permutation rank, used by a_star_search(storage="dense").
+        return self.board.rank(state if self.packed else state.packed)
+
+    # a_star_search(symmetry=True), see symmetry.py
+    def canonical_key(self, state: Union[PuzzleState, int]) -> int:
+        return self.board.canonical(state if self.packed else state.packed)
+
+    def canonical_index(self, state: Union[PuzzleState, int]) -> int:
+        board = self.board
+        return board.rank(board.canonical(state if self.packed else state.packed))
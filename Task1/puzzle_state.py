@@ -1,84 +1,75 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import cached_property
 from typing import List, Tuple
 
-from .constants import GOAL_STATES
+from .board import Board, board_for_cells, get_board
 
 
 @dataclass(frozen=True)
 class PuzzleState:
-    """Trạng thái 3x3 bất biến, lưu dưới dạng tuple 9 phần tử.
+    """Trạng thái NxN bất biến, lưu dưới dạng tuple N*N phần tử (mặc định 3x3).
     Cung cấp các phép sinh trạng thái kế tiếp (slide blank, Adj9Swap, CornerDiag).
+
+    Các solver làm việc trên dạng số nguyên packed (xem ``packed.py``/``board.py``);
+    lớp này là view tuple để hiển thị, chuyển đổi qua ``packed``/``from_packed``.
+    Kích thước bàn suy ra từ số phần tử, luật và bảng nước đi lấy từ ``board``.
     """
 
     tiles: Tuple[int, ...]
 
     @staticmethod
     def from_list(values: List[int]) -> "PuzzleState":
-        if len(values) != 9:
-            raise ValueError("PuzzleState requires exactly 9 values")
+        # ValueError nếu không phải N*N phần tử hoặc không phải hoán vị 0..N*N-1.
+        board_for_cells(len(values)).validate_tiles(values)
         return PuzzleState(tuple(values))
 
     def to_list(self) -> List[int]:
         return list(self.tiles)
 
+    @cached_property
+    def board(self) -> Board:
+        return board_for_cells(len(self.tiles))
+
     def is_goal(self) -> bool:
-        t = list(self.tiles)
-        return any(t == g for g in GOAL_STATES)
+        return self.tiles in self.board.goal_states
 
     def index_of(self, value: int) -> int:
         return self.tiles.index(value)
 
+    @cached_property
+    def packed(self) -> int:
+        return self.board.pack(self.tiles)
+
+    @staticmethod
+    def from_packed(s: int, side: int = 3) -> "PuzzleState":
+        board = get_board(side)
+        state = PuzzleState(board.unpack(s))
+        # cached_property ghi thẳng vào __dict__ nên dùng được với frozen dataclass.
+        state.__dict__["packed"] = s
+        state.__dict__["board"] = board
+        return state
+
     def _swap(self, i: int, j: int) -> "PuzzleState":
         t = list(self.tiles)
         t[i], t[j] = t[j], t[i]
         return PuzzleState(tuple(t))
 
     def successors_with_actions(self, include_special: bool = True) -> List[Tuple["PuzzleState", str]]:
-        succ: List[Tuple[PuzzleState, str]] = []
-
-        # 1) Slide blank (0)
-        b = self.index_of(0)
-        r, c = divmod(b, 3)
-        dir_map = {(1, 0): "D", (-1, 0): "U", (0, 1): "R", (0, -1): "L"}
-        for dr, dc in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < 3 and 0 <= nc < 3:
-                j = nr * 3 + nc
-                succ.append((self._swap(b, j), dir_map[(dr, dc)]))
-
-        if include_special:
-            # 2) Adj9Swap (cặp kề ngang/dọc, tổng = 9, không chứa blank)
-            def try_swap(i: int, j: int) -> None:
-                a, b = self.tiles[i], self.tiles[j]
-                if a != 0 and b != 0 and (a + b == 9):
-                    # Gắn chỉ số i-j để phân biệt các nước A9 tiềm năng trong cùng một trạng thái
-                    succ.append((self._swap(i, j), f"A9:{i}-{j}"))
-
-            # Ngang
-            for rr in range(3):
-                i, j, k = rr * 3 + 0, rr * 3 + 1, rr * 3 + 2
-                try_swap(i, j)
-                try_swap(j, k)
-            # Dọc
-            for cc in range(3):
-                i, j, k = 0 * 3 + cc, 1 * 3 + cc, 2 * 3 + cc
-                try_swap(i, j)
-                try_swap(j, k)
-
-            # 3) CornerDiagSwap (đổi chéo 2 góc, bỏ qua nếu dính blank)
-            for (r1, c1), (r2, c2) in [((0, 0), (2, 2)), ((0, 2), (2, 0))]:
-                i, j = r1 * 3 + c1, r2 * 3 + c2
-                if self.tiles[i] != 0 and self.tiles[j] != 0:
-                    # Gắn chỉ số i-j để phân biệt 2 đường chéo khác nhau nếu đều hợp lệ
-                    succ.append((self._swap(i, j), f"Diag:{i}-{j}"))
-
-        return succ
+        # Sinh kế tiếp trên dạng packed (bảng nước đi dựng sẵn) rồi bọc lại thành view tuple.
+        board = self.board
+        labels = board.move_labels
+        from_packed = PuzzleState.from_packed
+        return [
+            (from_packed(child, board.side), labels[m])
+            for child, m in board.successors(self.packed, include_special)
+        ]
 
     def successors(self) -> List["PuzzleState"]:
         return [s for s, _ in self.successors_with_actions(include_special=True)]
 
     def __str__(self) -> str:
-        rows = [self.tiles[i:i+3] for i in range(0, 9, 3)]
+        side = self.board.side
+        rows = [self.tiles[i:i+side] for i in range(0, len(self.tiles), side)]
         return "\n".join(str(list(r)) for r in rows)
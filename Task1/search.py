@@ -8,78 +8,840 @@ API expectations for `problem`:
 - problem.get_successors(state, current_g_cost) -> List[Tuple[action, next_state]]
 
 Heuristic signature: heuristic(state, problem) -> int
+
+The open list is pluggable (see open_list.py): "heap" (default),
+"bucket" or "bucket_dk" (bucket queue with decrease-key).
+
+storage="dense" replaces the explored set, best_g dict and NodeStore
+with rank-indexed arrays (see dense.py). It needs two extra members:
+- problem.num_states -> int
+- problem.state_index(state) -> int in range(num_states)
+
+Integer move codes: a problem may also provide
+- problem.successor_codes(state) -> Iterable[Tuple[next_state, code]]
+- problem.move_labels: Sequence[action], the action of each code
+- problem.move_cells: Sequence[Tuple[int, int]], the two cells a code swaps
+The engine then works on codes only and builds the actions of the solution
+path (move_labels[code]) when it reconstructs it. Nodes live in a
+NodeStore (parallel arrays: state, parent index, move code), the open
+list holds node ids, and no per-node object is allocated.
+
+Incremental heuristics (see incremental.py: initial/update/value) are
+used incrementally when the problem provides move_cells (or, without move
+codes, problem.get_successor_swaps(state, current_g_cost)
+-> List[Tuple[action, next_state, i, j]], where the move swaps cells i
+and j). Each node then carries the heuristic's data and a child's h comes
+from update(parent_state, parent_data, i, j) instead of a full evaluation.
+
+symmetry=True keys the tables by a canonical representative of each
+state's symmetry class. With dict storage nodes keep the real states, so
+paths stay valid; dense slots only keep a move relative to some member of
+the parent's class, so the path is rebuilt by walking the slots from the
+start state (DenseTables.replay), which stays valid when an inconsistent
+heuristic re-opens a slot from another member.
+It needs problem.canonical_key(state) -> hashable, and for storage="dense"
+problem.canonical_index(state) -> int; the heuristic must take the same
+value on every member of a class (see symmetry.py).
+
+Nothing is printed. Pass a SearchMetrics to collect counters and phase
+timings (profile_heuristic=True also times every heuristic call, at some
+overhead), a SearchBudget to cap expansions/time/memory, and a progress
+callback (called every progress_interval expansions with the metrics;
+returning False cancels the search). When a search stops early it returns
+(None, 0) and metrics.status tells why.
+
+partial_expansion=True (dict storage) runs Enhanced Partial Expansion A*
+(EPEA*): an expanded node n with stored value F only generates the
+children whose f equals F, then goes back into the open list with the
+next larger child f (metrics.reinserted counts those), so children that
+would never be popped before the goal are never generated or queued.
+The operator selection function (OSF) gets child f values from the
+per-move delta table of an incremental heuristic (move_delta, see
+incremental.py) without building child states, when the problem uses
+packed ints of that heuristic's board; otherwise it evaluates every child
+as usual. metrics.expanded counts every (partial) expansion.
+
+checkpoint=path writes the whole search state (node store or dense tables,
+best_g, open list, counters) to a binary file (see checkpoint.py) every
+checkpoint_interval seconds and on SIGTERM; after SIGTERM the search stops
+with status "interrupted". A budget stop (node/time/memory) also writes one,
+with the node it had just popped put back in front (push_front, see
+open_list.py), so the search can be resumed with a larger budget.
+resume=path continues from such a file with the same problem, heuristic
+and options and reaches the same result (the open list is rebuilt in pop
+order); the heuristic is checked by heuristic_id, so lambdas and other
+callables that share a qualified name cannot be told apart. Incremental heuristic data is stored only
+for open nodes, the only ones that still need it.
 """
 
 from __future__ import annotations
 
-import heapq
 import time
-from typing import Any, Tuple
+from array import array
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .checkpoint import Checkpointer, load_checkpoint
+from .dense import UNSEEN, DenseTables
+from .incremental import is_incremental
+from .open_list import make_open_list
+
+# Rough per-entry costs (CPython, 64-bit) behind the memory budget estimate.
+TABLE_ENTRY_BYTES = 120  # best_g dict slot plus the NodeStore row
+FRONTIER_ENTRY_BYTES = 80  # open-list tuple
+DENSE_FRONTIER_ENTRY_BYTES = 130  # open-list tuple plus the bare state
+
+
+class NodeStore:
+    """Search-tree nodes as parallel arrays; a node is its index.
+
+    ``states[n]``, ``parents[n]`` (-1 for the root) and ``moves[n]`` (the
+    move code, or the action itself for problems without codes); with an
+    incremental heuristic also ``h_data[n]``, dropped once ``n`` is
+    expanded. g travels with the open-list entries.
+    """
+
+    __slots__ = ("states", "parents", "moves", "h_data")
+
+    def __init__(self, codes: bool = True, incremental: bool = False) -> None:
+        self.states: List[Any] = []
+        self.parents = array("l")
+        self.moves: Any = array("H") if codes else []
+        self.h_data: Optional[List[Any]] = [] if incremental else None
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def add(self, state: Any, parent: int, move: Any, data: Any = None) -> int:
+        n = len(self.states)
+        self.states.append(state)
+        self.parents.append(parent)
+        self.moves.append(move)
+        if self.h_data is not None:
+            self.h_data.append(data)
+        return n
+
+    def actions_to(self, n: int, labels: Optional[Sequence[Any]] = None) -> List[Any]:
+        """Actions from the root to node ``n`` (``labels[code]`` with move codes)."""
+        parents, moves = self.parents, self.moves
+        path: List[Any] = []
+        while parents[n] >= 0:
+            path.append(moves[n] if labels is None else labels[moves[n]])
+            n = parents[n]
+        path.reverse()
+        return path
+
+
+def _successor_codes(problem, incremental: bool, known: Optional[Tuple[list, list]] = None):
+    """``(succ, labels, cells)``: succ(state, g) yields ``(next_state, move)``.
+
+    With problem.successor_codes, moves are the problem's int codes. Without
+    it, moves are the actions themselves (labels None), or for incremental
+    heuristics codes interned from get_successor_swaps by (action, i, j);
+    ``known`` pre-fills those codes (labels, cells) when resuming.
+    """
+    if hasattr(problem, "successor_codes"):
+        codes = problem.successor_codes
+        return (lambda state, g: codes(state)), problem.move_labels, getattr(problem, "move_cells", None)
+    if not incremental:
+        successors = problem.get_successors
+        return (lambda state, g: ((s, a) for a, s in successors(state, g))), None, None
+
+    labels: List[Any] = list(known[0]) if known else []
+    cells: List[Tuple[int, int]] = [tuple(c) for c in known[1]] if known else []
+    interned: Dict[Any, int] = {(a, i, j): m for m, (a, (i, j)) in enumerate(zip(labels, cells))}
+    swaps = problem.get_successor_swaps
+
+    def succ(state, g) -> Iterable[Tuple[Any, int]]:
+        for action, next_state, i, j in swaps(state, g):
+            code = interned.get((action, i, j))
+            if code is None:
+                code = interned[(action, i, j)] = len(labels)
+                labels.append(action)
+                cells.append((i, j))
+            yield next_state, code
+
+    return succ, labels, cells
+
+
+@dataclass
+class SearchMetrics:
+    status: str = "running"  # solved | exhausted | node_budget | time_budget | memory_budget | cancelled | interrupted
+    generated: int = 0  # children that improved best_g and were pushed
+    expanded: int = 0
+    reinserted: int = 0  # partial_expansion: nodes queued again with their next child f
+    stale_skipped: int = 0  # popped entries already superseded by a cheaper path
+    peak_frontier: int = 0
+    peak_table: int = 0  # states with a recorded g value
+    heuristic_calls: int = 0
+    heuristic_time: float = 0.0  # only measured with profile_heuristic=True
+    setup_time: float = 0.0
+    search_time: float = 0.0
+    reconstruct_time: float = 0.0
+    # Proven bound on cost / optimal cost of the returned path (1.0 = optimal,
+    # given an admissible heuristic); None when nothing was found.
+    suboptimality: Optional[float] = None
+
+    def reset(self) -> None:
+        self.__dict__.update(SearchMetrics().__dict__)
+
+    @property
+    def wall_time(self) -> float:
+        return self.setup_time + self.search_time + self.reconstruct_time
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["wall_time"] = self.wall_time
+        return d
+
+
+@dataclass
+class SearchBudget:
+    max_expanded: Optional[int] = None
+    max_seconds: Optional[float] = None
+    max_memory_bytes: Optional[int] = None  # estimated, see *_ENTRY_BYTES
+    check_interval: int = 1024  # expansions between time/memory checks
+
+
+ProgressFn = Callable[[SearchMetrics], Optional[bool]]
+
+
+class _Monitor:
+    """Budget, progress and timing bookkeeping shared by both storage modes."""
+
+    def __init__(
+        self,
+        metrics: SearchMetrics,
+        budget: Optional[SearchBudget],
+        progress: Optional[ProgressFn],
+        progress_interval: int,
+        memory_estimate: Callable[[], int],
+    ) -> None:
+        self.metrics = metrics
+        self.budget = budget
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.memory_estimate = memory_estimate
+        self.search_start = time.perf_counter()
+
+    def stop_reason(self) -> Optional[str]:
+        """Called once per expansion, before the node is expanded."""
+        m = self.metrics
+        n = m.expanded
+        b = self.budget
+        if b is not None:
+            if b.max_expanded is not None and n >= b.max_expanded:
+                return "node_budget"
+            if n % b.check_interval == 0:
+                if b.max_seconds is not None and m.setup_time + time.perf_counter() - self.search_start > b.max_seconds:
+                    return "time_budget"
+                if b.max_memory_bytes is not None and self.memory_estimate() > b.max_memory_bytes:
+                    return "memory_budget"
+        if self.progress is not None and n and n % self.progress_interval == 0:
+            m.search_time = time.perf_counter() - self.search_start
+            if self.progress(m) is False:
+                return "cancelled"
+        return None
+
+    def end_search(self) -> None:
+        self.metrics.search_time = time.perf_counter() - self.search_start
+
+
+# Checkpoints ----------------------------------------------------------------
+_COUNTERS = ("expanded", "generated", "stale_skipped")
+
+
+def _open_sections(frontier) -> Dict[str, Any]:
+    entries = frontier.items()
+    return {
+        "open_f": array("l", [e[0] for e in entries]),
+        "open_g": array("l", [e[1] for e in entries]),
+        "open_items": [e[2] for e in entries],
+        "open_keys": [e[3] for e in entries],
+    }
+
+
+def _restore_open(frontier, sections: Dict[str, Any], meta: Dict[str, Any]) -> None:
+    frontier.extend(zip(sections["open_f"], sections["open_g"], sections["open_items"], sections["open_keys"]))
+    frontier.peak_size = max(frontier.peak_size, meta["peak_frontier"])
+
+
+def _checkpoint_meta(base: Dict[str, Any], metrics: SearchMetrics, frontier, **extra: Any) -> Dict[str, Any]:
+    meta = dict(base, peak_frontier=frontier.peak_size, **extra)
+    meta.update((name, getattr(metrics, name)) for name in _COUNTERS)
+    return meta
+
+
+def heuristic_id(heuristic) -> str:
+    """Stable name of ``heuristic`` (no object address), recorded in checkpoints.
+
+    Functions give ``module.qualname``; objects their ``repr`` when their
+    class defines one (``MismatchHeuristic('h2')``, ``PDBHeuristic(...)``,
+    ``StateHeuristic(...)``), else their class name.
+    """
+    if type(heuristic).__repr__ is not object.__repr__ and not hasattr(heuristic, "__qualname__"):
+        return repr(heuristic)
+    named = heuristic if hasattr(heuristic, "__qualname__") else type(heuristic)
+    return f"{named.__module__}.{named.__qualname__}"
+
+
+def _load_resume(path: str, base: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    meta, sections = load_checkpoint(path)
+    for name, value in base.items():
+        if meta.get(name) != value:
+            raise ValueError(f"{path}: checkpoint has {name}={meta.get(name)!r}, this search has {value!r}")
+    return meta, sections
+
+
+def _bind_heuristic(heuristic, problem, metrics: SearchMetrics, profile: bool) -> Callable[[Any], int]:
+    if not profile:
+        # heuristic_calls is derived from generated at the end instead.
+        return lambda state: heuristic(state, problem)
+    perf = time.perf_counter
+
+    def h(state) -> int:
+        t0 = perf()
+        value = heuristic(state, problem)
+        metrics.heuristic_time += perf() - t0
+        return value
+
+    return h
+
 
+def _bind_update(heuristic, metrics: SearchMetrics, profile: bool) -> Callable[[Any, Any, int, int], Any]:
+    update = heuristic.update
+    if not profile:
+        return update
+    perf = time.perf_counter
 
-class Node:
-    def __init__(self, state: Any, parent: "Node | None", action: str | None, g_cost: int) -> None:
-        self.state = state
-        self.parent = parent
-        self.action = action
-        self.g_cost = g_cost
+    def timed(parent_state, parent_data, i: int, j: int):
+        t0 = perf()
+        data = update(parent_state, parent_data, i, j)
+        metrics.heuristic_time += perf() - t0
+        return data
 
-    def __lt__(self, other: "Node") -> bool:
-        return self.g_cost < other.g_cost
+    return timed
 
 
-def a_star_search(problem, heuristic):
-    print("Starting A* search...")
-    start_time = time.time()
+def a_star_search(
+    problem,
+    heuristic,
+    open_list="heap",
+    storage="dict",
+    *,
+    metrics: Optional[SearchMetrics] = None,
+    budget: Optional[SearchBudget] = None,
+    progress: Optional[ProgressFn] = None,
+    progress_interval: int = 10000,
+    profile_heuristic: bool = False,
+    symmetry: bool = False,
+    checkpoint: Optional[str] = None,
+    checkpoint_interval: Optional[float] = None,
+    resume: Optional[str] = None,
+    partial_expansion: bool = False,
+):
+    if storage not in ("dict", "dense"):
+        raise ValueError(f"Unknown storage {storage!r}; expected 'dict' or 'dense'")
+    if partial_expansion and (storage != "dict" or checkpoint is not None or resume is not None):
+        raise ValueError("partial_expansion needs storage='dict' and no checkpoint/resume")
+    if metrics is None:
+        metrics = SearchMetrics()
+    else:
+        metrics.reset()
+    run = _a_star_search_dense if storage == "dense" else _a_star_search_dict
+    if is_incremental(heuristic) and (
+        hasattr(problem, "move_cells") if hasattr(problem, "successor_codes") else hasattr(problem, "get_successor_swaps")
+    ):
+        inc = (heuristic.initial, _bind_update(heuristic, metrics, profile_heuristic), heuristic.value)
+        h = None
+    else:
+        inc = None
+        h = _bind_heuristic(heuristic, problem, metrics, profile_heuristic)
+    if storage == "dense":
+        key = problem.canonical_index if symmetry else problem.state_index
+    else:
+        key = problem.canonical_key if symmetry else None
+    if partial_expansion:
+        return _epea_search_dict(problem, h, open_list, metrics, budget, progress, progress_interval, inc, key, heuristic)
+    if checkpoint is None and resume is None:
+        return run(problem, h, open_list, metrics, budget, progress, progress_interval, inc, key)
+
+    # Một checkpoint chỉ dùng lại được với đúng bài toán và tùy chọn đã tạo ra nó.
+    base = {
+        "engine": "a_star", "storage": storage, "open_list": open_list if isinstance(open_list, str) else None,
+        "symmetry": symmetry, "incremental": inc is not None, "start": repr(problem.get_initial_state()),
+        "heuristic": heuristic_id(heuristic),
+    }
+    restored = _load_resume(resume, base) if resume is not None else None
+    if checkpoint is None:
+        return run(problem, h, open_list, metrics, budget, progress, progress_interval, inc, key, None, base, restored)
+    with Checkpointer(checkpoint, checkpoint_interval) as ckpt:
+        return run(problem, h, open_list, metrics, budget, progress, progress_interval, inc, key, ckpt, base, restored)
+
+
+def search_with_metrics(problem, heuristic, **kwargs) -> Tuple[Any, int, SearchMetrics]:
+    """Like a_star_search, but also returns the SearchMetrics."""
+    metrics = SearchMetrics()
+    path, cost = a_star_search(problem, heuristic, metrics=metrics, **kwargs)
+    return path, cost, metrics
+
+
+def _a_star_search_dict(
+    problem, h, open_list, metrics, budget, progress, progress_interval, inc=None, key=None,
+    ckpt=None, ckpt_base=None, restored=None,
+):
+    # key: canonical key function with symmetry=True, else states are their own keys.
+    t0 = time.perf_counter()
+
+    meta, sections = restored or (None, None)
+    interned = not hasattr(problem, "successor_codes") and inc is not None
+    known = (sections["labels"], sections["cells"]) if restored and interned else None
+    succ, labels, cells = _successor_codes(problem, inc is not None, known)
+    nodes = NodeStore(codes=labels is not None, incremental=inc is not None)
+    frontier = make_open_list(open_list)
+    if ckpt is not None and not hasattr(frontier, "items"):
+        raise ValueError("checkpoint needs an open list with items() (see open_list.py)")
+
+    if restored is None:
+        initial_state = problem.get_initial_state()
+        start_data = inc[0](initial_state) if inc else None
+        nodes.add(initial_state, -1, 0 if labels is not None else None, start_data)
+        f_cost = inc[2](start_data) if inc else h(initial_state)
+        k0 = initial_state if key is None else key(initial_state)
+        frontier.push(f_cost, 0, 0, k0)
+        best_g = {k0: 0}
+    else:
+        nodes.states, nodes.parents, nodes.moves = sections["states"], sections["parents"], sections["moves"]
+        best_g = dict(zip(sections["best_keys"], sections["best_g"]))
+        _restore_open(frontier, sections, meta)
+        if inc:
+            # Chỉ các nút còn mở cần dữ liệu heuristic (các nút khác đã bỏ).
+            nodes.h_data = [None] * len(nodes.states)
+            for n, data in zip(sections["open_items"], sections["open_data"]):
+                nodes.h_data[n] = data
+        for name in _COUNTERS:
+            setattr(metrics, name, meta[name])
+    states, h_store = nodes.states, nodes.h_data
+    add_state, add_parent, add_move = states.append, nodes.parents.append, nodes.moves.append
+    metrics.setup_time = time.perf_counter() - t0
+
+    def snapshot() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        sections = {
+            "states": states, "parents": nodes.parents, "moves": nodes.moves,
+            "best_keys": list(best_g), "best_g": array("l", best_g.values()),
+            **_open_sections(frontier),
+        }
+        if inc:
+            sections["open_data"] = [h_store[n] for n in sections["open_items"]]
+        if interned:
+            sections.update(labels=labels, cells=cells)
+        return _checkpoint_meta(ckpt_base, metrics, frontier), sections
+
+    monitor = _Monitor(
+        metrics, budget, progress, progress_interval,
+        lambda: len(best_g) * TABLE_ENTRY_BYTES + len(frontier) * FRONTIER_ENTRY_BYTES,
+    )
+    stop = monitor.stop_reason
+    inf = float("inf")
+
+    def finish(status: str) -> None:
+        metrics.status = status
+        metrics.peak_frontier = frontier.peak_size
+        metrics.peak_table = len(best_g)
+        metrics.heuristic_calls = metrics.generated + 1
+
+    while frontier:
+        if ckpt is not None and ckpt.due(metrics.expanded):
+            ckpt.write(*snapshot())
+            if ckpt.requested:
+                monitor.end_search()
+                finish("interrupted")
+                return None, 0
+        f, g, n = frontier.pop()
+
+        state = states[n]
+        if g > best_g.get(state if key is None else key(state), inf):
+            metrics.stale_skipped += 1
+            continue
+
+        if problem.is_goal(state):
+            monitor.end_search()
+            t1 = time.perf_counter()
+            path = nodes.actions_to(n, labels)
+            metrics.reconstruct_time = time.perf_counter() - t1
+            metrics.suboptimality = 1.0
+            finish("solved")
+            return path, g
+
+        reason = stop()
+        if reason is not None:
+            monitor.end_search()
+            if ckpt is not None:
+                frontier.push_front(f, g, n, state if key is None else key(state))
+                ckpt.write(*snapshot())
+            finish(reason)
+            return None, 0
+        metrics.expanded += 1
+
+        new_g = g + 1
+        if inc is None:
+            for next_state, m in succ(state, g):
+                k = next_state if key is None else key(next_state)
+                if new_g >= best_g.get(k, inf):
+                    continue
+                best_g[k] = new_g
+                c = len(states)
+                add_state(next_state)
+                add_parent(n)
+                add_move(m)
+                frontier.push(new_g + h(next_state), new_g, c, k)
+                metrics.generated += 1
+            continue
+
+        _, update, value = inc
+        data = h_store[n]
+        h_store[n] = None  # only children need it
+        add_data = h_store.append
+        for next_state, m in succ(state, g):
+            k = next_state if key is None else key(next_state)
+            if new_g >= best_g.get(k, inf):
+                continue
+            best_g[k] = new_g
+            i, j = cells[m]
+            child_data = update(state, data, i, j)
+            c = len(states)
+            add_state(next_state)
+            add_parent(n)
+            add_move(m)
+            add_data(child_data)
+            frontier.push(new_g + value(child_data), new_g, c, k)
+            metrics.generated += 1
+
+    monitor.end_search()
+    finish("exhausted")
+    return None, 0
+
+
+# Partial expansion (EPEA*) ----------------------------------------------------
+def _operator_selection(problem, heuristic, h, inc, succ, cells):
+    """OSF: ``osf(state, data, child_g, F, first) -> (children, next_f, evaluated)``.
+
+    ``children`` are ``(f, child, move, child_data)`` for the children with
+    f == F (also f < F on a node's first expansion, so an inconsistent
+    heuristic loses nothing); ``next_f`` is the smallest child f above F
+    (inf if none) and ``evaluated`` the number of child f values computed.
+    """
+    inf = float("inf")
+    board = getattr(problem, "board", None)
+    if (
+        inc is not None
+        and getattr(problem, "packed", False)
+        and getattr(heuristic, "board", None) is board
+        and hasattr(heuristic, "move_delta")
+    ):
+        # Packed ints: f of each child from the per-move delta table; only the
+        # selected children are built. kind: 0 slide, 1 A{N*N} pair, 2 Diag.
+        value = inc[2]
+        bits, mask, total = board.bits, board.mask, board.pair_sum
+        deltas = heuristic.move_delta
+        slides = tuple(tuple((m, si, sj, deltas[m], 0) for m, si, sj in row) for row in board.slide_moves)
+        specials = tuple((m, si, sj, deltas[m], 1) for m, si, sj in board.pair_moves) + tuple(
+            (m, si, sj, deltas[m], 2) for m, si, sj in board.diag_moves
+        )
+        blank_index = board.blank_index
+
+        def osf(s, data, child_g, F, first):
+            out = []
+            next_f = inf
+            evaluated = 0
+            for m, si, sj, dm, kind in slides[blank_index(s)] + specials:
+                a = (s >> si) & mask
+                b = (s >> sj) & mask
+                if kind == 1:
+                    if a + b != total:
+                        continue
+                elif kind == 2 and not (a and b):
+                    continue
+                evaluated += 1
+                d = data + dm[a << bits | b]
+                f = child_g + value(d)
+                if f == F or (f < F and first):
+                    x = a ^ b
+                    out.append((f, s ^ (x << si) ^ (x << sj), m, d))
+                elif F < f < next_f:
+                    next_f = f
+            return out, next_f, evaluated
+
+        return osf
+
+    def osf(state, data, child_g, F, first):
+        out = []
+        next_f = inf
+        evaluated = 0
+        for child, m in succ(state, child_g - 1):
+            evaluated += 1
+            if inc is None:
+                d = None
+                f = child_g + h(child)
+            else:
+                i, j = cells[m]
+                d = inc[1](state, data, i, j)
+                f = child_g + inc[2](d)
+            if f == F or (f < F and first):
+                out.append((f, child, m, d))
+            elif F < f < next_f:
+                next_f = f
+        return out, next_f, evaluated
+
+    return osf
+
+
+def _epea_search_dict(problem, h, open_list, metrics, budget, progress, progress_interval, inc=None, key=None, heuristic=None):
+    t0 = time.perf_counter()
+
+    succ, labels, cells = _successor_codes(problem, inc is not None)
+    nodes = NodeStore(codes=labels is not None, incremental=inc is not None)
+    states, h_store = nodes.states, nodes.h_data
+    add_state, add_parent, add_move = states.append, nodes.parents.append, nodes.moves.append
+    add_data = h_store.append if inc else None
+    value = inc[2] if inc else None
+    osf = _operator_selection(problem, heuristic, h, inc, succ, cells)
 
     initial_state = problem.get_initial_state()
-    start_node = Node(initial_state, parent=None, action=None, g_cost=0)
+    start_data = inc[0](initial_state) if inc else None
+    nodes.add(initial_state, -1, 0 if labels is not None else None, start_data)
 
-    frontier: list[Tuple[int, int, Node]] = []
-    tie_breaker = 0
-    f_cost = start_node.g_cost + heuristic(start_node.state, problem)
-    heapq.heappush(frontier, (f_cost, tie_breaker, start_node))
+    frontier = make_open_list(open_list)
+    k0 = initial_state if key is None else key(initial_state)
+    frontier.push(value(start_data) if inc else h(initial_state), 0, 0, k0)
 
-    explored = set()
-    best_g = {initial_state: 0}
+    best_g = {k0: 0}
+    metrics.setup_time = time.perf_counter() - t0
+
+    monitor = _Monitor(
+        metrics, budget, progress, progress_interval,
+        lambda: len(best_g) * TABLE_ENTRY_BYTES + len(frontier) * FRONTIER_ENTRY_BYTES,
+    )
+    stop = monitor.stop_reason
+    inf = float("inf")
+    evaluated = 1
+
+    def finish(status: str) -> None:
+        metrics.status = status
+        metrics.peak_frontier = frontier.peak_size
+        metrics.peak_table = len(best_g)
+        metrics.heuristic_calls = evaluated
 
     while frontier:
-        _, _, current_node = heapq.heappop(frontier)
+        F, g, n = frontier.pop()
 
-        if current_node.g_cost > best_g.get(current_node.state, float("inf")):
+        state = states[n]
+        k = state if key is None else key(state)
+        if g > best_g.get(k, inf):
+            metrics.stale_skipped += 1
             continue
 
-        if problem.is_goal(current_node.state):
-            end_time = time.time()
-            print(f"Solution found in {end_time - start_time:.4f} seconds.")
-            print(f"Nodes explored: {len(explored)}")
-
-            path: list[str] = []
-            node = current_node
-            while node.parent is not None:
-                if node.action is not None:
-                    path.append(node.action)
-                node = node.parent
-            path.reverse()
-            return path, current_node.g_cost
-
-        explored.add(current_node.state)
-
-        if len(explored) % 10000 == 0:
-            print(
-                f"Explored {len(explored)} nodes... (Current path cost: {current_node.g_cost})"
-            )
-
-        for action, next_state in problem.get_successors(current_node.state, current_node.g_cost):
-            new_g = current_node.g_cost + 1
-            if new_g >= best_g.get(next_state, float("inf")):
+        if problem.is_goal(state):
+            monitor.end_search()
+            t1 = time.perf_counter()
+            path = nodes.actions_to(n, labels)
+            metrics.reconstruct_time = time.perf_counter() - t1
+            metrics.suboptimality = 1.0
+            finish("solved")
+            return path, g
+
+        reason = stop()
+        if reason is not None:
+            monitor.end_search()
+            finish(reason)
+            return None, 0
+        metrics.expanded += 1
+
+        if inc:
+            data = h_store[n]
+            h_n = value(data)
+        else:
+            data = None
+            h_n = h(state)
+            evaluated += 1
+        new_g = g + 1
+        children, next_f, count = osf(state, data, new_g, F, F == g + h_n)
+        evaluated += count
+        for f, child, m, child_data in children:
+            ck = child if key is None else key(child)
+            if new_g >= best_g.get(ck, inf):
                 continue
-            best_g[next_state] = new_g
-            child_node = Node(next_state, current_node, action, new_g)
-            f_cost = child_node.g_cost + heuristic(next_state, problem)
-            tie_breaker += 1
-            heapq.heappush(frontier, (f_cost, tie_breaker, child_node))
+            best_g[ck] = new_g
+            c = len(states)
+            add_state(child)
+            add_parent(n)
+            add_move(m)
+            if inc:
+                add_data(child_data)
+            frontier.push(f, new_g, c, ck)
+            metrics.generated += 1
+        if next_f < inf:
+            # Các con còn lại có f >= next_f: đưa n trở lại open list thay cho chúng.
+            frontier.push(next_f, g, n, k)
+            metrics.reinserted += 1
+        elif inc:
+            h_store[n] = None
 
-    print("No solution found.")
+    monitor.end_search()
+    finish("exhausted")
     return None, 0
 
+
+def _a_star_search_dense(
+    problem, h, open_list, metrics, budget, progress, progress_interval, inc=None, key=None,
+    ckpt=None, ckpt_base=None, restored=None,
+):
+    t0 = time.perf_counter()
+
+    meta, sections = restored or (None, None)
+    index = key or problem.state_index
+    # Slots keyed by symmetry class: rebuild the path with tables.replay.
+    by_class = index != problem.state_index
+    tables = DenseTables(problem.num_states)
+    interned = not hasattr(problem, "successor_codes")
+    known = (sections["labels"], sections["cells"]) if restored and interned and inc is not None else None
+    succ, labels, cells = _successor_codes(problem, inc is not None, known)
+    if labels is None:
+        # Actions are interned to 1-byte codes for tables.move.
+        labels = list(sections["labels"]) if restored else []
+        codes: dict = {a: m for m, a in enumerate(labels)}
+
+        def code_of(action) -> int:
+            code = codes.get(action)
+            if code is None:
+                code = codes[action] = len(labels)
+                if code > 255:
+                    raise ValueError("storage='dense' supports at most 256 distinct actions")
+                labels.append(action)
+            return code
+    else:
+        code_of = None
+
+    # Incremental heuristic data, by rank like the other tables.
+    h_data = [None] * problem.num_states if inc else None
+    # Frontier entries hold the bare state; g and parent live in the tables.
+    frontier = make_open_list(open_list)
+    if ckpt is not None and not hasattr(frontier, "items"):
+        raise ValueError("checkpoint needs an open list with items() (see open_list.py)")
+
+    if restored is None:
+        initial_state = problem.get_initial_state()
+        r0 = index(initial_state)
+        tables.record(r0, 0, -1, 0)
+        recorded = 1
+        if inc:
+            h_data[r0] = inc[0](initial_state)
+        frontier.push(inc[2](h_data[r0]) if inc else h(initial_state), 0, initial_state, r0)
+    else:
+        for name in ("g", "parent", "move"):
+            if len(sections[name]) != len(getattr(tables, name)):
+                raise ValueError(f"Checkpoint table {name!r} does not match num_states={problem.num_states}")
+            setattr(tables, name, sections[name])
+        recorded = meta["recorded"]
+        _restore_open(frontier, sections, meta)
+        if inc:
+            for state, data in zip(sections["open_items"], sections["open_data"]):
+                h_data[index(state)] = data
+        for name in _COUNTERS:
+            setattr(metrics, name, meta[name])
+    g_table = tables.g
+    metrics.setup_time = time.perf_counter() - t0
+
+    def snapshot() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        sections = {
+            "g": tables.g, "parent": tables.parent, "move": tables.move,
+            **_open_sections(frontier),
+        }
+        if inc:
+            sections["open_data"] = [h_data[index(state)] for state in sections["open_items"]]
+        if interned:
+            sections.update(labels=labels, cells=cells)
+        return _checkpoint_meta(ckpt_base, metrics, frontier, recorded=recorded), sections
+
+    table_bytes = tables.nbytes() + (8 * len(h_data) if inc else 0)
+    monitor = _Monitor(
+        metrics, budget, progress, progress_interval,
+        lambda: table_bytes + len(frontier) * DENSE_FRONTIER_ENTRY_BYTES,
+    )
+    stop = monitor.stop_reason
+
+    def finish(status: str) -> None:
+        metrics.status = status
+        metrics.peak_frontier = frontier.peak_size
+        metrics.peak_table = recorded
+        metrics.heuristic_calls = metrics.generated + 1
+
+    while frontier:
+        if ckpt is not None and ckpt.due(metrics.expanded):
+            ckpt.write(*snapshot())
+            if ckpt.requested:
+                monitor.end_search()
+                finish("interrupted")
+                return None, 0
+        f, g, state = frontier.pop()
+        r = index(state)
+
+        if g > g_table[r]:
+            metrics.stale_skipped += 1
+            continue
+
+        if problem.is_goal(state):
+            monitor.end_search()
+            t1 = time.perf_counter()
+            if by_class:
+                steps = tables.replay(r, problem.get_initial_state(), succ, index)
+                path = [m if code_of is not None else labels[m] for _, m in steps]
+            else:
+                path = [labels[m] for m in tables.moves_to(r)]
+            metrics.reconstruct_time = time.perf_counter() - t1
+            metrics.suboptimality = 1.0
+            finish("solved")
+            return path, g
+
+        reason = stop()
+        if reason is not None:
+            monitor.end_search()
+            if ckpt is not None:
+                frontier.push_front(f, g, state, r)
+                ckpt.write(*snapshot())
+            finish(reason)
+            return None, 0
+        metrics.expanded += 1
+
+        new_g = g + 1
+        if inc is None:
+            for next_state, m in succ(state, g):
+                c = index(next_state)
+                old_g = g_table[c]
+                if new_g >= old_g:
+                    continue
+                if old_g == UNSEEN:
+                    recorded += 1
+                tables.record(c, new_g, r, m if code_of is None else code_of(m))
+                frontier.push(new_g + h(next_state), new_g, next_state, c)
+                metrics.generated += 1
+            continue
+
+        _, update, value = inc
+        data = h_data[r]
+        for next_state, m in succ(state, g):
+            c = index(next_state)
+            old_g = g_table[c]
+            if new_g >= old_g:
+                continue
+            if old_g == UNSEEN:
+                recorded += 1
+            tables.record(c, new_g, r, m)
+            i, j = cells[m]
+            child_data = h_data[c] = update(state, data, i, j)
+            frontier.push(new_g + value(child_data), new_g, next_state, c)
+            metrics.generated += 1
+
+    monitor.end_search()
+    finish("exhausted")
+    return None, 0
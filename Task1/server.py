@@ -0,0 +1,430 @@
+"""Asyncio solve service with a small HTTP/JSON front end.
+
+``SolveService`` runs solves on a process pool behind an asyncio event
+loop:
+
+- coalescing: concurrent requests for the same (state, side, solver,
+  heuristic) share one solve; later requests just await its result
+- deadlines: each request has a deadline in seconds (``deadline`` field,
+  else the service default). The job gets it as an absolute time and turns
+  what is left when a worker picks it up into ``SearchBudget(max_seconds)``
+  for the solvers in ``strategies.BUDGET_SOLVERS`` (all but ``table``, a
+  lookup), so a solve nobody waits for stops too. A coalesced request
+  waits at most for its own deadline; the shared solve keeps the budget of
+  the request that started it.
+- backpressure: at most ``max_pending`` distinct solves queued or running;
+  beyond that requests are rejected at once (HTTP 503 + Retry-After)
+  instead of queueing without bound
+- an optional ``SolutionCache`` (cache.py, 3x3 only) answers repeated
+  states without a solve; optimal solutions are written back. Its sqlite
+  calls run on one dedicated thread, never on the event loop
+- boards up to ``max_side`` (default 4). The loop only checks names and
+  the state; heuristic tables of a board are built in the workers
+- ``ServiceMetrics``: QPS, latency histogram, cache hits, expansions/sec
+
+HTTP (HTTP/1.1, keep-alive), on localhost TCP or a Unix socket:
+
+- ``POST /solve`` with ``{"state": [...] | packed int, "side", "solver",
+  "heuristic", "deadline", "id"}`` (only ``state`` is required). 200 with
+  the result, 400 on bad input, 503 when overloaded, 504 past the deadline.
+- ``GET /metrics``, ``GET /health``
+
+``python -m Task1.server [--port 8080 | --unix PATH] [--workers N] ...``
+"""
+
+from __future__ import annotations
+
+# Allow running this file directly without package context
+if __name__ == "__main__" and (__package__ is None or __package__ == ""):
+    import os as _os, sys as _sys
+    _pkg_dir = _os.path.dirname(_os.path.abspath(__file__))
+    _parent = _os.path.dirname(_pkg_dir)
+    if _parent not in _sys.path:
+        _sys.path.insert(0, _parent)
+    __package__ = _os.path.basename(_pkg_dir)
+
+import asyncio
+import bisect
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .batch import _json_state, _load_shared, _to_packed
+from .cache import SolutionCache
+from .problem import PuzzleProblem
+from .search import SearchBudget, SearchMetrics
+from .strategies import BUDGET_SOLVERS, SOLVERS, cacheable, resolve_heuristic, solve_with_stats
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+MAX_BODY_BYTES = 1 << 16
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+class Overloaded(Exception):
+    """Too many solves pending; the caller should retry later."""
+
+
+def _solve_job(
+    s: int, side: int, solver: str, heuristic: Optional[str], deadline_at: Optional[float]
+) -> Dict[str, Any]:
+    """Runs in a pool worker. ``deadline_at`` is wall-clock time (time.time())."""
+    t0 = time.perf_counter()
+    options: Dict[str, Any] = {}
+    metrics = SearchMetrics()
+    if solver in BUDGET_SOLVERS:
+        options["metrics"] = metrics
+        if deadline_at is not None:
+            remaining = deadline_at - time.time()
+            if remaining <= 0:
+                # Waited in the queue past the deadline: do not start at all.
+                return {"actions": None, "cost": 0, "expanded": 0, "seconds": 0.0, "status": "time_budget"}
+            options["budget"] = SearchBudget(max_seconds=remaining)
+    actions, cost, expanded = solve_with_stats(PuzzleProblem(s, side), solver, heuristic, **options)
+    if solver in BUDGET_SOLVERS:
+        status = metrics.status
+    else:
+        status = "solved" if actions is not None else "exhausted"
+    return {
+        "actions": actions, "cost": cost, "expanded": expanded,
+        "seconds": time.perf_counter() - t0, "status": status,
+    }
+
+
+def _ready() -> None:
+    """No-op job: makes the pool start its workers."""
+
+
+class ServiceMetrics:
+    """Counters for ``GET /metrics``; only touched from the event loop."""
+
+    def __init__(self, window: float = 60.0) -> None:
+        self.started = time.monotonic()
+        self.window = window
+        self.requests = 0
+        self.responses: Dict[int, int] = {}
+        self.coalesced = 0
+        self.cache_hits = 0
+        self.rejected = 0
+        self.deadline_exceeded = 0
+        self.solves = 0
+        self.expanded = 0
+        self.solve_seconds = 0.0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._recent: Deque[float] = deque()  # request timestamps within ``window``
+
+    def request(self) -> None:
+        now = time.monotonic()
+        self.requests += 1
+        self._recent.append(now)
+        self._trim(now)
+
+    def response(self, code: int, seconds: float) -> None:
+        self.responses[code] = self.responses.get(code, 0) + 1
+        self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000.0)] += 1
+
+    def solved(self, result: Dict[str, Any]) -> None:
+        self.solves += 1
+        self.expanded += result["expanded"]
+        self.solve_seconds += result["seconds"]
+
+    def _trim(self, now: float) -> None:
+        recent = self._recent
+        while recent and recent[0] < now - self.window:
+            recent.popleft()
+
+    def _percentile(self, q: float) -> Optional[float]:
+        # Upper bound of the bucket holding the q-quantile (None: open bucket).
+        total = sum(self.latency_counts)
+        if not total:
+            return 0.0
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + (None,), self.latency_counts):
+            seen += count
+            if seen >= q * total:
+                return bound
+        return None
+
+    def snapshot(self, in_flight: int, cache: Optional[SolutionCache]) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._trim(now)
+        uptime = now - self.started
+        bounds = [str(b) for b in LATENCY_BUCKETS_MS] + ["+inf"]
+        return {
+            "uptime_seconds": uptime,
+            "requests": self.requests,
+            "qps": len(self._recent) / min(self.window, uptime) if uptime else 0.0,
+            "qps_total": self.requests / uptime if uptime else 0.0,
+            "responses": {str(k): v for k, v in sorted(self.responses.items())},
+            "latency_ms": {
+                "buckets": dict(zip(bounds, self.latency_counts)),
+                "p50": self._percentile(0.50),
+                "p90": self._percentile(0.90),
+                "p99": self._percentile(0.99),
+            },
+            "in_flight": in_flight,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "deadline_exceeded": self.deadline_exceeded,
+            "cache_hits": self.cache_hits,
+            "cache": cache.stats() if cache is not None else None,
+            "solves": self.solves,
+            "expanded": self.expanded,
+            # Per second of worker time, and per second of uptime.
+            "expansions_per_sec": self.expanded / self.solve_seconds if self.solve_seconds else 0.0,
+            "expansions_per_sec_wall": self.expanded / uptime if uptime else 0.0,
+        }
+
+
+class SolveService:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        solver: str = "astar",
+        heuristic: Optional[str] = None,
+        max_pending: int = 256,
+        deadline: float = 10.0,
+        cache: Optional[SolutionCache] = None,
+        max_side: int = 4,
+    ) -> None:
+        if max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        if deadline <= 0:
+            raise ValueError("deadline must be > 0")
+        if max_side < 2:
+            raise ValueError("max_side must be >= 2")
+        self._check(solver, heuristic)
+        self.solver = solver
+        self.heuristic = heuristic
+        self.max_pending = max_pending
+        self.deadline = deadline
+        self.max_side = max_side
+        self.cache = cache
+        # sqlite is blocking and its connection single-threaded: one thread for it.
+        self._cache_io = ThreadPoolExecutor(1, thread_name_prefix="solution-cache") if cache is not None else None
+        self.metrics = ServiceMetrics()
+        # Load the default tables before the pool forks so workers share them.
+        _load_shared(solver, resolve_heuristic(solver, heuristic))
+        self._pool = ProcessPoolExecutor(workers)
+        # Fork the workers now, before any socket is open: a worker forked
+        # mid-request would inherit the client connection and keep it open.
+        self._pool.submit(_ready).result()
+        self._inflight: Dict[Tuple[int, int, str, Optional[str]], "asyncio.Future[Dict[str, Any]]"] = {}
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._cache_io is not None:
+            # Pending cache writes finish before the caller closes the cache.
+            self._cache_io.shutdown(wait=True)
+
+    @staticmethod
+    def _check(solver: str, heuristic: Optional[str]) -> None:
+        # Names only: every board has the same heuristic names, and the 3x3
+        # table is already loaded, so nothing is built on the event loop.
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver {solver!r}; expected one of {sorted(SOLVERS)}")
+        if heuristic is not None and not isinstance(heuristic, str):
+            raise ValueError("heuristic must be a name")
+        resolve_heuristic(solver, heuristic)
+
+    @property
+    def pending(self) -> int:
+        return len(self._inflight)
+
+    async def solve(
+        self,
+        state: Any,
+        side: int = 3,
+        solver: Optional[str] = None,
+        heuristic: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Solve one state; raises ValueError (bad input), Overloaded or asyncio.TimeoutError."""
+        solver = solver or self.solver
+        heuristic = heuristic if heuristic is not None else (self.heuristic if solver == self.solver else None)
+        if not isinstance(side, int) or not 2 <= side <= self.max_side:
+            raise ValueError(f"side must be an int in 2..{self.max_side}")
+        self._check(solver, heuristic)
+        s = _to_packed(_json_state(state), side)
+        deadline = self.deadline if deadline is None else float(deadline)
+        if deadline <= 0:
+            raise ValueError("deadline must be > 0")
+
+        if self.cache is not None and side == 3:
+            hit = await asyncio.get_running_loop().run_in_executor(self._cache_io, self.cache.get, s)
+            if hit is not None:
+                self.metrics.cache_hits += 1
+                return {"actions": hit[0], "cost": hit[1], "expanded": 0, "seconds": 0.0,
+                        "status": "solved", "cached": True, "coalesced": False}
+
+        key = (s, side, solver, heuristic)
+        fut = self._inflight.get(key)
+        coalesced = fut is not None
+        if coalesced:
+            self.metrics.coalesced += 1
+        else:
+            if len(self._inflight) >= self.max_pending:
+                self.metrics.rejected += 1
+                raise Overloaded(f"{len(self._inflight)} solves pending")
+            loop = asyncio.get_running_loop()
+            fut = loop.run_in_executor(self._pool, _solve_job, s, side, solver, heuristic, time.time() + deadline)
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f, key=key: self._finished(key, f))
+
+        result = await asyncio.wait_for(asyncio.shield(fut), timeout=deadline)
+        return {**result, "cached": False, "coalesced": coalesced}
+
+    def _finished(self, key, fut: "asyncio.Future[Dict[str, Any]]") -> None:
+        del self._inflight[key]
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        result = fut.result()
+        self.metrics.solved(result)
+        s, side, solver, heuristic = key
+        if self.cache is not None and side == 3 and cacheable(solver, heuristic) and result["actions"] is not None:
+            self._cache_io.submit(self.cache.put, s, result["actions"])
+
+    # HTTP -------------------------------------------------------------------
+    async def handle_solve(self, body: bytes) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        try:
+            req = json.loads(body or b"null")
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}, {}
+        if not isinstance(req, dict) or "state" not in req:
+            return 400, {"error": 'Body must be a JSON object with a "state" field'}, {}
+        echo = {"id": req["id"]} if "id" in req else {}
+        try:
+            result = await self.solve(
+                req["state"], req.get("side", 3), req.get("solver"), req.get("heuristic"), req.get("deadline"),
+            )
+        except ValueError as e:
+            return 400, {**echo, "error": str(e)}, {}
+        except Overloaded as e:
+            return 503, {**echo, "error": f"Overloaded: {e}"}, {"Retry-After": "1"}
+        except asyncio.TimeoutError:
+            self.metrics.deadline_exceeded += 1
+            return 504, {**echo, "error": "Deadline exceeded", "status": "time_budget"}, {}
+        if result["status"] == "time_budget":
+            self.metrics.deadline_exceeded += 1
+            return 504, {**echo, **result, "error": "Deadline exceeded"}, {}
+        return 200, {**echo, **result}, {}
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        if path == "/solve":
+            if method != "POST":
+                return 405, {"error": "Use POST"}, {"Allow": "POST"}
+            return await self.handle_solve(body)
+        if path in ("/metrics", "/health"):
+            if method != "GET":
+                return 405, {"error": "Use GET"}, {"Allow": "GET"}
+            if path == "/health":
+                return 200, {"status": "ok", "pending": self.pending}, {}
+            return 200, self.metrics.snapshot(self.pending, self.cache), {}
+        return 404, {"error": f"No route {path}"}, {}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                t0 = time.perf_counter()
+                parts = line.decode("latin-1").split()
+                headers: Dict[str, str] = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = h.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if len(parts) != 3:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, {}, False)
+                    break
+                method, target, version = parts
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    await self._respond(writer, 413 if length > 0 else 400, {"error": "Bad Content-Length"}, {}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                self.metrics.request()
+                code, payload, extra = await self.route(method, target.split("?", 1)[0], body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                self.metrics.response(code, time.perf_counter() - t0)
+                await self._respond(writer, code, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(
+        writer: asyncio.StreamWriter, code: int, payload: Dict[str, Any], extra: Dict[str, str], keep_alive: bool
+    ) -> None:
+        body = json.dumps(payload).encode()
+        head: List[str] = [
+            f"HTTP/1.1 {code} {_REASONS.get(code, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(
+    service: SolveService, host: str = "127.0.0.1", port: int = 8080, unix_path: Optional[str] = None
+) -> asyncio.AbstractServer:
+    """Start listening (TCP on ``host:port``, or the Unix socket ``unix_path``)."""
+    if unix_path is not None:
+        return await asyncio.start_unix_server(service.handle_connection, path=unix_path)
+    return await asyncio.start_server(service.handle_connection, host, port)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HTTP/JSON solve service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", default=None, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count)")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="astar")
+    parser.add_argument("--heuristic", default=None)
+    parser.add_argument("--max-pending", type=int, default=256, help="Distinct solves queued or running")
+    parser.add_argument("--deadline", type=float, default=10.0, help="Default per-request deadline (s)")
+    parser.add_argument("--cache", default=None, help="sqlite path of a SolutionCache (3x3 only)")
+    parser.add_argument("--max-side", type=int, default=4, help="Largest board side accepted")
+    args = parser.parse_args()
+
+    async def _main() -> None:
+        cache = SolutionCache(args.cache) if args.cache else None
+        service = SolveService(
+            args.workers, args.solver, args.heuristic, args.max_pending, args.deadline, cache, args.max_side
+        )
+        server = await serve(service, args.host, args.port, args.unix)
+        where = args.unix or f"http://{args.host}:{args.port}"
+        print(f"Serving on {where} (solver {args.solver})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            service.close()
+            if cache is not None:
+                cache.close()
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
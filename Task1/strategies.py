@@ -1,11 +1,46 @@
 from __future__ import annotations
 
-from typing import Tuple, List
+from typing import Callable, Dict, Optional, Tuple, List, Union
 
+from .board import Board
 from .puzzle_state import PuzzleState
 from .heuristics import Heuristics
 from .problem import PuzzleProblem
-from .search import a_star_search
+from .search import ProgressFn, SearchBudget, SearchMetrics, a_star_search
+from .suboptimal import ara_star_search, beam_search, weighted_a_star_search
+from .bidirectional import bidirectional_search
+from .hda import StateHeuristic, WorkerStats, hda_star_search
+from .vectorized import bfs_search
+from .cache import SolutionCache
+from .distance_table import get_distance_table
+from .ida_star import IDAStarSolver
+from .incremental import H2, MANHATTAN_BLANK_DIV2, MISPLACED_DIV2, for_board, is_incremental
+from .pdb import default_pdb_heuristic
+
+HeuristicFn = Callable[[Union[PuzzleState, int]], int]
+SolveResult = Tuple[Optional[List[str]], int]
+
+# Ba heuristic đầu là bản incremental (xem incremental.py): cùng giá trị với
+# Heuristics.*, nhưng các engine cập nhật h của nút con từ nút cha.
+HEURISTICS: Dict[str, HeuristicFn] = {
+    "misplaced_div2": MISPLACED_DIV2,
+    "manhattan_blank_div2": MANHATTAN_BLANK_DIV2,
+    "h2": H2,
+    "pdb_max": Heuristics.pdb_max,
+}
+
+_BOARD_HEURISTICS: Dict[int, Dict[str, HeuristicFn]] = {3: HEURISTICS}
+
+
+def heuristics_for(board: Board) -> Dict[str, HeuristicFn]:
+    """Bảng HEURISTICS cho bàn ``board`` (cùng tên, nhận int packed của bàn đó)."""
+    table = _BOARD_HEURISTICS.get(board.side)
+    if table is None:
+        table = _BOARD_HEURISTICS[board.side] = {
+            **for_board(board),
+            "pdb_max": default_pdb_heuristic(board),
+        }
+    return table
 
 
 def puzzle_heuristic(state: PuzzleState, problem: PuzzleProblem) -> int:
@@ -13,6 +48,209 @@ def puzzle_heuristic(state: PuzzleState, problem: PuzzleProblem) -> int:
     return Heuristics.misplaced_div2(state)
 
 
-def solve_puzzle_problem(problem: PuzzleProblem) -> Tuple[List[str] | None, int]:
-    return a_star_search(problem, puzzle_heuristic)
+def _solve_astar(
+    problem: PuzzleProblem,
+    h: HeuristicFn,
+    open_list: str = "heap",
+    storage: str = "dict",
+    budget: Optional[SearchBudget] = None,
+    progress: Optional[ProgressFn] = None,
+    symmetry: bool = False,
+    metrics: Optional[SearchMetrics] = None,
+    partial_expansion: bool = False,
+) -> Tuple[Optional[List[str]], int, int]:
+    metrics = metrics if metrics is not None else SearchMetrics()
+    actions, cost = a_star_search(
+        problem, h if is_incremental(h) else StateHeuristic(h),
+        open_list=open_list, storage=storage, metrics=metrics, budget=budget, progress=progress,
+        symmetry=symmetry, partial_expansion=partial_expansion,
+    )
+    return actions, cost, metrics.expanded
+
+
+def _solve_epea(problem: PuzzleProblem, h: HeuristicFn, **options) -> Tuple[Optional[List[str]], int, int]:
+    # A* mở rộng từng phần (EPEA*, xem search.py): cùng lời giải tối ưu, sinh ít nút con hơn.
+    return _solve_astar(problem, h, partial_expansion=True, **options)
+
+
+def _solve_table(problem: PuzzleProblem, h: HeuristicFn) -> Tuple[Optional[List[str]], int, int]:
+    # Tra bảng khoảng cách chính xác (mmap), không cần tìm kiếm; h bị bỏ qua.
+    # Không mở rộng nút nào nên expanded = 0; các lần tra bảng dọc đường đi
+    # không được tính.
+    if problem.board.side != 3:
+        raise ValueError("The distance table only covers 3x3 boards")
+    actions, cost = get_distance_table().solve(problem.get_initial_state())
+    return actions, cost, 0
+
+
+def _solve_bidir(
+    problem: PuzzleProblem,
+    h: HeuristicFn,
+    budget: Optional[SearchBudget] = None,
+    progress: Optional[ProgressFn] = None,
+    metrics: Optional[SearchMetrics] = None,
+) -> Tuple[Optional[List[str]], int, int]:
+    # BFS hai chiều (xuôi từ start, ngược từ cả 4 goal); h bị bỏ qua.
+    metrics = metrics if metrics is not None else SearchMetrics()
+    actions, cost = bidirectional_search(problem, metrics=metrics, budget=budget, progress=progress)
+    return actions, cost, metrics.expanded
+
+
+def _solve_hda(
+    problem: PuzzleProblem,
+    h: HeuristicFn,
+    workers: Optional[int] = None,
+    budget: Optional[SearchBudget] = None,
+    metrics: Optional[SearchMetrics] = None,
+    worker_stats: Optional[List[WorkerStats]] = None,
+    **options,
+) -> Tuple[Optional[List[str]], int, int]:
+    # HDA* trên nhiều tiến trình; luôn chạy trên int packed (rẻ nhất khi gửi
+    # giữa các worker), action giống hệt với PuzzleState.
+    metrics = metrics if metrics is not None else SearchMetrics()
+    if not problem.packed:
+        problem = PuzzleProblem(problem.get_initial_state().packed, problem.board.side)
+    actions, cost = hda_star_search(
+        problem, StateHeuristic(h), workers,
+        metrics=metrics, budget=budget, worker_stats=worker_stats, **options,
+    )
+    return actions, cost, metrics.expanded
+
+
+def _solve_vbfs(
+    problem: PuzzleProblem,
+    h: HeuristicFn,
+    budget: Optional[SearchBudget] = None,
+    metrics: Optional[SearchMetrics] = None,
+) -> Tuple[Optional[List[str]], int, int]:
+    # BFS theo từng lớp trên mảng NumPy (xem vectorized.py); h bị bỏ qua.
+    metrics = metrics if metrics is not None else SearchMetrics()
+    start = problem.get_initial_state()
+    actions, cost = bfs_search(
+        start if problem.packed else start.packed, problem.board, metrics=metrics, budget=budget
+    )
+    return actions, cost, metrics.expanded
+
+
+def _suboptimal(search: Callable[..., SolveResult]) -> Callable[..., Tuple[Optional[List[str]], int, int]]:
+    # Các chế độ không tối ưu: truyền metrics để đọc cận metrics.suboptimality.
+    def solve(
+        problem: PuzzleProblem, h: HeuristicFn, metrics: Optional[SearchMetrics] = None, **options
+    ) -> Tuple[Optional[List[str]], int, int]:
+        metrics = metrics if metrics is not None else SearchMetrics()
+        actions, cost = search(problem, lambda state, _problem: h(state), metrics=metrics, **options)
+        return actions, cost, metrics.expanded
+
+    return solve
+
+
+def _solve_ida(
+    problem: PuzzleProblem,
+    h: HeuristicFn,
+    budget: Optional[SearchBudget] = None,
+    metrics: Optional[SearchMetrics] = None,
+) -> Tuple[Optional[List[str]], int, int]:
+    solver = IDAStarSolver(h, board=problem.board)
+    actions, cost = solver.solve(problem.get_initial_state(), budget=budget)
+    if metrics is not None:
+        metrics.reset()
+        metrics.status = solver.status
+        metrics.expanded = solver.expanded_count
+    return actions, cost, solver.expanded_count
+
+
+# Mỗi solver: fn(problem, h, **options) -> (actions, cost, expanded).
+SOLVERS: Dict[str, Callable[..., Tuple[Optional[List[str]], int, int]]] = {
+    "astar": _solve_astar,
+    # options như astar (trừ storage="dense")
+    "epea": _solve_epea,
+    "table": _solve_table,
+    "ida": _solve_ida,
+    "bidir": _solve_bidir,
+    # options: workers=, batch_size=, chunk=, worker_stats= (list cần điền)
+    "hda": _solve_hda,
+    # cần NumPy
+    "vbfs": _solve_vbfs,
+    # options: weight=; weight=, step=, deadline= (giây); width=
+    "wastar": _suboptimal(weighted_a_star_search),
+    "arastar": _suboptimal(ara_star_search),
+    "beam": _suboptimal(beam_search),
+}
+
+# Solver cho lời giải tối ưu (với heuristic admissible); chỉ kết quả của
+# chúng được ghi vào SolutionCache (xem cacheable).
+OPTIMAL_SOLVERS = frozenset({"astar", "epea", "table", "ida", "bidir", "hda", "vbfs"})
+
+# Solver nhận budget= và metrics= (SearchBudget/SearchMetrics); table thì không
+# (chỉ tra bảng, không cần budget).
+BUDGET_SOLVERS = frozenset({"astar", "epea", "ida", "bidir", "hda", "vbfs", "wastar", "arastar", "beam"})
+
+# IDA* tái mở rộng rất nhiều, nên mặc định dùng heuristic PDB mạnh.
+DEFAULT_HEURISTICS: Dict[str, str] = {"ida": "pdb_max"}
+
+
+def resolve_heuristic(
+    solver: str, heuristic: Union[str, HeuristicFn, None], board: Optional[Board] = None
+) -> HeuristicFn:
+    if heuristic is None:
+        heuristic = DEFAULT_HEURISTICS.get(solver, "misplaced_div2")
+    if callable(heuristic):
+        return heuristic
+    table = HEURISTICS if board is None else heuristics_for(board)
+    try:
+        return table[heuristic]
+    except KeyError:
+        raise ValueError(f"Unknown heuristic {heuristic!r}; expected one of {sorted(HEURISTICS)}") from None
+
+
+def cacheable(solver: str, heuristic: Union[str, HeuristicFn, None]) -> bool:
+    """Lời giải có chắc tối ưu để ghi vào SolutionCache không.
+
+    Chỉ khi solver tối ưu và heuristic lấy theo tên từ HEURISTICS (đều
+    admissible): một callable tùy ý có thể không admissible, và một lời
+    giải không tối ưu trong cache bền sẽ được trả mãi cho mọi solver sau.
+    """
+    return solver in OPTIMAL_SOLVERS and not callable(heuristic)
+
+
+def solve_with_stats(
+    problem: PuzzleProblem,
+    solver: str = "astar",
+    heuristic: Union[str, HeuristicFn, None] = None,
+    cache: Optional[SolutionCache] = None,
+    **options,
+) -> Tuple[Optional[List[str]], int, int]:
+    """Như ``solve_puzzle_problem`` nhưng trả thêm số nút đã mở rộng.
+
+    ``options`` được chuyển cho solver, ví dụ ``open_list="bucket"`` với A*.
+    Với ``cache`` (xem cache.py), trạng thái đã có lời giải được trả ngay
+    (0 nút mở rộng) và lời giải mới được ghi lại khi ``cacheable``.
+    """
+    try:
+        fn = SOLVERS[solver]
+    except KeyError:
+        raise ValueError(f"Unknown solver {solver!r}; expected one of {sorted(SOLVERS)}") from None
+    h = resolve_heuristic(solver, heuristic, problem.board)
+    if cache is None:
+        return fn(problem, h, **options)
+    if problem.board.side != 3:
+        raise ValueError("SolutionCache only stores 3x3 solutions")
+    start = problem.get_initial_state()
+    hit = cache.get(start)
+    if hit is not None:
+        return hit[0], hit[1], 0
+    actions, cost, expanded = fn(problem, h, **options)
+    if actions is not None and cacheable(solver, heuristic):
+        cache.put(start, actions)
+    return actions, cost, expanded
+
 
+def solve_puzzle_problem(
+    problem: PuzzleProblem,
+    solver: str = "astar",
+    heuristic: Union[str, HeuristicFn, None] = None,
+    cache: Optional[SolutionCache] = None,
+    **options,
+) -> SolveResult:
+    actions, cost, _ = solve_with_stats(problem, solver, heuristic, cache, **options)
+    return actions, cost
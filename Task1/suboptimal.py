@@ -0,0 +1,346 @@
+"""
+Bounded-suboptimal and anytime search: weighted A*, ARA* and beam search.
+
+Same problem/heuristic interface as a_star_search (search.py); every
+function returns (path, cost) and fills a SearchMetrics if one is given.
+metrics.suboptimality is the proven bound cost / C* <= suboptimality for
+the returned path, assuming the heuristic is admissible (and consistent
+for the A* variants, which never re-expand a state within a round):
+
+- weighted_a_star_search(weight=w): f = g + w * h, no re-expansions.
+  The bound is min(w, cost / lb), where lb = min g + h over the states
+  still open or waiting for re-expansion, which is a lower bound on C*.
+- ara_star_search(weight, step, deadline): Anytime Repairing A*. It runs
+  weighted A* with weight, then repeats with the weight lowered by step,
+  reusing the previous search effort, until the bound reaches 1 or the
+  deadline (seconds) passes. on_solution(path, cost, bound) is called
+  for each improved solution.
+- beam_search(width): breadth-first, keeping the width states with the
+  smallest h per layer. The proven lower bound on C* is max(h(start),
+  d + 1), where d is the depth of the first layer cut to width (the
+  layers before it were complete and held no goal); 1.0 if nothing was
+  ever cut, since it is then plain BFS.
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .search import (
+    FRONTIER_ENTRY_BYTES,
+    TABLE_ENTRY_BYTES,
+    ProgressFn,
+    SearchBudget,
+    SearchMetrics,
+    _Monitor,
+)
+
+SolutionFn = Callable[[List[Any], int, float], None]
+
+
+class _AraState:
+    """Tables shared by the ImprovePath rounds of ARA*."""
+
+    def __init__(self, problem, heuristic) -> None:
+        self.problem = problem
+        self.heuristic = heuristic
+        self.g: Dict[Any, int] = {}
+        self.h: Dict[Any, int] = {}
+        self.parent: Dict[Any, Optional[Tuple[Any, Any]]] = {}
+        self.open: List[Tuple[float, int, Any]] = []  # (g + eps * h, tie, state), lazy deletion
+        self.in_open: Dict[Any, int] = {}  # state -> g it was queued with
+        self.closed: set = set()
+        self.incons: set = set()
+        self.tie = 0
+        self.best_goal: Any = None
+        self.best_cost: Optional[int] = None
+
+    def h_of(self, state) -> int:
+        value = self.h.get(state)
+        if value is None:
+            value = self.h[state] = self.heuristic(state, self.problem)
+        return value
+
+    def queue(self, state, eps: float) -> None:
+        self.tie += 1
+        g = self.g[state]
+        self.in_open[state] = g
+        heapq.heappush(self.open, (g + eps * self.h_of(state), self.tie, state))
+
+    def min_key(self) -> float:
+        # Drops stale heap entries on the way.
+        open_ = self.open
+        while open_:
+            key, _, state = open_[0]
+            if self.in_open.get(state) == self.g[state]:
+                return key
+            heapq.heappop(open_)
+        return float("inf")
+
+    def lower_bound(self) -> float:
+        """min g + h over open and inconsistent states (lower bound on C*)."""
+        lb = float("inf")
+        for state in list(self.in_open) + list(self.incons):
+            value = self.g[state] + self.h_of(state)
+            if value < lb:
+                lb = value
+        return lb
+
+    def bound(self, eps: float) -> float:
+        """Proven cost / C*; ``eps`` is the weight of the last *completed* round."""
+        if self.best_cost is None:
+            return float("inf")
+        lb = min(self.lower_bound(), self.best_cost)
+        if lb <= 0:
+            return 1.0 if self.best_cost == 0 else eps
+        return min(eps, self.best_cost / lb)
+
+    def path(self) -> List[Any]:
+        # Parents may have improved since the goal's g was set, so the path
+        # can be shorter than best_cost (never longer); callers use its length.
+        actions: List[Any] = []
+        state = self.best_goal
+        while self.parent[state] is not None:
+            state, action = self.parent[state]
+            actions.append(action)
+        actions.reverse()
+        return actions
+
+
+def _improve_path(ara: _AraState, eps: float, metrics: SearchMetrics, stop) -> Optional[str]:
+    """One weighted-A* round; returns a stop reason if the budget ran out.
+
+    metrics.peak_frontier is kept as a running max of the open states.
+    """
+    problem = ara.problem
+    g_table = ara.g
+    parent = ara.parent
+    while True:
+        key = ara.min_key()
+        if key == float("inf"):
+            return None
+        if ara.best_cost is not None and ara.best_cost <= key:
+            return None
+        _, _, state = heapq.heappop(ara.open)
+        del ara.in_open[state]
+
+        reason = stop()
+        if reason is not None:
+            ara.in_open[state] = g_table[state]  # keep it counted in the lower bound
+            return reason
+        ara.closed.add(state)
+        metrics.expanded += 1
+        if problem.is_goal(state):
+            continue
+
+        new_g = g_table[state] + 1
+        for action, next_state in problem.get_successors(state, g_table[state]):
+            if new_g >= g_table.get(next_state, float("inf")):
+                continue
+            g_table[next_state] = new_g
+            parent[next_state] = (state, action)
+            metrics.generated += 1
+            if problem.is_goal(next_state) and (ara.best_cost is None or new_g < ara.best_cost):
+                ara.best_goal, ara.best_cost = next_state, new_g
+            if next_state in ara.closed:
+                ara.incons.add(next_state)
+            else:
+                ara.queue(next_state, eps)
+        if len(ara.in_open) > metrics.peak_frontier:
+            metrics.peak_frontier = len(ara.in_open)
+
+
+def _start(problem, heuristic, metrics: Optional[SearchMetrics]) -> Tuple[SearchMetrics, _AraState]:
+    if metrics is None:
+        metrics = SearchMetrics()
+    else:
+        metrics.reset()
+    t0 = time.perf_counter()
+    ara = _AraState(problem, heuristic)
+    start = problem.get_initial_state()
+    ara.g[start] = 0
+    ara.parent[start] = None
+    if problem.is_goal(start):
+        ara.best_goal, ara.best_cost = start, 0
+    metrics.setup_time = time.perf_counter() - t0
+    return metrics, ara
+
+
+def _monitor(ara: _AraState, metrics, budget, progress, progress_interval) -> _Monitor:
+    return _Monitor(
+        metrics, budget, progress, progress_interval,
+        lambda: len(ara.g) * TABLE_ENTRY_BYTES + len(ara.open) * FRONTIER_ENTRY_BYTES,
+    )
+
+
+def _finish(ara: _AraState, metrics: SearchMetrics, monitor: _Monitor, status: str, eps: float):
+    monitor.end_search()
+    metrics.peak_table = len(ara.g)
+    metrics.heuristic_calls = len(ara.h)
+    if ara.best_cost is None:
+        metrics.status = status
+        return None, 0
+    # An incumbent is always returned; the bound says how good it is.
+    metrics.status = "solved"
+    metrics.suboptimality = ara.bound(eps)
+    t1 = time.perf_counter()
+    path = ara.path()
+    metrics.reconstruct_time = time.perf_counter() - t1
+    return path, len(path)
+
+
+def weighted_a_star_search(
+    problem,
+    heuristic,
+    weight: float = 2.0,
+    *,
+    metrics: Optional[SearchMetrics] = None,
+    budget: Optional[SearchBudget] = None,
+    progress: Optional[ProgressFn] = None,
+    progress_interval: int = 10000,
+):
+    if weight < 1:
+        raise ValueError("weight must be >= 1")
+    metrics, ara = _start(problem, heuristic, metrics)
+    monitor = _monitor(ara, metrics, budget, progress, progress_interval)
+    ara.queue(problem.get_initial_state(), weight)
+    reason = _improve_path(ara, weight, metrics, monitor.stop_reason)
+    # The weight is only proven once the round has run to completion.
+    return _finish(ara, metrics, monitor, reason or "exhausted", weight if reason is None else float("inf"))
+
+
+def ara_star_search(
+    problem,
+    heuristic,
+    weight: float = 3.0,
+    step: float = 0.5,
+    deadline: Optional[float] = None,
+    *,
+    metrics: Optional[SearchMetrics] = None,
+    budget: Optional[SearchBudget] = None,
+    progress: Optional[ProgressFn] = None,
+    progress_interval: int = 10000,
+    on_solution: Optional[SolutionFn] = None,
+):
+    if weight < 1:
+        raise ValueError("weight must be >= 1")
+    if step <= 0:
+        raise ValueError("step must be > 0")
+    if deadline is not None:
+        # The deadline is a time budget; it tightens any budget passed in.
+        base = budget or SearchBudget()
+        seconds = deadline if base.max_seconds is None else min(deadline, base.max_seconds)
+        budget = SearchBudget(base.max_expanded, seconds, base.max_memory_bytes, min(base.check_interval, 256))
+    metrics, ara = _start(problem, heuristic, metrics)
+    monitor = _monitor(ara, metrics, budget, progress, progress_interval)
+    ara.queue(problem.get_initial_state(), weight)
+
+    eps = weight
+    proven = float("inf")  # weight of the last completed round
+    reported: Optional[int] = None
+    while True:
+        reason = _improve_path(ara, eps, metrics, monitor.stop_reason)
+        if reason is not None:
+            return _finish(ara, metrics, monitor, reason, proven)
+        proven = eps
+        bound = ara.bound(eps)
+        if ara.best_cost is not None and ara.best_cost != reported and on_solution is not None:
+            reported = ara.best_cost
+            path = ara.path()
+            on_solution(path, len(path), bound)
+        if eps <= 1.0 or bound <= 1.0:
+            return _finish(ara, metrics, monitor, "exhausted", eps)
+        # Next round: lower weight, re-queue inconsistent states, re-key open.
+        eps = max(1.0, eps - step)
+        pending = list(ara.in_open) + list(ara.incons)
+        ara.open.clear()
+        ara.in_open.clear()
+        ara.incons.clear()
+        ara.closed.clear()
+        for state in pending:
+            ara.queue(state, eps)
+
+
+def beam_search(
+    problem,
+    heuristic,
+    width: int = 100,
+    *,
+    metrics: Optional[SearchMetrics] = None,
+    budget: Optional[SearchBudget] = None,
+    progress: Optional[ProgressFn] = None,
+    progress_interval: int = 10000,
+):
+    if width < 1:
+        raise ValueError("width must be >= 1")
+    if metrics is None:
+        metrics = SearchMetrics()
+    else:
+        metrics.reset()
+    t0 = time.perf_counter()
+    start = problem.get_initial_state()
+    parent: Dict[Any, Optional[Tuple[Any, Any]]] = {start: None}
+    h0 = heuristic(start, problem)
+    metrics.heuristic_calls = 1
+    layer: List[Any] = [start]
+    depth = 0
+    first_pruned: Optional[int] = None  # depth of the first layer cut to width
+    metrics.setup_time = time.perf_counter() - t0
+    monitor = _Monitor(
+        metrics, budget, progress, progress_interval,
+        lambda: len(parent) * TABLE_ENTRY_BYTES + width * FRONTIER_ENTRY_BYTES,
+    )
+
+    def finish(status: str, goal: Any = None):
+        monitor.end_search()
+        metrics.status = status
+        metrics.peak_table = len(parent)
+        if goal is None:
+            return None, 0
+        t1 = time.perf_counter()
+        actions: List[Any] = []
+        state = goal
+        while parent[state] is not None:
+            state, action = parent[state]
+            actions.append(action)
+        actions.reverse()
+        metrics.reconstruct_time = time.perf_counter() - t1
+        if first_pruned is None:
+            metrics.suboptimality = 1.0
+        else:
+            # Layers up to first_pruned were complete and held no goal.
+            lb = max(h0, first_pruned + 1)
+            metrics.suboptimality = depth / lb
+        return actions, depth
+
+    if problem.is_goal(start):
+        return finish("solved", start)
+
+    while layer:
+        candidates: List[Tuple[int, int, Any]] = []
+        for state in layer:
+            reason = monitor.stop_reason()
+            if reason is not None:
+                return finish(reason)
+            metrics.expanded += 1
+            for action, next_state in problem.get_successors(state, depth):
+                if next_state in parent:
+                    continue
+                parent[next_state] = (state, action)
+                metrics.generated += 1
+                if problem.is_goal(next_state):
+                    depth += 1
+                    metrics.heuristic_calls += len(candidates)
+                    return finish("solved", next_state)
+                candidates.append((heuristic(next_state, problem), len(candidates), next_state))
+        metrics.heuristic_calls += len(candidates)
+        depth += 1
+        if len(candidates) > width:
+            if first_pruned is None:
+                first_pruned = depth
+            candidates = heapq.nsmallest(width, candidates)
+        layer = [state for _, _, state in candidates]
+        metrics.peak_frontier = max(metrics.peak_frontier, len(layer))
+    return finish("exhausted")
@@ -0,0 +1,129 @@
+"""Symmetries of the puzzle and canonical representatives.
+
+Two maps preserve both the move set and the goal set:
+
+- relabelling ``x -> 9 - x`` (blank fixed): goal 0 <-> 1, goal 2 <-> 3;
+  keeps the A9 condition ``a + b == 9`` and commutes with slides/Diag.
+- rotating the board by 180 degrees (cell ``p -> 8 - p``): goal 0 <-> 3,
+  goal 1 <-> 2; slides flip direction (U <-> D, L <-> R), ``A9:i-j``
+  becomes ``A9:(8-j)-(8-i)`` and both Diag pairs map onto themselves.
+
+Together with their composition and the identity they form a group of 4
+involutions, so ``s`` and ``apply(sym, s)`` have the same distance to the
+goals and a path for one maps move by move onto a path for the other.
+(Transposes and mirrors do not preserve the goal set.)
+
+``canonical(s)`` is the smallest packed value in the orbit of ``s``; it is
+used as the key of symmetry-reduced search tables and of the solution
+cache. Heuristics used with reduced tables must be symmetric too, which
+holds for all of ``strategies.HEURISTICS``.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Tuple
+
+from . import packed as _packed
+
+IDENTITY = 0
+RELABEL = 1
+ROTATE = 2
+NUM_SYMMETRIES = 4  # bit 0: relabel, bit 1: rotate
+
+
+def _relabel_nibble(v: int) -> int:
+    return (9 - v) & 0xF if v else 0
+
+
+def _build_chunk_tables():
+    # Per 12-bit row: relabelled, reversed (cells 0,1,2 -> 2,1,0), and both.
+    rel, rev, both = [], [], []
+    for c in range(1 << 12):
+        a, b, d = c & 0xF, (c >> 4) & 0xF, c >> 8
+        ra, rb, rd = _relabel_nibble(a), _relabel_nibble(b), _relabel_nibble(d)
+        rel.append(ra | rb << 4 | rd << 8)
+        rev.append(d | b << 4 | a << 8)
+        both.append(rd | rb << 4 | ra << 8)
+    return tuple(rel), tuple(rev), tuple(both)
+
+
+_REL, _REV, _REVREL = _build_chunk_tables()
+
+
+def apply(sym: int, s: int) -> int:
+    c0, c1, c2 = s & 0xFFF, (s >> 12) & 0xFFF, s >> 24
+    if sym == RELABEL:
+        return _REL[c0] | _REL[c1] << 12 | _REL[c2] << 24
+    if sym == ROTATE:
+        return _REV[c2] | _REV[c1] << 12 | _REV[c0] << 24
+    if sym == RELABEL | ROTATE:
+        return _REVREL[c2] | _REVREL[c1] << 12 | _REVREL[c0] << 24
+    return s
+
+
+def orbit(s: int) -> Tuple[int, ...]:
+    """``apply(sym, s)`` for every ``sym``, indexed by ``sym``."""
+    c0, c1, c2 = s & 0xFFF, (s >> 12) & 0xFFF, s >> 24
+    return (
+        s,
+        _REL[c0] | _REL[c1] << 12 | _REL[c2] << 24,
+        _REV[c2] | _REV[c1] << 12 | _REV[c0] << 24,
+        _REVREL[c2] | _REVREL[c1] << 12 | _REVREL[c0] << 24,
+    )
+
+
+def canonical(s: int) -> int:
+    c0, c1, c2 = s & 0xFFF, (s >> 12) & 0xFFF, s >> 24
+    return min(
+        s,
+        _REL[c0] | _REL[c1] << 12 | _REL[c2] << 24,
+        _REV[c2] | _REV[c1] << 12 | _REV[c0] << 24,
+        _REVREL[c2] | _REVREL[c1] << 12 | _REVREL[c0] << 24,
+    )
+
+
+def canonicalize(s: int) -> Tuple[int, int]:
+    """Return ``(canonical(s), sym)`` with ``apply(sym, s) == canonical(s)``."""
+    images = orbit(s)
+    c = min(images)
+    return c, images.index(c)
+
+
+def _build_move_maps() -> Tuple[Tuple[int, ...], ...]:
+    cells = _packed.MOVE_CELLS
+    slides = {cells[m]: m for row in _packed.SLIDE_MOVES for m, _, _ in row}
+    swaps = {cells[m]: m for m, _, _ in _packed.A9_MOVES + _packed.DIAG_MOVES}
+    last = _packed.CELLS - 1
+
+    def rotate(m: int) -> int:
+        i, j = cells[m]
+        ri, rj = last - i, last - j
+        if slides.get((i, j)) == m:
+            return slides[(ri, rj)]
+        return swaps[(min(ri, rj), max(ri, rj))]
+
+    identity = tuple(range(_packed.NUM_MOVES))
+    rotated = tuple(rotate(m) for m in identity)
+    # Relabelling moves tiles, not cells, so move codes are unchanged.
+    return identity, identity, rotated, rotated
+
+
+# MOVE_MAPS[sym][m]: the move that ``sym`` turns move ``m`` into.
+MOVE_MAPS = _build_move_maps()
+
+
+def map_moves(sym: int, moves: Iterable[int]) -> List[int]:
+    table = MOVE_MAPS[sym]
+    return [table[m] for m in moves]
+
+
+def map_actions(sym: int, actions: Iterable[str]) -> List[str]:
+    """Same as ``map_moves`` on action labels."""
+    labels = _packed.MOVE_LABELS
+    table = MOVE_MAPS[sym]
+    return [labels[table[_LABEL_CODES[a]]] for a in actions]
+
+
+# Labels are unique except for slides, whose direction is all that matters
+# here: any code with the same label maps to the same rotated label.
+_LABEL_CODES = {label: m for m, label in enumerate(_packed.MOVE_LABELS)}
@@ -0,0 +1,294 @@
+"""NumPy batch engine: whole layers of states at once.
+
+A layer of M states is an ``(M, N*N)`` uint8 array (one row per state,
+one column per cell). Instead of generating successors and evaluating
+heuristics state by state, every function here works on the whole array:
+
+- ``expand``: for each move code, one validity mask over the layer (blank
+  on the slide's cell, ``a + b == N*N`` for A9, both non-blank for Diag)
+  and one column swap on the selected rows
+- ``misplaced_div2`` / ``manhattan_blank_div2`` / ``h2``: the
+  ``Heuristics`` values, against all four goals in one broadcast
+- ``keys``: packed ints as uint64 (same values as ``board.pack``), used
+  with ``np.unique`` / ``np.isin`` for duplicate detection
+- ``ranks``: Lehmer ranks, same as ``board.rank``
+
+On top of these, ``bfs_search`` is a frontier-at-a-time breadth-first
+solver (optimal, unit costs) and ``distance_table`` the multi-source BFS
+behind ``distance_table.build_distance_table``.
+
+NumPy is optional: without it ``HAVE_NUMPY`` is False and the functions
+raise ImportError. Packed keys need ``cells * bits <= 64`` (up to 4x4).
+"""
+
+from __future__ import annotations
+
+import time
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
+
+from .board import Board, get_board
+from .heuristics import blank_distances
+from .search import SearchBudget, SearchMetrics
+
+HAVE_NUMPY = np is not None
+
+
+def _require() -> None:
+    if np is None:
+        raise ImportError("Task1.vectorized cần NumPy: pip install numpy")
+
+
+@lru_cache(maxsize=None)
+def _tables(board: Board):
+    """Per-board arrays: move cells/kinds, goals, blank distances, shifts, factorials."""
+    slides = {m for row in board.slide_moves for m, _, _ in row}
+    pairs = {m for m, _, _ in board.pair_moves}
+    moves = []
+    for m, (i, j) in enumerate(board.move_cells):
+        kind = 0 if m in slides else (1 if m in pairs else 2)
+        moves.append((m, i, j, kind))
+    goals = np.array(board.goal_states, dtype=np.uint8)
+    blank_div2 = np.array([d // 2 for d in blank_distances(board)], dtype=np.uint8)
+    shifts = np.arange(board.cells, dtype=np.uint64) * np.uint64(board.bits)
+    n = board.cells
+    fact = [1] * n
+    for k in range(1, n):
+        fact[k] = fact[k - 1] * k
+    weights = np.array([fact[n - 1 - i] for i in range(n)], dtype=np.int64)
+    return tuple(moves), goals, blank_div2, shifts, weights
+
+
+def _fits_u64(board: Board) -> None:
+    if board.cells * board.bits > 64:
+        raise ValueError(f"Packed keys of {board!r} do not fit in 64 bits")
+
+
+# Conversion -----------------------------------------------------------------
+def to_array(states: Iterable[int], board: Optional[Board] = None):
+    """Packed ints -> ``(M, cells)`` uint8 array."""
+    _require()
+    board = board or get_board()
+    _fits_u64(board)
+    packed = np.fromiter(states, dtype=np.uint64)
+    shifts = _tables(board)[3]
+    return ((packed[:, None] >> shifts[None, :]) & np.uint64(board.mask)).astype(np.uint8)
+
+
+def keys(arr, board: Optional[Board] = None):
+    """``board.pack`` of every row, as uint64."""
+    _require()
+    board = board or get_board()
+    _fits_u64(board)
+    shifts = _tables(board)[3]
+    return np.bitwise_or.reduce(arr.astype(np.uint64) << shifts[None, :], axis=1)
+
+
+def from_array(arr, board: Optional[Board] = None) -> List[int]:
+    """``(M, cells)`` array -> packed ints."""
+    return [int(k) for k in keys(arr, board)]
+
+
+def ranks(arr, board: Optional[Board] = None):
+    """``board.rank`` of every row (int64; up to 4x4)."""
+    _require()
+    board = board or get_board()
+    _fits_u64(board)
+    weights, popcount = _tables(board)[4], _popcount()
+    arr = arr.astype(np.intp)
+    seen = np.zeros(len(arr), dtype=np.intp)
+    r = np.zeros(len(arr), dtype=np.int64)
+    for i in range(board.cells - 1):
+        # Lehmer digit, as in Board.rank: v minus the smaller values already seen.
+        v = arr[:, i]
+        bit = np.left_shift(1, v)
+        r += (v - popcount[seen & (bit - 1)]) * weights[i]
+        seen |= bit
+    return r
+
+
+@lru_cache(maxsize=None)
+def _popcount():
+    """Bit counts of every 16-bit value (cell values are < 16 up to 4x4)."""
+    pop = np.zeros(1 << 16, dtype=np.intp)
+    for k in range(16):
+        pop[1 << k:1 << (k + 1)] = pop[:1 << k] + 1
+    return pop
+
+
+# Expansion ------------------------------------------------------------------
+def expand(arr, board: Optional[Board] = None, include_special: bool = True):
+    """All successors of all rows of ``arr``.
+
+    Returns ``(children, parent_rows, moves)``: children grouped by move
+    code (not by parent), ``parent_rows[k]`` the row of ``arr`` that
+    ``children[k]`` came from and ``moves[k]`` its move code.
+    """
+    _require()
+    board = board or get_board()
+    moves = _tables(board)[0]
+    total = board.pair_sum
+    wide = arr.astype(np.uint16) if include_special else None
+    children, parents, codes = [], [], []
+    for m, i, j, kind in moves:
+        if kind == 0:
+            mask = arr[:, i] == 0
+        elif not include_special:
+            continue
+        elif kind == 1:
+            mask = wide[:, i] + wide[:, j] == total
+        else:
+            mask = (arr[:, i] != 0) & (arr[:, j] != 0)
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            continue
+        child = arr[rows]
+        child[:, [i, j]] = child[:, [j, i]]
+        children.append(child)
+        parents.append(rows)
+        codes.append(np.full(len(rows), m, dtype=np.uint8))
+    if not children:
+        return arr[:0], np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.uint8)
+    return np.concatenate(children), np.concatenate(parents), np.concatenate(codes)
+
+
+# Heuristics -----------------------------------------------------------------
+def misplaced_div2(arr, board: Optional[Board] = None):
+    """``Heuristics.misplaced_div2`` of every row."""
+    _require()
+    goals = _tables(board or get_board())[1]
+    cells = arr[:, None, :]
+    misplaced = ((cells != goals[None, :, :]) & (cells != 0)).sum(axis=2)
+    return (misplaced.min(axis=1) // 2).astype(np.uint8)
+
+
+def manhattan_blank_div2(arr, board: Optional[Board] = None):
+    """``Heuristics.manhattan_blank_div2`` of every row."""
+    _require()
+    blank_div2 = _tables(board or get_board())[2]
+    return blank_div2[np.argmax(arr == 0, axis=1)]
+
+
+def h2(arr, board: Optional[Board] = None):
+    return np.minimum(misplaced_div2(arr, board), manhattan_blank_div2(arr, board))
+
+
+# Layered search -------------------------------------------------------------
+def bfs_layers(starts: Sequence[int], board: Optional[Board] = None, max_depth: Optional[int] = None) -> Iterator:
+    """Breadth-first layers from ``starts`` as arrays of new states (layer 0 = starts)."""
+    _require()
+    board = board or get_board()
+    layer = np.unique(to_array(starts, board), axis=0)
+    seen = np.sort(keys(layer, board))
+    depth = 0
+    while len(layer):
+        yield layer
+        if max_depth is not None and depth >= max_depth:
+            return
+        layer, seen = _next_layer(layer, seen, board)[:2]
+        depth += 1
+
+
+def _next_layer(layer, seen, board: Board):
+    """New states one move from ``layer``; also their parent rows/moves."""
+    children, parent_rows, moves = expand(layer, board)
+    child_keys = keys(children, board)
+    child_keys, first = np.unique(child_keys, return_index=True)
+    new = ~np.isin(child_keys, seen, assume_unique=True)
+    first = first[new]
+    seen = np.union1d(seen, child_keys[new])
+    return children[first], seen, child_keys[new], parent_rows[first], moves[first]
+
+
+def bfs_search(
+    start: int,
+    board: Optional[Board] = None,
+    metrics: Optional[SearchMetrics] = None,
+    budget: Optional[SearchBudget] = None,
+) -> Tuple[Optional[List[str]], int]:
+    """Optimal ``(actions, cost)`` by breadth-first layers from packed ``start``.
+
+    ``budget``: max_expanded and max_seconds are checked once per layer;
+    max_memory_bytes is not enforced.
+    """
+    _require()
+    board = board or get_board()
+    board.validate(start)
+    if metrics is None:
+        metrics = SearchMetrics()
+    else:
+        metrics.reset()
+    t0 = time.perf_counter()
+    goals = np.array(sorted(board.goal_packed), dtype=np.uint64)
+    layer = to_array([start], board)
+    seen = keys(layer, board)
+    # history[d] = (parent_rows, moves) of layer d + 1
+    history: List[Tuple[object, object]] = []
+    row = 0 if start in board.goal_packed else None
+    metrics.status = "exhausted"
+    while row is None and len(layer):
+        if budget is not None:
+            if budget.max_expanded is not None and metrics.expanded >= budget.max_expanded:
+                metrics.status = "node_budget"
+                break
+            if budget.max_seconds is not None and time.perf_counter() - t0 > budget.max_seconds:
+                metrics.status = "time_budget"
+                break
+        metrics.expanded += len(layer)
+        layer, seen, layer_keys, parent_rows, moves = _next_layer(layer, seen, board)
+        metrics.generated += len(layer)
+        metrics.peak_frontier = max(metrics.peak_frontier, len(layer))
+        history.append((parent_rows, moves))
+        hit = np.flatnonzero(np.isin(layer_keys, goals))
+        if len(hit):
+            row = int(hit[0])
+    metrics.peak_table = len(seen)
+    metrics.search_time = time.perf_counter() - t0
+    if row is None:
+        return None, 0
+
+    t1 = time.perf_counter()
+    codes: List[int] = []
+    for parent_rows, moves in reversed(history):
+        codes.append(int(moves[row]))
+        row = int(parent_rows[row])
+    labels = board.move_labels
+    metrics.reconstruct_time = time.perf_counter() - t1
+    metrics.status = "solved"
+    metrics.suboptimality = 1.0
+    return [labels[m] for m in reversed(codes)], len(codes)
+
+
+def distance_table(board: Optional[Board] = None):
+    """Multi-source BFS from the goals over the whole space.
+
+    Returns ``(table, histogram)``: a uint8 array of distances indexed by
+    rank (255 = unreachable) and the number of states at each depth.
+    Needs one byte per state, so only for boards up to 3x3.
+    """
+    _require()
+    board = board or get_board()
+    if board.num_states > 1 << 31:
+        raise ValueError(f"{board!r} has too many states for a full table")
+    table = np.full(board.num_states, 255, dtype=np.uint8)
+    layer = np.unique(to_array(board.goal_packed, board), axis=0)
+    table[ranks(layer, board)] = 0
+    histogram = [len(layer)]
+    depth = 0
+    while True:
+        depth += 1
+        children = expand(layer, board)[0]
+        r = ranks(children, board)
+        r, first = np.unique(r, return_index=True)
+        new = table[r] == 255
+        if not new.any():
+            break
+        table[r[new]] = depth
+        layer = children[first[new]]
+        histogram.append(len(layer))
+    return table, histogram
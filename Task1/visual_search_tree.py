@@ -10,8 +10,9 @@ if __name__ == "__main__" and (__package__ is None or __package__ == ""):
     __package__ = _os.path.basename(_pkg_dir)
 
 import heapq
+import io
 import random
-from typing import Callable, Dict, Optional, Tuple, List
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, TextIO
 import os
 import shutil
 import subprocess
@@ -27,7 +28,161 @@ from .heuristics import Heuristics
 
 def _state_label(s: PuzzleState) -> str:
     t = [str(x) if x != 0 else "_" for x in s.to_list()]
-    return f"{t[0]} {t[1]} {t[2]}\n{t[3]} {t[4]} {t[5]}\n{t[6]} {t[7]} {t[8]}"
+    side = s.board.side
+    return "\n".join(" ".join(t[r:r + side]) for r in range(0, len(t), side))
+
+
+def _node_id(s: PuzzleState) -> str:
+    # Id lấy từ dạng packed nên không cần bảng state -> id (bộ nhớ hằng).
+    return f"n{s.packed:x}"
+
+
+class TreeEvent(NamedTuple):
+    node: PuzzleState
+    parent: Optional[PuzzleState]
+    action: Optional[str]
+    f: int
+    g: int
+
+
+def expand_search_tree(
+    initial: PuzzleState,
+    heuristic: Optional[Callable[[PuzzleState], int]] = None,
+    include_special: bool = True,
+    stop_at_goal: bool = False,
+    max_depth: Optional[int] = None,
+    keep: Optional[Callable[[TreeEvent], bool]] = None,
+) -> Iterator[TreeEvent]:
+    """
+    Lõi mở rộng A* dùng chung: sinh một TreeEvent (node, parent, action, f, g)
+    mỗi khi một nút được lấy ra khỏi frontier để mở rộng, theo đúng thứ tự A*.
+
+    - heuristic: hàm h(state)->int. Mặc định dùng Heuristics.h2.
+    - stop_at_goal: dừng sau khi lấy ra goal đầu tiên (như A*); mặc định
+      tiếp tục tới khi người gọi thôi lặp hoặc hết trạng thái.
+    - max_depth: không sinh nút con có g > max_depth (frontier và best_g chỉ
+      chứa phần cây tới độ sâu đó).
+    - keep: keep(event) False thì nút không được yield và không được mở
+      rộng, nên cả cây con của nó không bao giờ được sinh ra.
+
+    Bên trong chạy trên int packed; PuzzleState chỉ được tạo cho nút được
+    sinh ra (và cho heuristic tùy chỉnh). Nút được mở lại với g nhỏ hơn
+    (heuristic không consistent) sẽ xuất hiện thêm một lần.
+    """
+    board = initial.board
+    side = board.side
+    from_packed = PuzzleState.from_packed
+    labels = board.move_labels
+    goals = board.goal_packed
+    if heuristic is None and side == 3:
+        h = Heuristics.h2  # nhận thẳng int packed 3x3
+    else:
+        h_state = heuristic if heuristic is not None else Heuristics.h2
+        h = lambda s: h_state(from_packed(s, side))
+
+    start = initial.packed
+    # Frontier: (f, tie_breaker, g, state, parent_state, move_code), tất cả là int.
+    frontier = [(h(start), 0, 0, start, -1, -1)]
+    best_g: Dict[int, int] = {start: 0}
+    tie = 0
+
+    while frontier:
+        f, _, g, s, parent, m = heapq.heappop(frontier)
+        if g > best_g[s]:
+            continue
+        event = TreeEvent(
+            from_packed(s, side),
+            None if parent < 0 else from_packed(parent, side),
+            None if m < 0 else labels[m],
+            f,
+            g,
+        )
+        if keep is not None and not keep(event):
+            continue
+        yield event
+        if stop_at_goal and s in goals:
+            return
+
+        new_g = g + 1
+        if max_depth is not None and new_g > max_depth:
+            continue
+        for child, code in board.successors(s, include_special):
+            if new_g >= best_g.get(child, new_g + 1):
+                continue
+            best_g[child] = new_g
+            tie += 1
+            heapq.heappush(frontier, (new_g + h(child), tie, new_g, child, s, code))
+
+
+def _tree_events(
+    initial: PuzzleState,
+    n: Optional[int],
+    heuristic: Optional[Callable[[PuzzleState], int]],
+    include_special: bool,
+    max_depth: Optional[int] = None,
+    sample: float = 1.0,
+    seed: Optional[int] = None,
+) -> Iterator[TreeEvent]:
+    """Các sự kiện sẽ được vẽ: lọc theo độ sâu và lấy mẫu, tối đa ``n`` nút."""
+    if n is not None and n <= 0:
+        raise ValueError("n phải >= 1")
+    if not 0.0 < sample <= 1.0:
+        raise ValueError("sample phải nằm trong (0, 1]")
+    keep = None
+    if sample < 1.0:
+        # Nút bị bỏ không được mở rộng, nên mọi nút được sinh ra đều có cha đã vẽ.
+        rand = random.Random(seed).random
+        keep = lambda ev: ev.parent is None or rand() < sample
+    created = 0
+    for ev in expand_search_tree(initial, heuristic, include_special, max_depth=max_depth, keep=keep):
+        yield ev
+        created += 1
+        if n is not None and created >= n:
+            return
+
+
+def write_search_tree_dot(
+    out: TextIO,
+    initial: PuzzleState,
+    n: Optional[int],
+    heuristic: Optional[Callable[[PuzzleState], int]] = None,
+    include_special: bool = True,
+    annotate: bool = False,
+    max_depth: Optional[int] = None,
+    sample: float = 1.0,
+    seed: Optional[int] = None,
+) -> int:
+    """
+    Ghi cây mở rộng A* dạng DOT vào ``out`` (file đang mở), từng nút một.
+
+    - n: số nút tối đa (None: tới khi hết trạng thái / hết độ sâu).
+    - annotate: thêm g, h, f vào nhãn mỗi nút.
+    - max_depth: chỉ vẽ các nút có g <= max_depth.
+    - sample: giữ mỗi nút con với xác suất ``sample`` (cả cây con của nút bị
+      bỏ cũng bị bỏ), ``seed`` để lặp lại được.
+
+    Không giữ danh sách nút/cạnh nên bộ nhớ của phần ghi là hằng số; độ
+    sâu và lấy mẫu được áp dụng ngay trong lõi A* (nút ngoài độ sâu hay bị
+    bỏ không được sinh/mở rộng), nên frontier/best_g chỉ lớn theo phần cây
+    thực sự được duyệt.
+    Trả về số nút đã ghi.
+    """
+    write = out.write
+    write("digraph SearchTreeAStar {\n")
+    write('  node [shape=box, fontname="Courier New"];\n  edge [fontname="Helvetica", fontsize=10];\n')
+    created = 0
+    for node, parent, action, f, g in _tree_events(initial, n, heuristic, include_special, max_depth, sample, seed):
+        color = "blue" if node.is_goal() else ("green" if parent is None else "black")
+        label = _state_label(node).replace("\n", "\\n")
+        if annotate:
+            label += f"\\ng={g} h={f - g} f={f}"
+        nid = _node_id(node)
+        write(f'  {nid} [label="{label}", color="{color}", fontcolor="{color}"];\n')
+        if parent is not None:
+            write(f'  {_node_id(parent)} -> {nid} [label="{action}"];\n')
+        created += 1
+    write("}\n")
+    return created
 
 
 def illustrate_search_tree_astar(
@@ -50,58 +205,19 @@ def illustrate_search_tree_astar(
         print("Graphviz (python-graphviz) chưa được cài. Hãy cài: pip install graphviz")
         return None
 
-    if n <= 0:
-        raise ValueError("n phải >= 1")
-
-    h = heuristic if heuristic is not None else Heuristics.h2
-
     dot = Digraph(comment=f"A* Search Tree (first {n} nodes)")
     dot.attr("node", shape="box", fontname="Courier New")
     dot.attr("edge", fontname="Helvetica", fontsize="10")
     dot.attr(rankdir="TB")
 
-    # Frontier tuples: (f, tie_breaker, g, state, parent_state, action)
-    frontier: list[Tuple[int, int, int, PuzzleState, Optional[PuzzleState], Optional[str]]] = []
-    tie = 0
-    start_g = 0
-    start_f = start_g + h(initial)
-    heapq.heappush(frontier, (start_f, tie, start_g, initial, None, None))
-
-    best_g: Dict[PuzzleState, int] = {initial: 0}
-    assigned_id: Dict[PuzzleState, str] = {}
-    drawn: Dict[PuzzleState, bool] = {}
     created = 0
-
-    def _id_for(state: PuzzleState) -> str:
-        if state not in assigned_id:
-            assigned_id[state] = f"n{len(assigned_id)}"
-        return assigned_id[state]
-
-    while frontier and created < n:
-        f, _, g, state, parent_state, action = heapq.heappop(frontier)
-
-        if g > best_g.get(state, float("inf")):
-            continue
-
-        cur_id = _id_for(state)
-        if not drawn.get(state, False):
-            node_color = "blue" if state.is_goal() else ("green" if parent_state is None else "black")
-            dot.node(cur_id, _state_label(state), color=node_color, fontcolor=node_color)
-            if parent_state is not None and action is not None:
-                dot.edge(_id_for(parent_state), cur_id, label=action)
-            drawn[state] = True
-            created += 1
-            if created >= n:
-                break
-
-        for child, act in state.successors_with_actions(include_special=include_special):
-            new_g = g + 1
-            if new_g >= best_g.get(child, float("inf")):
-                continue
-            best_g[child] = new_g
-            tie += 1
-            new_f = new_g + h(child)
-            heapq.heappush(frontier, (new_f, tie, new_g, child, state, act))
+    for node, parent, action, _, _ in _tree_events(initial, n, heuristic, include_special):
+        node_color = "blue" if node.is_goal() else ("green" if parent is None else "black")
+        nid = _node_id(node)
+        dot.node(nid, _state_label(node), color=node_color, fontcolor=node_color)
+        if parent is not None:
+            dot.edge(_node_id(parent), nid, label=action)
+        created += 1
 
     if created == 0:
         print("Không thể vẽ được nút bắt đầu.")
@@ -127,66 +243,13 @@ def generate_search_tree_dot_astar(
     heuristic: Optional[Callable[[PuzzleState], int]] = None,
     include_special: bool = True,
 ) -> str:
-    """Sinh chuỗi DOT thể hiện cây mở rộng theo A* (không cần python-graphviz)."""
-    if n <= 0:
-        raise ValueError("n phải >= 1")
-
-    h = heuristic if heuristic is not None else Heuristics.h2
-
-    frontier: list[Tuple[int, int, int, PuzzleState, Optional[PuzzleState], Optional[str]]] = []
-    tie = 0
-    start_g = 0
-    start_f = start_g + h(initial)
-    heapq.heappush(frontier, (start_f, tie, start_g, initial, None, None))
-
-    best_g: Dict[PuzzleState, int] = {initial: 0}
-    assigned_id: Dict[PuzzleState, str] = {}
-    drawn: Dict[PuzzleState, bool] = {}
-    created = 0
-
-    nodes: List[Tuple[str, str, str]] = []  # (id, label, color)
-    edges: List[Tuple[str, str, str]] = []  # (src_id, dst_id, action)
-
-    def _id_for(state: PuzzleState) -> str:
-        if state not in assigned_id:
-            assigned_id[state] = f"n{len(assigned_id)}"
-        return assigned_id[state]
+    """Sinh chuỗi DOT thể hiện cây mở rộng theo A* (không cần python-graphviz).
 
-    while frontier and created < n:
-        f, _, g, state, parent_state, action = heapq.heappop(frontier)
-        if g > best_g.get(state, float("inf")):
-            continue
-
-        cur_id = _id_for(state)
-        if not drawn.get(state, False):
-            color = "blue" if state.is_goal() else ("green" if parent_state is None else "black")
-            label = _state_label(state).replace("\n", "\\n")
-            nodes.append((cur_id, label, color))
-            if parent_state is not None and action is not None:
-                edges.append((_id_for(parent_state), cur_id, action))
-            drawn[state] = True
-            created += 1
-            if created >= n:
-                break
-
-        for child, act in state.successors_with_actions(include_special=include_special):
-            new_g = g + 1
-            if new_g >= best_g.get(child, float("inf")):
-                continue
-            best_g[child] = new_g
-            tie += 1
-            new_f = new_g + h(child)
-            heapq.heappush(frontier, (new_f, tie, new_g, child, state, act))
-
-    lines: List[str] = []
-    lines.append("digraph SearchTreeAStar {")
-    lines.append("  node [shape=box, fontname=\"Courier New\"];\n  edge [fontname=\"Helvetica\", fontsize=10];")
-    for nid, lbl, color in nodes:
-        lines.append(f'  {nid} [label="{lbl}", color="{color}", fontcolor="{color}"];')
-    for src, dst, act in edges:
-        lines.append(f'  {src} -> {dst} [label="{act}"];')
-    lines.append("}")
-    return "\n".join(lines)
+    Với cây lớn nên dùng write_search_tree_dot để ghi thẳng ra file.
+    """
+    buf = io.StringIO()
+    write_search_tree_dot(buf, initial, n, heuristic=heuristic, include_special=include_special)
+    return buf.getvalue()
 
 
 def render_search_tree_png(
@@ -215,9 +278,8 @@ def render_search_tree_png(
         return out_png
 
     dot_path = stem + ".dot"
-    dot_str = generate_search_tree_dot_astar(initial, n=n, heuristic=heuristic, include_special=include_special)
     with open(dot_path, "w", encoding="utf-8") as f:
-        f.write(dot_str)
+        write_search_tree_dot(f, initial, n, heuristic=heuristic, include_special=include_special)
 
     if shutil.which("dot") is None:
         raise RuntimeError("Không tìm thấy 'dot' trong PATH. Hãy cài Graphviz CLI hoặc python-graphviz.")
@@ -233,7 +295,6 @@ def render_search_tree_png(
 if __name__ == "__main__":
     # Minimal self-test to write DOT
     init = generate_random_state_for_viz(n_shuffles=5)
-    dot = generate_search_tree_dot_astar(init, n=20)
     with open("search_tree_astar.dot", "w", encoding="utf-8") as f:
-        f.write(dot)
+        write_search_tree_dot(f, init, n=20)
     print("Đã ghi DOT A* vào: search_tree_astar.dot")